@@ -1,11 +1,20 @@
-import pandas as pd
 import numpy as np
-from flask import Flask, render_template, request
+from flask import Flask, g, render_template, request, jsonify, make_response, send_file
 from pathlib import Path
 import sys
+import time
+import hashlib
+from functools import lru_cache
 from src import config
-from src.analysis import get_key_performance_indicators, get_top_n_tracks
+from src.analysis import DashboardAggregates, load_compact_data
+from src.chart_data import ChartAggregates, chart_columns
+from src.clustering import get_archetype_model
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
 from src.modeling import load_model
+from src.plotting import PLOTS, PlotService
+from src.registry import ServingRegistry, ServingSnapshot
+from src.serving import (MicroBatcher, NativeModel, PredictionCache, distinct_sweep_values, feature_contributions,
+                         records_to_matrix, sweep_axes, sweep_grid)
 
 # Add project root to sys.path to import from 'src'
 PROJECT_ROOT = Path(__file__).parent
@@ -15,16 +24,178 @@ if str(PROJECT_ROOT) not in sys.path:
 # Initialize Flask App
 app = Flask(__name__)
 
-# Load cleaned data and production model at startup
-try:
-    df_clean = pd.read_csv(config.CLEANED_DATA_FILE)
-    production_model = load_model()
+# Columns of the cleaned dataset used by the dashboard, the artist index, the plots and the charts
+DASHBOARD_COLUMNS = list(dict.fromkeys(
+    ['track', 'artist'] + config.ARTIST_INDEX_METRICS + [col for spec in PLOTS.values() for col in spec.columns]
+    + chart_columns()
+))
+
+# Plots are rendered off the request path and cached on disk per data version
+plot_service = PlotService()
+
+# Load cleaned data and production model at startup; new versions of either
+# file are picked up in the background and swapped in without a restart.
+if config.SERVE_NATIVE_MODEL:
+    # The schema is read from next to the booster, so a model served from another directory keeps its own
+    model_path = config.MODEL_BOOSTER_FILE
+    model_loader = lambda path: NativeModel.load(path, path.with_name(config.MODEL_SCHEMA_FILE.name))
+else:
+    model_path, model_loader = config.MODEL_FILE, load_model
+registry = ServingRegistry(
+    load_data=lambda path: load_compact_data(path, columns=DASHBOARD_COLUMNS),
+    load_model=model_loader,
+    data_extras={
+        'aggregates': lambda df, version: DashboardAggregates(df, version),
+        'plots': lambda df, version: plot_service.warm(df, version),
+        'charts': lambda df, version: ChartAggregates(df, version),
+    },
+    data_path=config.CLEANED_DATA_FILE,
+    model_path=model_path,
+)
+registry.refresh()
+startup_snapshot = registry.current()
+if startup_snapshot.data is not None and startup_snapshot.model is not None:
     print("Cleaned data and model loaded successfully.")
-except FileNotFoundError as e:
-    print(f"ERROR: Required file not found. {e}")
+else:
+    print("ERROR: Required file not found.")
     print("Please run the data pipeline and model training first.")
-    df_clean = None
-    production_model = None
+if config.HOT_RELOAD_ENABLED:
+    registry.start_watching()
+
+# Simulator predictions for recently seen slider settings, per model version
+prediction_cache = PredictionCache()
+
+# Metrics exposed on /metrics; counters kept by other components are read at scrape time
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    'app_request_duration_seconds', 'Time spent handling a request, by route, method and status code.',
+    ['route', 'method', 'status'], config.METRICS_REQUEST_LATENCY_BUCKETS,
+)
+predict_latency = metrics.histogram(
+    'app_model_predict_duration_seconds', 'Time spent in a single model predict call.',
+    buckets=config.METRICS_PREDICT_LATENCY_BUCKETS,
+)
+predicted_rows = metrics.counter('app_model_predicted_rows_total', 'Rows scored by the model.')
+
+
+def _artifacts():
+    snapshot = registry.current()
+    return [(name, artifact) for name, artifact in (('data', snapshot.data), ('model', snapshot.model)) if artifact]
+
+
+metrics.gauge('app_artifact_info', 'Version of the cleaned data and model being served.',
+              lambda: [({'artifact': name, 'version': artifact.version}, 1) for name, artifact in _artifacts()],
+              ['artifact', 'version'])
+metrics.gauge('app_artifact_loaded_timestamp_seconds', 'Unix time the served artifact was loaded.',
+              lambda: [({'artifact': name}, artifact.loaded_at.timestamp()) for name, artifact in _artifacts()],
+              ['artifact'])
+metrics.gauge('app_artifact_load_duration_seconds', 'Time it took to load the served artifact.',
+              lambda: [({'artifact': name}, artifact.load_seconds) for name, artifact in _artifacts()],
+              ['artifact'])
+metrics.gauge('app_prediction_cache_entries', 'Simulator predictions held in the cache.',
+              lambda: [({}, prediction_cache.stats()['size'])])
+metrics.gauge('app_prediction_cache_lookups_total', 'Prediction cache lookups, by result.',
+              lambda: [({'result': result}, prediction_cache.stats()[key]) for result, key in (('hit', 'hits'),
+                                                                                               ('miss', 'misses'))],
+              ['result'], kind='counter')
+metrics.gauge('app_prediction_cache_evictions_total', 'Entries evicted from the full prediction cache.',
+              lambda: [({}, prediction_cache.stats()['evictions'])], kind='counter')
+metrics.gauge('app_plot_renders_total', 'Plots rendered to the disk cache.',
+              lambda: [({}, plot_service.stats()['renders'])], kind='counter')
+metrics.gauge('app_plot_cache_hits_total', 'Plot requests served from the disk cache.',
+              lambda: [({}, plot_service.stats()['cache_hits'])], kind='counter')
+
+
+def predict_with(model, features: np.ndarray) -> np.ndarray:
+    """Calls `model.predict` and records its latency and row count."""
+    start = time.perf_counter()
+    predictions = model.predict(features)
+    predict_latency.observe(time.perf_counter() - start)
+    predicted_rows.inc(len(features))
+    return predictions
+
+
+# Optionally coalesce concurrent single-record predictions into batched calls
+batcher = None
+if config.MICRO_BATCHING_ENABLED:
+    batcher = MicroBatcher(lambda features: predict_with(registry.current().model.value, features))
+
+
+def score_features(snapshot: ServingSnapshot, features: np.ndarray) -> np.ndarray:
+    """
+    Score a feature matrix with the snapshot's model.
+
+    Single rows go through the micro-batcher when it is enabled; batches are
+    scored with whichever model is current when the batch is flushed.
+
+    Args:
+        snapshot (ServingSnapshot): Snapshot the request is using.
+        features (np.ndarray): Matrix in `config.MODEL_FEATURES` column order.
+
+    Returns:
+        np.ndarray: One predicted track score per row.
+    """
+    if batcher is not None and len(features) == 1:
+        return np.array([batcher.predict(features[0])])
+    return predict_with(snapshot.model.value, features)
+
+
+# Columns of the prediction feature matrix holding the clustering features
+ARCHETYPE_FEATURE_COLUMNS = [config.MODEL_FEATURES.index(feature) for feature in config.CLUSTER_FEATURES]
+
+
+def label_archetypes(features: np.ndarray) -> list[str] | None:
+    """
+    Name the song archetype of each row of a prediction feature matrix.
+
+    Args:
+        features (np.ndarray): Matrix in `config.MODEL_FEATURES` column order.
+
+    Returns:
+        list[str] | None: One archetype per row, or None if no archetype model
+        has been fitted yet.
+    """
+    try:
+        archetypes = get_archetype_model()
+    except FileNotFoundError:
+        return None
+    labels = archetypes.assign(features[:, ARCHETYPE_FEATURE_COLUMNS])
+    return [archetypes.names[label] for label in labels]
+
+
+@lru_cache(maxsize=1)
+def render_dashboard(snapshot: ServingSnapshot) -> tuple[str, str]:
+    """
+    Render the dashboard page once per data snapshot.
+
+    Only the latest snapshot is kept, so a reload invalidates the cached page.
+
+    Args:
+        snapshot (ServingSnapshot): Snapshot holding the precomputed aggregates.
+
+    Returns:
+        tuple[str, str]: The rendered HTML and its ETag.
+    """
+    aggregates = snapshot.extras['aggregates']
+    html = render_template('index.html', kpis=aggregates.kpis, top_tracks=aggregates.top_tracks)
+    return html, hashlib.sha1(html.encode('utf-8')).hexdigest()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    """Records the request's latency under its route pattern, so path parameters do not create new series."""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_latency.observe(time.perf_counter() - started, route=route, method=request.method,
+                                status=response.status_code)
+    return response
+
 
 # Define routes
 @app.route('/')
@@ -32,16 +203,21 @@ def dashboard():
     """
     Render the main dashboard with key performance indicators and top tracks.
 
+    The page is rendered once per data version and served with an ETag, so
+    repeat visits are answered with 304 Not Modified.
+
     Returns:
-        str: Rendered HTML template with KPIs and top 10 tracks.
+        Response: Rendered HTML with KPIs and top 10 tracks, or 304.
     """
-    if df_clean is None:
+    snapshot = registry.current()
+    if snapshot.data is None:
         return "Error: Cleaned data file not found. Please run the data pipeline first.", 500
 
-    kpis = get_key_performance_indicators(df_clean)
-    top_tracks = get_top_n_tracks(df_clean, n=10)
-
-    return render_template('index.html', kpis=kpis, top_tracks=top_tracks)
+    html, etag = render_dashboard(snapshot)
+    response = make_response(html)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @app.route('/simulator')
 def simulator():
@@ -61,24 +237,297 @@ def predict():
     Returns:
         str: Rendered simulator page with prediction result or error message.
     """
-    if production_model is None:
+    snapshot = registry.current()
+    if snapshot.model is None:
         return "Error: Trained model not found. Please run the modeling pipeline first.", 500
 
+    archetype = None
     try:
-        form_data = request.form.to_dict()
-        input_data = pd.DataFrame([form_data])
-        for col in input_data.columns:
-            input_data[col] = pd.to_numeric(input_data[col], errors='coerce')
-
-        input_data = input_data[config.MODEL_FEATURES]
-        predicted_score = production_model.predict(input_data)[0]
+        features = records_to_matrix([request.form.to_dict()])
+        predicted_score = prediction_cache.get_or_compute(
+            features[0], snapshot.model.version,
+            lambda row: score_features(snapshot, row[np.newaxis])[0],
+        )
         result = f"{predicted_score:.2f}"
+        archetype = (label_archetypes(features) or [None])[0]
 
     except Exception as e:
         print(f"Error during prediction: {e}")
         result = "An error occurred while processing the input data."
 
-    return render_template('simulator.html', prediction=result)
+    return render_template('simulator.html', prediction=result, archetype=archetype)
+
+@app.route('/api/predict', methods=['POST'])
+def api_predict():
+    """
+    Score a batch of tracks sent as a JSON array of feature records.
+
+    Each record maps every name in `config.MODEL_FEATURES` to a number. A single
+    JSON object is accepted as a batch of one. All records are scored with one
+    model call and labelled with their song archetype.
+
+    Returns:
+        Response: JSON with the predictions and archetypes in input order, or an
+        error message.
+    """
+    snapshot = registry.current()
+    if snapshot.model is None:
+        return jsonify(error="Trained model not found. Please run the modeling pipeline first."), 500
+
+    records = request.get_json(silent=True)
+    if isinstance(records, dict):
+        records = [records]
+    if not isinstance(records, list) or not records:
+        return jsonify(error="Request body must be a non-empty JSON array of feature records."), 400
+    if len(records) > config.API_MAX_BATCH_RECORDS:
+        return jsonify(error=f"At most {config.API_MAX_BATCH_RECORDS} records can be scored per request."), 400
+
+    try:
+        features = records_to_matrix(records)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    predictions = score_features(snapshot, features)
+    return jsonify(predictions=predictions.tolist(), archetypes=label_archetypes(features), count=len(predictions))
+
+@app.route('/api/sweep', methods=['POST'])
+def api_sweep():
+    """
+    Score a what-if sweep: one base record with one or two features varied over ranges.
+
+    The JSON body holds `base`, a feature record as accepted by /api/predict,
+    and `sweep`, a list of one or two sweeps as described in
+    `serving.sweep_axes`. The grid is built as one matrix and scored with a
+    single model call; swept values the model cannot tell apart are scored
+    once (`serving.distinct_sweep_values`).
+
+    With `contributions` set to true or 'approx', each feature's contribution
+    to every prediction is returned as well (XGBoost `pred_contribs` with
+    `approx_contribs`); 'exact' returns SHAP values, which are only computed for
+    up to `config.SWEEP_MAX_EXACT_CONTRIBUTION_ROWS` distinct grid points.
+
+    Returns:
+        Response: JSON with the values of each swept feature, the predictions
+        shaped like the grid and the contributions per feature in the same
+        shape, or an error message.
+    """
+    snapshot = registry.current()
+    if snapshot.model is None:
+        return jsonify(error="Trained model not found. Please run the modeling pipeline first."), 500
+
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify(error="Request body must be a JSON object with 'base' and 'sweep'."), 400
+    sweeps = body.get('sweep')
+    if isinstance(sweeps, dict):
+        sweeps = [sweeps]
+    if not isinstance(sweeps, list) or not 1 <= len(sweeps) <= config.SWEEP_MAX_FEATURES:
+        return jsonify(error=f"'sweep' must list 1 to {config.SWEEP_MAX_FEATURES} features to sweep."), 400
+    contributions = body.get('contributions') or None
+    if contributions is True:
+        contributions = 'approx'
+    if contributions not in (None, 'approx', 'exact'):
+        return jsonify(error="'contributions' must be true, 'approx' or 'exact'."), 400
+
+    try:
+        base = records_to_matrix([body.get('base')])[0]
+        axes = sweep_axes(sweeps)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    model = snapshot.model.value
+    distinct, inverse = distinct_sweep_values(model, axes)
+    grid = sweep_grid(base, distinct)
+    if contributions == 'exact' and len(grid) > config.SWEEP_MAX_EXACT_CONTRIBUTION_ROWS:
+        return jsonify(error=f"Exact contributions are limited to {config.SWEEP_MAX_EXACT_CONTRIBUTION_ROWS} "
+                             f"distinct grid points, this sweep has {len(grid)}; use 'approx'."), 400
+
+    distinct_shape = tuple(len(values) for values in distinct.values())
+    predictions = predict_with(model, grid).reshape(distinct_shape)[np.ix_(*inverse)]
+    response = {
+        'features': list(axes),
+        'axes': {feature: values.tolist() for feature, values in axes.items()},
+        'predictions': predictions.tolist(),
+        'scored_points': len(grid),
+        'model_version': snapshot.model.version,
+    }
+    if contributions is not None:
+        values = feature_contributions(model, grid, approximate=contributions == 'approx')
+        values = values.reshape(distinct_shape + (-1,))[np.ix_(*inverse)]
+        response['contributions'] = {name: values[..., j].tolist()
+                                     for j, name in enumerate(config.MODEL_FEATURES + ['bias'])}
+    return jsonify(response)
+
+@app.route('/api/artists')
+def api_artists():
+    """
+    Query the artist index built from the cleaned data.
+
+    Without `artist`, returns the top `limit` artists by the total of `metric`.
+    With `artist`, returns that artist's totals and ranks for every metric and
+    all of their tracks.
+
+    Query Args:
+        metric (str): Metric to rank by. Default 'spotify_streams'.
+        limit (int): Number of artists to return. Default 10.
+        artist (str): Exact artist name to look up.
+
+    Returns:
+        Response: JSON with the ranking or the artist's details, or an error message.
+    """
+    snapshot = registry.current()
+    if snapshot.data is None:
+        return jsonify(error="Cleaned data file not found. Please run the data pipeline first."), 500
+    index = snapshot.extras['aggregates'].artists
+
+    artist = request.args.get('artist')
+    try:
+        if artist is not None:
+            return jsonify(**index.summary(artist), track_list=index.tracks(artist))
+        metric = request.args.get('metric', 'spotify_streams')
+        limit = request.args.get('limit', 10, type=int)
+        return jsonify(metric=metric, artists=index.top(metric, n=limit))
+    except KeyError as e:
+        return jsonify(error=e.args[0]), 404
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+@app.route('/api/tracks')
+def api_tracks():
+    """
+    Search the tracks of the cleaned data by name prefix and metric ranges.
+
+    Query Args:
+        q (str): Prefix of any word of the track or artist name. Default: every track.
+        field (str): 'track', 'artist' or 'any'. Default 'any'.
+        min_<metric>, max_<metric> (float): Inclusive range of a metric, e.g. `min_spotify_streams`.
+        sort (str): Metric or 'track' to order by. Default 'spotify_streams'.
+        order (str): 'desc' or 'asc'. Default: most first for metrics, A to Z for 'track'.
+        limit (int): Page size, at most `config.TRACK_SEARCH_MAX_LIMIT`.
+        cursor (str): `next_cursor` of the previous page, sent with the same arguments.
+
+    Returns:
+        Response: JSON with one page of tracks, the total number of matches and
+        the cursor of the next page, or an error message.
+    """
+    snapshot = registry.current()
+    if snapshot.data is None:
+        return jsonify(error="Cleaned data file not found. Please run the data pipeline first."), 500
+    index = snapshot.extras['aggregates'].tracks
+
+    args = request.args
+    order = args.get('order')
+    if order not in (None, 'asc', 'desc'):
+        return jsonify(error="'order' must be 'asc' or 'desc'."), 400
+    # Parsed here rather than with args.get(type=int), which silently falls back to the default
+    try:
+        limit = int(args.get('limit', config.TRACK_SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        limit = None
+    if limit is None or not 1 <= limit <= config.TRACK_SEARCH_MAX_LIMIT:
+        return jsonify(error=f"'limit' must be an integer from 1 to {config.TRACK_SEARCH_MAX_LIMIT}."), 400
+
+    filters = {}
+    for name, value in args.items():
+        bound, _, metric = name.partition('_')
+        if bound not in ('min', 'max') or not metric:
+            continue
+        try:
+            value = float(value)
+        except ValueError:
+            return jsonify(error=f"'{name}' must be a number."), 400
+        low, high = filters.get(metric, (-np.inf, np.inf))
+        filters[metric] = (value, high) if bound == 'min' else (low, value)
+
+    try:
+        page = index.search(args.get('q', ''), field=args.get('field', 'any'), filters=filters,
+                            sort=args.get('sort', 'spotify_streams'),
+                            descending=None if order is None else order == 'desc',
+                            limit=limit, cursor=args.get('cursor'))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(page)
+
+@app.route('/api/charts/<name>')
+def api_chart(name: str):
+    """
+    Serve the data of a dashboard chart as binned aggregates instead of points.
+
+    Histograms come with an optional KDE curve; density charts come as a 2-D
+    count grid with the mean and quantile bands of `y` per bin of `x`. The
+    number of bins is capped, so the payload does not grow with the data. Query
+    arguments override the chart's default parameters in `src.chart_data.CHARTS`,
+    e.g. `?column=youtube_views&scale=log` or `?y=shazam_counts&x_bins=80`.
+
+    Args:
+        name (str): One of the charts in `src.chart_data.CHARTS`.
+
+    Returns:
+        Response: JSON with the chart's axes, counts and summaries, or an error message.
+    """
+    snapshot = registry.current()
+    if snapshot.data is None:
+        return jsonify(error="Cleaned data file not found. Please run the data pipeline first."), 500
+
+    try:
+        chart = snapshot.extras['charts'].get(name, request.args.to_dict())
+    except KeyError as e:
+        return jsonify(error=e.args[0]), 404
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(chart)
+
+@app.route('/plots/<name>.png')
+def plot_image(name: str):
+    """
+    Serve a plot of the current data as PNG.
+
+    Plots are rendered once per data version and parameter set and then served
+    from the disk cache; query arguments override the plot's default parameters.
+
+    Args:
+        name (str): One of the plots in `src.plotting.PLOTS`.
+
+    Returns:
+        Response: The PNG image, or an error message.
+    """
+    snapshot = registry.current()
+    if snapshot.data is None:
+        return jsonify(error="Cleaned data file not found. Please run the data pipeline first."), 500
+
+    try:
+        path = plot_service.get(name, snapshot.data.value, snapshot.data.version, request.args.to_dict())
+    except KeyError as e:
+        return jsonify(error=e.args[0]), 404
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    except TimeoutError:
+        return jsonify(error="The plot is still being rendered. Please retry shortly."), 503
+    return send_file(path, mimetype='image/png', etag=True, max_age=0, conditional=True)
+
+@app.route('/api/status')
+def status():
+    """
+    Report the versions of the cleaned data and model currently being served.
+
+    Returns:
+        Response: JSON with version, load time and load duration per artifact,
+        the state of the background watcher and the prediction cache counters.
+    """
+    return jsonify({**registry.status(), 'prediction_cache': prediction_cache.stats(), 'plots': plot_service.stats()})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Expose request and model latency histograms, cache counters and the served
+    versions in the Prometheus text format.
+
+    Returns:
+        Response: Plain-text metrics for a Prometheus scrape.
+    """
+    response = make_response(metrics.render())
+    response.headers['Content-Type'] = METRICS_CONTENT_TYPE
+    return response
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
@@ -0,0 +1,83 @@
+"""
+Inference benchmark for the saved model artifacts.
+
+Compares the joblib-pickled `XGBRegressor` (`modeling.load_model`) with the
+native booster export (`serving.NativeModel`) and reports:
+- load time of each artifact
+- p50/p99 latency of single-row predictions
+- p50/p99 latency of batch predictions
+
+Both artifacts must exist; run `python -m src.modeling --export` to create the
+native export from an existing joblib model.
+
+Usage:
+    python scripts/benchmark_inference.py [--iterations 1000] [--batch-size 1000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path to allow src imports
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src import config
+from src.modeling import load_model
+from src.serving import NativeModel
+
+
+def time_calls(fn, iterations: int) -> np.ndarray:
+    """Returns per-call wall-clock times in milliseconds."""
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings[i] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare joblib and native model load and predict latency.")
+    parser.add_argument('--iterations', type=int, default=1000, help='Timed predictions per measurement.')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per batch prediction.')
+    parser.add_argument('--loads', type=int, default=10, help='Timed loads per artifact.')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    batch = rng.lognormal(mean=10, sigma=3, size=(args.batch_size, len(config.MODEL_FEATURES))).astype(np.float32)
+    single = batch[:1]
+
+    loaders = {
+        'joblib': lambda: load_model(config.MODEL_FILE),
+        'native': lambda: NativeModel.load(config.MODEL_BOOSTER_FILE, config.MODEL_SCHEMA_FILE),
+    }
+    results = {}
+    for name, loader in loaders.items():
+        loader()  # warm up the filesystem cache
+        load_ms = time_calls(loader, args.loads)
+        model = loader()
+        model.predict(single)
+        results[name] = {
+            'load': np.median(load_ms),
+            'single': np.percentile(time_calls(lambda: model.predict(single), args.iterations), [50, 99]),
+            'batch': np.percentile(time_calls(lambda: model.predict(batch), max(1, args.iterations // 10)), [50, 99]),
+            'predictions': model.predict(batch),
+        }
+
+    print(f"\n{'artifact':<10}{'load ms':>10}{'1-row p50':>12}{'1-row p99':>12}"
+          f"{f'{args.batch_size}-row p50':>16}{f'{args.batch_size}-row p99':>16}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['load']:>10.2f}{r['single'][0]:>12.3f}{r['single'][1]:>12.3f}"
+              f"{r['batch'][0]:>16.3f}{r['batch'][1]:>16.3f}")
+
+    max_diff = np.max(np.abs(results['joblib']['predictions'] - results['native']['predictions']))
+    print(f"\nMax absolute prediction difference: {max_diff:.6g}")
+
+
+if __name__ == '__main__':
+    main()
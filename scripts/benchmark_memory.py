@@ -0,0 +1,122 @@
+"""
+Memory benchmark for web workers holding the cleaned data.
+
+Starts several worker processes at once, like gunicorn's pre-forked workers,
+and has each load the cleaned data in one of three ways:
+- parquet:      every column with its stored dtypes (`data_store.load_cleaned_data`)
+- compact:      only the web app's columns with compact dtypes, a private copy per worker
+- compact-mmap: the same, memory-mapped from one shared Arrow file
+
+For each mode it reports the DataFrame's own size, per-worker RSS before and
+after loading, and PSS (proportional set size), which splits shared pages
+between the processes mapping them and so shows what the workers cost
+together. RSS also includes allocator memory retained from reading the
+Parquet file, so it shrinks less than the frame itself.
+
+Usage:
+    python scripts/benchmark_memory.py [--workers 4] [--scale 50]
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path to allow src imports
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src import config
+
+MODES = ['parquet', 'compact', 'compact-mmap']
+
+
+def memory_kb() -> dict:
+    """Reads this process's RSS and PSS in kB from /proc (Linux only)."""
+    usage = {}
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            name, _, value = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                usage[name.lower()] = int(value.split()[0])
+    return usage
+
+
+def worker(mode: str, data_path: Path, shared_path: Path, columns: list[str],
+           loaded: multiprocessing.Barrier, measured: multiprocessing.Barrier, results):
+    import numpy as np
+    import pyarrow  # noqa: F401 - imported before the baseline so it is not counted as data
+    from src.analysis import load_compact_data
+    from src.data_store import load_cleaned_data
+
+    before = memory_kb()
+    if mode == 'parquet':
+        df = load_cleaned_data(data_path)
+    else:
+        df = load_compact_data(data_path, columns=columns, memory_map=(mode == 'compact-mmap'),
+                               shared_path=shared_path)
+    # Touch every numeric value, as serving the dashboard would, without copying columns
+    for col in df.select_dtypes('number').columns:
+        np.sum(df[col].to_numpy())
+
+    loaded.wait()
+    after = memory_kb()
+    results.put({'before': before, 'after': after, 'rows': len(df),
+                 'frame': df.memory_usage(deep=True).sum() / 1024})
+    measured.wait()
+
+
+def run_mode(mode: str, workers: int, data_path: Path, shared_path: Path, columns: list[str]) -> list[dict]:
+    context = multiprocessing.get_context('spawn')
+    loaded, measured = context.Barrier(workers), context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, data_path, shared_path, columns, loaded, measured, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of the data loading modes.")
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent worker processes per mode.')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Repeat the cleaned dataset this many times to benchmark a larger catalog.')
+    args = parser.parse_args()
+
+    from src.data_store import load_cleaned_data, save_cleaned_data
+    from src.plotting import PLOTS
+
+    # Same columns as app.DASHBOARD_COLUMNS
+    columns = list(dict.fromkeys(
+        ['track', 'artist'] + config.ARTIST_INDEX_METRICS + [col for spec in PLOTS.values() for col in spec.columns]
+    ))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = config.CLEANED_DATA_FILE
+        if args.scale > 1:
+            import pandas as pd
+            data_path = Path(tmp_dir) / 'cleaned.parquet'
+            save_cleaned_data(pd.concat([load_cleaned_data()] * args.scale, ignore_index=True), data_path)
+        shared_path = Path(tmp_dir) / 'shared.arrow'
+
+        print(f"{'mode':<14}{'rows':>10}{'frame MB':>10}{'RSS before MB':>15}{'RSS after MB':>14}"
+              f"{'data RSS MB':>13}{'PSS MB':>9}   (median per worker, {args.workers} workers)")
+        for mode in MODES:
+            measurements = run_mode(mode, args.workers, data_path, shared_path, columns)
+            before = statistics.median(m['before']['rss'] for m in measurements) / 1024
+            after = statistics.median(m['after']['rss'] for m in measurements) / 1024
+            pss = statistics.median(m['after']['pss'] for m in measurements) / 1024
+            frame = measurements[0]['frame'] / 1024
+            print(f"{mode:<14}{measurements[0]['rows']:>10,}{frame:>10.1f}{before:>15.1f}{after:>14.1f}"
+                  f"{after - before:>13.1f}{pss:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for numeric column coercion in the cleaning pipeline.
+
+Compares the original per-column `astype(str).str.replace(',', '')` +
+`pd.to_numeric` loop with `data_processing.parse_numeric_columns` on synthetic
+thousands-separated string columns, and reports rows/sec at several multiples
+of the Kaggle dataset size.
+
+Usage:
+    python scripts/benchmark_numeric_parsing.py [scale ...]   (default: 1 10 100)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path to allow src imports
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.data_processing import NUMERIC_COLS, parse_numeric_columns
+
+# Approximate row count of the Kaggle dataset
+BASE_ROWS = 4_600
+COLUMNS = ['spotify_streams'] + NUMERIC_COLS
+
+
+def make_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Builds raw-looking numeric columns: thousands-separated strings with ~10% missing."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col in COLUMNS:
+        values = pd.Series(rng.lognormal(mean=14, sigma=2, size=n_rows).astype('int64')).map('{:,}'.format)
+        values[rng.random(n_rows) < 0.1] = np.nan
+        data[col] = values
+    return pd.DataFrame(data)
+
+
+def legacy_parse(df: pd.DataFrame) -> pd.DataFrame:
+    """The original column-by-column coercion."""
+    for col in COLUMNS:
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
+    return df
+
+
+def time_best(func, df: pd.DataFrame, repeats: int = 3) -> float:
+    """Returns the best wall time of `repeats` runs on fresh copies of `df`."""
+    best = float('inf')
+    for _ in range(repeats):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(scales: list[int]):
+    print(f"Parsing {len(COLUMNS)} thousands-separated columns")
+    print(f"{'scale':>6} {'rows':>10} {'legacy rows/s':>15} {'arrow rows/s':>15} {'speedup':>8}")
+    for scale in scales:
+        n_rows = BASE_ROWS * scale
+        df = make_frame(n_rows)
+        legacy = time_best(legacy_parse, df)
+        arrow = time_best(lambda frame: parse_numeric_columns(frame, COLUMNS), df)
+        pd.testing.assert_frame_equal(legacy_parse(df.copy()), parse_numeric_columns(df.copy(), COLUMNS))
+        print(f"{scale:>5}x {n_rows:>10,} {n_rows / legacy:>15,.0f} {n_rows / arrow:>15,.0f} {legacy / arrow:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100])
@@ -0,0 +1,87 @@
+"""
+Startup benchmark for the Flask web app.
+
+Launches fresh interpreters that import `app` and serve a first prediction
+through Flask's test client, and reports:
+- import time of `app` (including loading the cleaned data and the model)
+- time to first request, from process launch to the first /api/predict response
+- whether any plotting or training-only module was imported on the serving path
+
+Exits with status 1 if a plotting/training module is imported while serving or
+if `--max-import-seconds` is exceeded, so it can guard against regressions.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--max-import-seconds SECONDS]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Modules the serving path must not import. Plots are drawn in the background
+# through matplotlib's Figure API, so only pyplot's global state is ruled out.
+FORBIDDEN_MODULES = ['matplotlib.pyplot', 'seaborn', 'plotly', 'wordcloud', 'kaggle', 'src.visualization']
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+import_seconds = time.perf_counter() - start
+from src import config
+record = dict.fromkeys(config.MODEL_FEATURES, 1)
+response = app.app.test_client().post('/api/predict', json=[record])
+first_response_at = time.time()
+print(json.dumps({{
+    'import_seconds': import_seconds,
+    'first_response_at': first_response_at,
+    'status_code': response.status_code,
+    'forbidden_imported': [m for m in {FORBIDDEN_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_probe() -> dict:
+    """Runs the probe in a fresh interpreter and returns its measurements."""
+    launched_at = time.time()
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=PROJECT_ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['time_to_first_request'] = result['first_response_at'] - launched_at
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time and time to first request.")
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes to launch.')
+    parser.add_argument('--max-import-seconds', type=float, default=None,
+                        help='Fail if the median import time exceeds this many seconds.')
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(args.runs)]
+    import_times = [r['import_seconds'] for r in results]
+    first_request_times = [r['time_to_first_request'] for r in results]
+    forbidden = sorted({m for r in results for m in r['forbidden_imported']})
+
+    print(f"Runs: {args.runs} (first /api/predict status: {results[0]['status_code']})")
+    print(f"Import app:            median {statistics.median(import_times):.3f}s, min {min(import_times):.3f}s")
+    print(f"Time to first request: median {statistics.median(first_request_times):.3f}s, "
+          f"min {min(first_request_times):.3f}s")
+    print(f"Plotting/training modules imported: {', '.join(forbidden) if forbidden else 'none'}")
+
+    failed = bool(forbidden)
+    if args.max_import_seconds is not None and statistics.median(import_times) > args.max_import_seconds:
+        print(f"FAIL: median import time exceeds {args.max_import_seconds:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
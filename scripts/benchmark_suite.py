@@ -0,0 +1,263 @@
+"""
+Benchmark suite for the whole pipeline on synthetic data.
+
+For each scale, a synthetic raw CSV of `scale` x `config.SYNTHETIC_BASE_ROWS`
+rows is generated once (`src.synthetic_data`, cached in
+`config.SYNTHETIC_DATA_DIR`) and the following are timed:
+- clean:        `data_processing.process_raw_data` (streamed in chunks with --chunksize)
+- kpis:         `analysis.get_key_performance_indicators` on the cleaned data
+- top_tracks:   `analysis.get_top_n_tracks` on the cleaned data
+- train:        `modeling.train_and_evaluate_model` on the cleaned data
+- predict_miss: /predict requests per second with a different input each time
+- predict_hit:  /predict requests per second repeating one input (prediction cache hits)
+
+The /predict benchmarks go through the Flask app's test client, with the app
+serving the model trained in the `train` benchmark and no cleaned data. Cleaned
+data and models are written to a temporary directory, so the project's own
+files are neither read nor touched.
+
+Results are saved as JSON in `config.BENCHMARK_RESULTS_DIR` and compared with
+the previous run, or with the run given by --baseline.
+
+Usage:
+    python scripts/benchmark_suite.py [--scales 1 10] [--runs 3] [--only clean train] [--baseline FILE]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path to allow src imports
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Training draws its evaluation plot with pyplot; never open a window
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+import pandas as pd
+
+from src import config
+from src.synthetic_data import synthetic_raw_file
+
+BENCHMARKS = ['clean', 'kpis', 'top_tracks', 'train', 'predict_miss', 'predict_hit']
+
+
+def timed(fn, runs: int) -> tuple[list[float], object]:
+    """Calls `fn` `runs` times with its output silenced; returns the timings and the last result."""
+    timings, result = [], None
+    for _ in range(runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def record(name: str, scale: float, rows: int, timings: list[float], units: int | None = None) -> dict:
+    """Summarizes the timings of one benchmark; throughput is `units` (default: rows) per second."""
+    median = statistics.median(timings)
+    return {
+        'benchmark': name,
+        'scale': scale,
+        'rows': rows,
+        'runs': len(timings),
+        'seconds': round(median, 6),
+        'min_seconds': round(min(timings), 6),
+        'per_second': round((units if units is not None else rows) / median, 1) if median > 0 else None,
+    }
+
+
+def serving_app(models_dir: Path):
+    """
+    Returns the web app serving the model in `models_dir` and no cleaned data.
+
+    The app loads its files when it is imported, so on first use `config` is
+    pointed at the benchmark's model and at a cleaned data file that does not
+    exist: the project's data, models and plot cache are never read or written.
+    """
+    if 'app' not in sys.modules:
+        config.CLEANED_DATA_FILE = models_dir.parent / 'no-cleaned-data.parquet'
+        config.MODEL_FILE = models_dir / config.MODEL_FILE.name
+        config.MODEL_BOOSTER_FILE = models_dir / config.MODEL_BOOSTER_FILE.name
+        config.HOT_RELOAD_ENABLED = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as web_app
+
+        # Later scales train into their own directory; the schema is read from next to the booster
+        web_app.registry.model_path = models_dir / web_app.registry.model_path.name
+        web_app.registry.refresh()
+    if web_app.registry.last_error is not None:
+        raise RuntimeError(f"The benchmark model could not be loaded: {web_app.registry.last_error}")
+    return web_app
+
+
+def benchmark_predict(models_dir: Path, requests: int, runs: int, scale: float, rows: int) -> list[dict]:
+    """Times /predict with distinct and with repeated inputs, serving the model in `models_dir`."""
+    client = serving_app(models_dir).app.test_client()
+
+    rng = np.random.default_rng(0)
+    distinct = rng.integers(0, 10_000_000, size=(requests * runs, len(config.MODEL_FEATURES)))
+    forms = [dict(zip(config.MODEL_FEATURES, map(str, row))) for row in distinct]
+
+    def post_all(batch: list[dict]):
+        for form in batch:
+            response = client.post('/predict', data=form)
+            if response.status_code != 200:
+                raise RuntimeError(f"/predict returned {response.status_code}")
+
+    batches = iter([forms[i:i + requests] for i in range(0, len(forms), requests)])
+    miss_timings, _ = timed(lambda: post_all(next(batches)), runs)
+    hit_timings, _ = timed(lambda: post_all([forms[0]] * requests), runs)
+    return [record('predict_miss', scale, rows, miss_timings, units=requests),
+            record('predict_hit', scale, rows, hit_timings, units=requests)]
+
+
+def run_scale(scale: float, args: argparse.Namespace, work_dir: Path) -> list[dict]:
+    """Runs the selected benchmarks on the synthetic dataset of one scale."""
+    from src.analysis import get_key_performance_indicators, get_top_n_tracks
+    from src.data_processing import process_raw_data
+    from src.modeling import train_and_evaluate_model
+
+    raw_path = synthetic_raw_file(scale, seed=args.seed)
+    cleaned_path = work_dir / f'cleaned_{scale:g}x.parquet'
+    models_dir = work_dir / f'models_{scale:g}x'
+    results = []
+
+    # Every other benchmark needs the cleaned data, so cleaning always runs at least once
+    clean_runs = args.runs if 'clean' in args.only else 1
+    timings, df = timed(lambda: process_raw_data(chunksize=args.chunksize, raw_file_path=raw_path,
+                                                 processed_file_path=cleaned_path), clean_runs)
+    raw_rows = int(round(scale * config.SYNTHETIC_BASE_ROWS))
+    if 'clean' in args.only:
+        results.append(record('clean', scale, raw_rows, timings))
+    rows = len(df)
+
+    if 'kpis' in args.only:
+        timings, _ = timed(lambda: get_key_performance_indicators(df), args.runs)
+        results.append(record('kpis', scale, rows, timings))
+    if 'top_tracks' in args.only:
+        timings, _ = timed(lambda: get_top_n_tracks(df), args.runs)
+        results.append(record('top_tracks', scale, rows, timings))
+    if {'train', 'predict_miss', 'predict_hit'} & set(args.only):
+        import matplotlib.pyplot as plt
+        train_runs = args.runs if 'train' in args.only else 1
+        timings, _ = timed(lambda: (train_and_evaluate_model(df, models_dir=models_dir), plt.close('all')),
+                           train_runs)
+        if 'train' in args.only:
+            results.append(record('train', scale, rows, timings))
+    if {'predict_miss', 'predict_hit'} & set(args.only):
+        predict_results = benchmark_predict(models_dir, args.requests, args.runs, scale, rows)
+        results += [result for result in predict_results if result['benchmark'] in args.only]
+    return results
+
+
+def environment() -> dict:
+    """Describes the machine, package versions and commit the benchmarks ran on."""
+    import pyarrow
+    import xgboost
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': {'numpy': np.__version__, 'pandas': pd.__version__,
+                     'pyarrow': pyarrow.__version__, 'xgboost': xgboost.__version__},
+    }
+
+
+def save_results(report: dict, results_dir: Path) -> Path:
+    """Writes the report to a results file named after its UTC start time."""
+    results_dir.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.fromisoformat(report['created_at'])
+    path = results_dir / f"benchmark-{created_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(report, results_file, indent=2)
+    return path
+
+
+def latest_results(results_dir: Path, exclude: Path | None = None) -> Path | None:
+    """Returns the most recent saved results file other than `exclude`, if any."""
+    paths = sorted(path for path in results_dir.glob('benchmark-*.json') if path != exclude)
+    return paths[-1] if paths else None
+
+
+def print_comparison(report: dict, baseline: dict | None):
+    """Prints this run's results next to the baseline's, matched by benchmark and scale."""
+    previous = {(r['benchmark'], r['scale']): r for r in baseline['results']} if baseline else {}
+    print(f"\n{'benchmark':<14}{'scale':>7}{'rows':>11}{'median s':>11}{'per second':>14}"
+          f"{'baseline s':>12}{'change':>9}")
+    for r in report['results']:
+        before = previous.get((r['benchmark'], r['scale']))
+        line = (f"{r['benchmark']:<14}{r['scale']:>7g}{r['rows']:>11,}{r['seconds']:>11.4f}"
+                f"{r['per_second'] or 0:>14,.1f}")
+        if before:
+            line += f"{before['seconds']:>12.4f}{(r['seconds'] / before['seconds'] - 1) * 100:>+8.1f}%"
+        print(line)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time the pipeline on synthetic data and compare with earlier runs.")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10],
+                        help='Dataset sizes as multiples of the Kaggle file (1 to 1000).')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per benchmark; the median time is reported.')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS,
+                        help='Benchmarks to run.')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Stream the raw CSV in chunks of this many rows while cleaning.')
+    parser.add_argument('--requests', type=int, default=200, help='/predict requests per run.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic datasets.')
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help='Results file to compare with. Defaults to the latest saved run.')
+    parser.add_argument('--no-save', action='store_true', help='Do not save the results.')
+    args = parser.parse_args(argv)
+    if any(not 0 < scale <= 1000 for scale in args.scales):
+        parser.error('--scales must be between 0 and 1000.')
+    return args
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {'runs': args.runs, 'chunksize': args.chunksize, 'requests': args.requests, 'seed': args.seed},
+        'results': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scales:
+            print(f"Benchmarking scale {scale:g}x ({int(round(scale * config.SYNTHETIC_BASE_ROWS)):,} raw rows)...")
+            report['results'] += run_scale(scale, args, Path(tmp_dir))
+
+    saved_path = None if args.no_save else save_results(report, config.BENCHMARK_RESULTS_DIR)
+    baseline_path = args.baseline or latest_results(config.BENCHMARK_RESULTS_DIR, exclude=saved_path)
+    baseline = None
+    if baseline_path is not None and baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\nComparing with {baseline_path} "
+              f"({baseline['created_at']}, commit {baseline['environment']['commit']})")
+    print_comparison(report, baseline)
+    if saved_path is not None:
+        print(f"\nResults saved to {saved_path}")
+
+
+if __name__ == '__main__':
+    main()
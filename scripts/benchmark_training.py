@@ -0,0 +1,91 @@
+"""
+Training benchmark for the track score model.
+
+Trains on the same 80/20 split as `modeling.train_and_evaluate_model` with:
+- the current configuration (`config.XGB_PARAMS`, all trees built)
+- the fast mode (`modeling.fit_fast_model`: hist trees, QuantileDMatrix, early stopping)
+
+and reports wall-clock training time, trees kept, and test R²/MAE for each.
+Nothing is saved and no plots are drawn.
+
+Usage:
+    python scripts/benchmark_training.py [--scale 1] [--runs 3]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to path to allow src imports
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import xgboost as xgb
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from src import config
+from src.data_store import load_cleaned_data
+from src.modeling import fit_fast_model, prepare_features, training_columns
+
+
+def fit_baseline(X_train: pd.DataFrame, y_train: pd.Series) -> xgb.XGBRegressor:
+    model = xgb.XGBRegressor(**config.XGB_PARAMS)
+    model.fit(X_train, y_train)
+    return model
+
+
+def benchmark(name: str, fit, X_train, y_train, X_test, y_test, runs: int) -> dict:
+    """Fits `runs` times and scores the last model on the test split."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model = fit(X_train, y_train)
+        timings.append(time.perf_counter() - start)
+
+    y_pred = model.predict(X_test)
+    booster = model.get_booster()
+    trees = booster.best_iteration + 1 if booster.attr('best_iteration') else booster.num_boosted_rounds()
+    return {
+        'name': name,
+        'seconds': statistics.median(timings),
+        'trees': trees,
+        'r2': r2_score(y_test, y_pred),
+        'mae': mean_absolute_error(y_test, y_pred),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare default and fast training time and accuracy.")
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Repeat the cleaned dataset this many times to benchmark larger inputs.')
+    parser.add_argument('--runs', type=int, default=3, help='Training runs per mode; the median time is reported.')
+    args = parser.parse_args()
+
+    df = load_cleaned_data(columns=training_columns())
+    if args.scale > 1:
+        df = pd.concat([df] * args.scale, ignore_index=True)
+    X, y = prepare_features(df)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    print(f"Training rows: {len(X_train):,}, test rows: {len(X_test):,}, runs per mode: {args.runs}")
+
+    results = [
+        benchmark('default', fit_baseline, X_train, y_train, X_test, y_test, args.runs),
+        benchmark('fast', fit_fast_model, X_train, y_train, X_test, y_test, args.runs),
+    ]
+
+    print(f"\n{'mode':<10}{'train s':>10}{'trees':>8}{'R²':>10}{'MAE':>12}")
+    for r in results:
+        print(f"{r['name']:<10}{r['seconds']:>10.2f}{r['trees']:>8}{r['r2']:>10.4f}{r['mae']:>12.4f}")
+    baseline, fast = results
+    print(f"\nSpeedup: {baseline['seconds'] / fast['seconds']:.1f}x, "
+          f"R² change: {fast['r2'] - baseline['r2']:+.4f}, MAE change: {fast['mae'] - baseline['mae']:+.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,48 +4,230 @@ Main project pipeline script.
 This script executes the entire data science workflow end-to-end:
 1. Ingests raw data from Kaggle.
 2. Cleans and processes the raw data.
-3. Trains the predictive model and saves the artifact.
+3. Merges new chart snapshots from `config.SNAPSHOT_INBOX_DIR` into the cleaned data.
+4. Trains the predictive model and saves the artifact.
+5. Clusters the tracks into song archetypes and saves the model.
+6. Renders the stream distribution plot.
+
+Each stage is fingerprinted from its inputs (file content hashes, the relevant
+`config` parameters and the source of the module that implements it). A stage
+only runs when its fingerprint differs from the one recorded in
+`config.PIPELINE_MANIFEST_FILE` or one of its outputs is missing, so rerunning
+the pipeline on unchanged data is close to free. Use `--force` to rebuild all.
+
+Every run writes the wall time, CPU time and peak memory of each stage to
+`config.PIPELINE_RUN_REPORT_FILE`.
 """
 
+import argparse
 import sys
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
 # Add project root to path to allow src imports
 PROJECT_ROOT = Path(__file__).parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
-# Import the main functions from our source modules
-from src.data_ingestion import download_data
-from src.data_processing import process_raw_data
-from src.modeling import train_and_evaluate_model
+# Heavy modules (pandas, xgboost, matplotlib) are imported inside the stages,
+# so that a run in which every stage is skipped never pays for them.
+from src import config
+from src.manifest import PipelineManifest, fingerprint
+from src.profiling import StageProfiler
+
+SRC_DIR = PROJECT_ROOT / 'src'
+STREAMS_PLOT_FILE = PROJECT_ROOT / 'static' / 'plots' / 'streams_distribution.png'
+
+
+@dataclass
+class Stage:
+    """A pipeline step with the inputs that decide whether it needs to run."""
+    name: str
+    description: str
+    inputs: Callable[[PipelineManifest], dict]
+    outputs: list[Path]
+    run: Callable[[dict], bool]
+
+
+def _ingest_inputs(manifest: PipelineManifest) -> dict:
+    return {'dataset': config.KAGGLE_DATASET_ID}
+
+
+def _clean_inputs(manifest: PipelineManifest) -> dict:
+    return {
+        'raw_data': manifest.file_digest(config.RAW_DATA_FILE),
+        'garbage_pattern': config.GARBAGE_PATTERN,
+        'critical_cols': config.CRITICAL_COLS_FOR_CLEANING,
+        'near_duplicates': [config.NEAR_DUPLICATE_DEDUP_ENABLED, config.NEAR_DUPLICATE_THRESHOLD,
+                            config.NEAR_DUPLICATE_NUM_PERM, config.NEAR_DUPLICATE_BANDS,
+                            config.NEAR_DUPLICATE_MAX_BUCKET],
+        'code': [manifest.file_digest(SRC_DIR / 'data_processing.py'),
+                 manifest.file_digest(SRC_DIR / 'data_store.py'),
+                 manifest.file_digest(SRC_DIR / 'deduplication.py')],
+    }
+
+
+def _snapshots_inputs(manifest: PipelineManifest) -> dict:
+    source_dir = config.SNAPSHOT_INBOX_DIR
+    return {
+        'snapshots': {path.name: manifest.file_digest(path) for path in sorted(source_dir.glob('*.csv'))}
+        if source_dir.exists() else {},
+        # A rebuilt store has every archived snapshot replayed on top of it
+        'clean_run': manifest.stages.get('clean', {}).get('completed_at'),
+        'near_duplicates': [config.NEAR_DUPLICATE_DEDUP_ENABLED, config.NEAR_DUPLICATE_THRESHOLD,
+                            config.NEAR_DUPLICATE_NUM_PERM, config.NEAR_DUPLICATE_BANDS,
+                            config.NEAR_DUPLICATE_MAX_BUCKET],
+        'code': [manifest.file_digest(SRC_DIR / 'snapshots.py'),
+                 manifest.file_digest(SRC_DIR / 'data_processing.py'),
+                 manifest.file_digest(SRC_DIR / 'deduplication.py')],
+    }
+
+
+def _train_inputs(manifest: PipelineManifest) -> dict:
+    return {
+        'cleaned_data': manifest.file_digest(config.CLEANED_DATA_FILE),
+        'features': config.MODEL_FEATURES,
+        'target': config.TARGET_VARIABLE,
+        'xgb_params': config.XGB_PARAMS,
+        'best_params': manifest.file_digest(config.BEST_PARAMS_FILE),
+        'fast_training': [config.FAST_TRAINING_ENABLED, config.FAST_TRAINING_PARAMS,
+                          config.FAST_TRAINING_VALIDATION_SIZE, config.FAST_TRAINING_EARLY_STOPPING_ROUNDS],
+        'code': manifest.file_digest(SRC_DIR / 'modeling.py'),
+    }
+
+
+def _cluster_inputs(manifest: PipelineManifest) -> dict:
+    return {
+        'cleaned_data': manifest.file_digest(config.CLEANED_DATA_FILE),
+        'settings': [config.CLUSTER_FEATURES, config.CLUSTER_K, config.CLUSTER_K_SWEEP,
+                     config.CLUSTER_BATCH_SIZE, config.CLUSTER_EPOCHS, config.ARCHETYPE_NAMES],
+        'code': manifest.file_digest(SRC_DIR / 'clustering.py'),
+    }
+
+
+def _plot_inputs(manifest: PipelineManifest) -> dict:
+    return {
+        'cleaned_data': manifest.file_digest(config.CLEANED_DATA_FILE),
+        'code': [manifest.file_digest(SRC_DIR / 'analysis.py'),
+                 manifest.file_digest(SRC_DIR / 'plotting.py')],
+    }
+
+
+def _run_ingest(context: dict) -> bool:
+    from src.data_ingestion import download_data
+    download_data()
+    return config.RAW_DATA_FILE.exists()
+
+
+def _run_clean(context: dict) -> bool:
+    from src.data_processing import process_raw_data
+    context['clean_df'] = process_raw_data(chunksize=context['chunksize'])
+    return context['clean_df'] is not None
+
+
+def _run_snapshots(context: dict) -> bool:
+    from src.snapshots import ingest_snapshots
+    # Later stages reload the cleaned data, which may now include merged snapshots
+    context.pop('clean_df', None)
+    return ingest_snapshots() is not None
+
+
+def _run_train(context: dict) -> bool:
+    from src.modeling import load_best_params, train_and_evaluate_model, training_columns
+    from src.data_store import load_cleaned_data
+    df = context.get('clean_df')
+    if df is None:
+        df = load_cleaned_data(columns=training_columns())
+    # Keep the parameters found by the last tuning run instead of resetting to config.XGB_PARAMS
+    params = load_best_params()
+    if params is not None:
+        print(f"Training with tuned parameters from {config.BEST_PARAMS_FILE}")
+    train_and_evaluate_model(df, params=params)
+    return True
+
+
+def _run_cluster(context: dict) -> bool:
+    from src.clustering import fit_archetypes
+    fit_archetypes()
+    return True
+
+
+def _run_plot(context: dict) -> bool:
+    from src.analysis import create_streams_distribution_plot
+    from src.data_store import load_cleaned_data
+    df = context.get('clean_df')
+    if df is None:
+        df = load_cleaned_data(columns=['spotify_streams'])
+    create_streams_distribution_plot(df)
+    return True
+
+
+STAGES = [
+    Stage('ingest', 'Ingesting Raw Data', _ingest_inputs, [config.RAW_DATA_FILE], _run_ingest),
+    Stage('clean', 'Processing and Cleaning Data', _clean_inputs, [config.CLEANED_DATA_FILE], _run_clean),
+    Stage('snapshots', 'Merging New Chart Snapshots', _snapshots_inputs, [], _run_snapshots),
+    Stage('train', 'Training Predictive Model', _train_inputs,
+          [config.MODEL_FILE, config.MODEL_BOOSTER_FILE, config.MODEL_SCHEMA_FILE], _run_train),
+    Stage('cluster', 'Clustering Song Archetypes', _cluster_inputs, [config.ARCHETYPE_MODEL_FILE], _run_cluster),
+    Stage('plot', 'Rendering Stream Distribution Plot', _plot_inputs, [STREAMS_PLOT_FILE], _run_plot),
+]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parses command-line options for the pipeline."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--force', action='store_true',
+                        help='Run every stage even if its inputs are unchanged.')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Stream the raw CSV in chunks of this many rows while cleaning.')
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    """Executes the end-to-end pipeline, skipping stages whose inputs are unchanged."""
+    args = parse_args(argv)
+    config.ensure_directories()
+    manifest = PipelineManifest()
+    profiler = StageProfiler()
+    context = {'chunksize': args.chunksize}
 
-def main():
-    """Executes the full end-to-end pipeline."""
     print("=========================================")
     print("=== Starting Analysis of Spotify's Most Streamed Songs 2024 Data Pipeline ===")
     print("=========================================")
 
-    print("\n[PIPELINE STEP 1/3] Ingesting Raw Data...")
-    download_data()
-    
-    print("\n[PIPELINE STEP 2/3] Processing and Cleaning Data...")
-    clean_df = process_raw_data()
-    
-    # Proceed only if the data processing was successful
-    if clean_df is not None:
-        print("\n[PIPELINE STEP 3/3] Training Predictive Model...")
-        # Pass the cleaned DataFrame to the training function
-        train_and_evaluate_model(clean_df) 
-        
-        print("\n=========================================")
-        print("=== PIPELINE FINISHED SUCCESSFULLY ===")
-        print("=========================================")
+    failed_stage = None
+    try:
+        for step, stage in enumerate(STAGES, start=1):
+            print(f"\n[PIPELINE STEP {step}/{len(STAGES)}] {stage.description}...")
+            with profiler.stage(stage.name) as profile:
+                stage_fingerprint = fingerprint(stage.inputs(manifest))
+                if not args.force and manifest.is_current(stage.name, stage_fingerprint, stage.outputs):
+                    profile.status = 'skipped'
+                    print("Skipped: inputs unchanged since the last run.")
+                    continue
+
+                # Proceed only if the stage was successful
+                if not stage.run(context):
+                    profile.status = 'failed'
+                    failed_stage = stage.name
+                    break
+
+            manifest.record(stage.name, stage_fingerprint)
+            manifest.save()
+    finally:
+        manifest.save()
+        profiler.save()
+        print(f"\nStage profile (written to {profiler.report_path}):")
+        print(profiler.summary())
+
+    print("\n=========================================")
+    if failed_stage is not None:
+        print(f"=== PIPELINE FAILED: '{failed_stage}' stage error. ===")
     else:
-        print("\n=========================================")
-        print("=== PIPELINE FAILED: Data processing error. ===")
-        print("=========================================")
+        print("=== PIPELINE FINISHED SUCCESSFULLY ===")
+    print("=========================================")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
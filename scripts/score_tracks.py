@@ -0,0 +1,202 @@
+"""
+Batch scoring script.
+
+Streams a CSV or Parquet file of tracks through the saved model and writes one
+predicted track score per row:
+1. Reads the input in chunks of `--chunksize` rows, loading only the needed columns.
+2. Parses thousands-separated numbers and engineers `days_since_release` the
+   same way training does. Release dates that cannot be parsed are scored as
+   missing, which XGBoost handles natively, and counted in the summary.
+3. Scores each chunk with the native booster export (`serving.NativeModel`).
+4. Appends the chunk's predictions to the output file before reading the next.
+
+Only a bounded number of chunks is held at once, so memory stays flat however
+large the input is. With `--workers N`, chunks are scored in N processes while
+the main process reads and writes in input order.
+
+Usage:
+    python scripts/score_tracks.py INPUT [--output PATH] [--chunksize ROWS] [--workers N]
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add project root to path to allow src imports
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src import config
+from src.data_processing import parse_numeric_columns
+from src.modeling import add_days_since_release
+from src.serving import NativeModel
+
+PREDICTION_COLUMN = f"predicted_{config.TARGET_VARIABLE}"
+STORED_FEATURES = [col for col in config.MODEL_FEATURES if col != 'days_since_release']
+
+# Model used by score_chunk, loaded once per process
+_model = None
+
+
+def _load_worker_model():
+    global _model
+    _model = NativeModel.load()
+
+
+def input_columns(path: Path) -> list[str]:
+    """Returns the column names of a CSV or Parquet file without reading its rows."""
+    if path.suffix == '.parquet':
+        return pq.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_chunks(path: Path, columns: list[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yields the requested columns of a CSV or Parquet file in chunks of `chunksize` rows."""
+    if path.suffix == '.parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize, low_memory=False)
+
+
+def score_chunk(chunk: pd.DataFrame, id_columns: list[str]) -> tuple[pd.DataFrame, int]:
+    """
+    Scores one chunk of tracks.
+
+    Args:
+        chunk (pd.DataFrame): Input rows with the model features, and either
+            `release_date` or `days_since_release`.
+        id_columns (list[str]): Columns copied to the output, as strings.
+
+    Returns:
+        tuple[pd.DataFrame, int]: The id columns followed by the prediction
+            column, and the number of release dates that could not be parsed.
+    """
+    parse_numeric_columns(chunk, STORED_FEATURES + ['days_since_release'])
+    invalid_dates = 0
+    if 'release_date' in chunk.columns:
+        given = chunk['release_date'].notna()
+        add_days_since_release(chunk, errors='coerce')
+        invalid_dates = int((given & chunk['release_date'].isna()).sum())
+    features = chunk[config.MODEL_FEATURES].to_numpy(dtype=np.float32, na_value=np.nan)
+
+    scored = pd.DataFrame({col: chunk[col].astype('string') for col in id_columns})
+    scored[PREDICTION_COLUMN] = _model.predict(features)
+    return scored, invalid_dates
+
+
+class PredictionWriter:
+    """Appends scored chunks to a CSV or Parquet file, chosen by its suffix."""
+
+    def __init__(self, path: Path, id_columns: list[str]):
+        self.path = path
+        self._schema = pa.schema([(col, pa.string()) for col in id_columns]
+                                 + [(PREDICTION_COLUMN, pa.float32())])
+        self._parquet_writer = None
+        self._csv_header = True
+
+    def write(self, scored: pd.DataFrame):
+        if self.path.suffix == '.parquet':
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, self._schema)
+            self._parquet_writer.write_table(pa.Table.from_pandas(scored, schema=self._schema, preserve_index=False))
+        else:
+            scored.to_csv(self.path, mode='w' if self._csv_header else 'a', header=self._csv_header,
+                          index=False, encoding='utf-8')
+            self._csv_header = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_file(input_path: Path, output_path: Path, chunksize: int = config.SCORING_CHUNK_SIZE,
+               workers: int = 1) -> int:
+    """
+    Scores every row of `input_path` and writes the predictions to `output_path`.
+
+    Args:
+        input_path (Path): CSV or Parquet file of tracks.
+        output_path (Path): Destination CSV or Parquet file.
+        chunksize (int): Rows per chunk.
+        workers (int): Processes scoring chunks; 1 scores in this process.
+
+    Returns:
+        int: Number of rows scored, including rows whose release date could
+            not be parsed.
+
+    Raises:
+        ValueError: If the input lacks a model feature or a release date.
+    """
+    available = input_columns(input_path)
+    date_column = 'release_date' if 'release_date' in available else 'days_since_release'
+    missing = [col for col in STORED_FEATURES + [date_column] if col not in available]
+    if missing:
+        raise ValueError(f"Input file is missing required columns: {missing}")
+    id_columns = [col for col in config.SCORING_ID_COLUMNS if col in available]
+    columns = id_columns + STORED_FEATURES + [date_column]
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = PredictionWriter(output_path, id_columns)
+    rows = invalid_dates = 0
+    start = time.perf_counter()
+
+    def record(result: tuple[pd.DataFrame, int]):
+        nonlocal rows, invalid_dates
+        scored, chunk_invalid_dates = result
+        writer.write(scored)
+        rows += len(scored)
+        invalid_dates += chunk_invalid_dates
+        print(f"  Scored {rows:,} rows ({rows / (time.perf_counter() - start):,.0f} rows/sec)")
+
+    try:
+        if workers <= 1:
+            _load_worker_model()
+            for chunk in read_chunks(input_path, columns, chunksize):
+                record(score_chunk(chunk, id_columns))
+        else:
+            # Keep at most two chunks per worker in flight and write them in input order
+            with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_model) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, columns, chunksize):
+                    pending.append(pool.submit(score_chunk, chunk, id_columns))
+                    if len(pending) >= 2 * workers:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows:,} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/sec).")
+    if invalid_dates:
+        print(f"Scored {invalid_dates:,} rows with an unparseable release date as having no release date.")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of tracks with the saved model.")
+    parser.add_argument('input', type=Path, nargs='?', default=config.CLEANED_DATA_FILE,
+                        help='Tracks to score (default: the cleaned dataset).')
+    parser.add_argument('--output', type=Path, default=config.PREDICTIONS_FILE,
+                        help='Destination file; .parquet or .csv.')
+    parser.add_argument('--chunksize', type=int, default=config.SCORING_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help='Processes used to score chunks.')
+    args = parser.parse_args()
+
+    print(f"Scoring {args.input} -> {args.output}")
+    score_file(args.input, args.output, chunksize=args.chunksize, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,27 @@
+import base64
+import bisect
+import json
+import os
+import re
+import unicodedata
+import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from pathlib import Path
+from src import config
+from src.data_store import CATEGORICAL_COLS, data_version, load_cleaned_data
 
 # Define output paths for static assets
 STATIC_PATH = Path(__file__).parent.parent / 'static'
 PLOTS_PATH = STATIC_PATH / 'plots'
 
 
-def load_and_prepare_data(data_path: Path) -> pd.DataFrame:
+def load_and_prepare_data(data_path: Path, columns: list[str] | None = None) -> pd.DataFrame:
     """
     Loads the cleaned dataset from a given path.
 
     Args:
-        data_path (Path): Path to the cleaned CSV file.
+        data_path (Path): Path to the cleaned Parquet file.
+        columns (list[str] | None): Columns to load. Defaults to all columns.
 
     Returns:
         pd.DataFrame: Loaded DataFrame.
@@ -21,27 +29,137 @@ def load_and_prepare_data(data_path: Path) -> pd.DataFrame:
     Raises:
         FileNotFoundError: If the file does not exist at the specified path.
     """
+    return load_cleaned_data(data_path, columns=columns)
+
+
+def compact_frame(df: pd.DataFrame, float_rtol: float = config.COMPACT_FLOAT_RTOL) -> pd.DataFrame:
+    """
+    Shrinks a DataFrame's dtypes without changing its values beyond `float_rtol`.
+
+    - Integer columns are downcast to the smallest signed integer type that holds them
+    - Float columns holding only whole numbers (and no missing values) become integers
+    - Other float columns become float32 if no value moves by more than `float_rtol`
+    - Repeated string columns (`data_store.CATEGORICAL_COLS`) become categoricals
+
+    Args:
+        df (pd.DataFrame): DataFrame to compact.
+        float_rtol (float): Largest relative error accepted for float32.
+
+    Returns:
+        pd.DataFrame: A compacted copy.
+    """
+    compact = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLS and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series) and len(series):
+            series = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy(dtype=np.float64)
+            finite = values[np.isfinite(values)]
+            if len(finite) == len(values) and len(values) and np.array_equal(finite, np.round(finite)):
+                series = pd.to_numeric(series.astype(np.int64), downcast='integer')
+            else:
+                narrowed = finite.astype(np.float32).astype(np.float64)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    error = np.abs(narrowed - finite) / np.abs(finite)
+                if np.all(np.isfinite(narrowed)) and np.all((narrowed == finite) | (error <= float_rtol)):
+                    series = series.astype(np.float32)
+        compact[col] = series
+    return pd.DataFrame(compact, index=df.index)
+
+
+def _write_shared_file(data_path: Path, shared_path: Path, source_version: str) -> None:
+    """Writes the compacted data as an uncompressed Arrow IPC file tagged with its source version."""
+    import pyarrow as pa
+
+    df = compact_frame(load_cleaned_data(data_path))
+    arrays = {}
+    for col in df.columns:
+        if pd.api.types.is_float_dtype(df[col]):
+            # Keep NaN as a value rather than a null, so readers can map the column without copying
+            arrays[col] = pa.array(df[col].to_numpy(), from_pandas=False)
+        else:
+            arrays[col] = pa.array(df[col], from_pandas=True)
+    table = pa.table(arrays).replace_schema_metadata({'source_version': source_version})
+
+    shared_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = shared_path.with_name(f"{shared_path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, shared_path)
+
+
+def load_compact_data(data_path: Path = config.CLEANED_DATA_FILE, columns: list[str] | None = None,
+                      memory_map: bool = config.COMPACT_DATA_MEMORY_MAP,
+                      shared_path: Path = config.SHARED_DATA_FILE) -> pd.DataFrame:
+    """
+    Loads the cleaned dataset with compact dtypes, optionally memory-mapped.
+
+    With `memory_map`, the compacted data is kept in an uncompressed Arrow file
+    next to the cleaned data, rebuilt whenever the cleaned data changes, and
+    mapped read-only into this process. Numeric columns then point straight into
+    the mapping, so every worker process that maps the same file shares one
+    copy in the OS page cache; only string columns are materialized per process.
+    The returned numeric arrays are read-only.
+
+    Args:
+        data_path (Path): Path to the cleaned Parquet file.
+        columns (list[str] | None): Columns to load. Defaults to all columns.
+        memory_map (bool): Map the shared Arrow file instead of reading a private copy.
+        shared_path (Path): Location of the shared Arrow file.
+
+    Returns:
+        pd.DataFrame: The dataset with compact dtypes.
+
+    Raises:
+        FileNotFoundError: If the cleaned data file does not exist.
+    """
+    if not memory_map:
+        return compact_frame(load_cleaned_data(data_path, columns=columns))
     if not data_path.exists():
         raise FileNotFoundError(f"Cleaned data file not found at {data_path}")
-    return pd.read_csv(data_path, encoding='utf-8')
+
+    import pyarrow as pa
+
+    source_version = data_version(data_path)
+    for _ in range(2):
+        if shared_path.exists():
+            table = pa.ipc.open_file(pa.memory_map(str(shared_path))).read_all()
+            if (table.schema.metadata or {}).get(b'source_version') == source_version.encode():
+                if columns is not None:
+                    table = table.select(columns)
+                return table.to_pandas(split_blocks=True)
+        _write_shared_file(data_path, shared_path, source_version)
+    raise RuntimeError(f"{data_path.name} changed while its shared copy was being written; will retry.")
 
 
-def get_key_performance_indicators(df: pd.DataFrame) -> dict:
+def get_key_performance_indicators(df: pd.DataFrame, artist_index: 'ArtistIndex | None' = None) -> dict:
     """
     Calculates key performance indicators (KPIs) from the dataset.
 
     Args:
         df (pd.DataFrame): The cleaned dataset.
+        artist_index (ArtistIndex | None): Prebuilt index of `df`; if given, the
+            artist figures are read from it instead of grouping the data again.
 
     Returns:
         dict: Dictionary containing KPIs such as total tracks, unique artists,
               average streams, and the most streamed artist.
     """
+    if artist_index is not None:
+        total_artists = len(artist_index)
+        most_popular_artist = artist_index.top('spotify_streams', n=1)[0]['artist']
+    else:
+        total_artists = df['artist'].nunique()
+        most_popular_artist = df.groupby('artist', observed=True)['spotify_streams'].sum().idxmax()
+
     kpis = {
         'total_tracks': len(df),
-        'total_artists': df['artist'].nunique(),
+        'total_artists': total_artists,
         'average_streams': f"{df['spotify_streams'].mean():,.0f}".replace(',', '.'),
-        'most_popular_artist': df.groupby('artist')['spotify_streams'].sum().idxmax()
+        'most_popular_artist': most_popular_artist
     }
     return kpis
 
@@ -63,6 +181,366 @@ def get_top_n_tracks(df: pd.DataFrame, n: int = 10) -> list[dict]:
     return result_df.to_dict(orient='records')
 
 
+def _to_json_number(value):
+    """Converts a NumPy scalar to a Python number, mapping NaN to None."""
+    value = value.item() if hasattr(value, 'item') else value
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+
+class ArtistIndex:
+    """
+    Per-artist sums, track counts and ranks for every platform metric.
+
+    Built once from the cleaned data: each artist gets a dense integer code, the
+    metrics are summed into one contiguous (artists x metrics) array, and the
+    descending order and 1-based rank of every artist are precomputed per
+    metric. Tracks are stored grouped by artist code, so an artist's tracks are
+    one contiguous slice. Lookups are array indexing and never group the data.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset with `artist`, `track` and any of
+            the metrics.
+        metrics (list[str] | None): Metrics to index. Defaults to the columns of
+            `config.ARTIST_INDEX_METRICS` present in `df`.
+    """
+
+    def __init__(self, df: pd.DataFrame, metrics: list[str] | None = None):
+        if metrics is None:
+            metrics = [col for col in config.ARTIST_INDEX_METRICS if col in df.columns]
+        self.metrics = metrics
+        self._metric_codes = {metric: i for i, metric in enumerate(metrics)}
+
+        df = df[df['artist'].notna()]
+        codes, artists = pd.factorize(df['artist'])
+        self.artists = np.asarray(artists, dtype=object)
+        self._artist_codes = {artist: code for code, artist in enumerate(self.artists)}
+        n_artists = len(self.artists)
+
+        self.counts = np.bincount(codes, minlength=n_artists)
+        values = df[metrics].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.sums = np.column_stack([
+            np.bincount(codes, weights=np.nan_to_num(values[:, i]), minlength=n_artists)
+            for i in range(len(metrics))
+        ]) if metrics else np.zeros((n_artists, 0))
+
+        # order[:, m] lists artist codes by descending total of metric m; ties keep first appearance
+        self.order = np.argsort(-self.sums, axis=0, kind='stable')
+        self.ranks = np.empty_like(self.order)
+        np.put_along_axis(self.ranks, self.order, np.arange(1, n_artists + 1)[:, np.newaxis], axis=0)
+
+        # Tracks grouped by artist code, each group sorted by descending Spotify streams
+        if 'spotify_streams' in df.columns:
+            track_order = np.lexsort((-df['spotify_streams'].to_numpy(dtype=np.float64, na_value=-np.inf), codes))
+        else:
+            track_order = np.argsort(codes, kind='stable')
+        self._track_names = df['track'].to_numpy(dtype=object)[track_order]
+        self._track_values = values[track_order]
+        self._track_offsets = np.concatenate([[0], np.cumsum(self.counts)])
+
+    def __len__(self) -> int:
+        return len(self.artists)
+
+    def _metric_code(self, metric: str) -> int:
+        if metric not in self._metric_codes:
+            raise ValueError(f"Unknown metric '{metric}'. Available metrics: {', '.join(self.metrics)}.")
+        return self._metric_codes[metric]
+
+    def _artist_code(self, artist: str) -> int:
+        if artist not in self._artist_codes:
+            raise KeyError(f"Artist '{artist}' not found.")
+        return self._artist_codes[artist]
+
+    def top(self, metric: str = 'spotify_streams', n: int = 10) -> list[dict]:
+        """
+        Returns the top N artists by the total of a metric.
+
+        Args:
+            metric (str): One of `self.metrics`.
+            n (int): Number of artists to return.
+
+        Returns:
+            list[dict]: Artist, rank, total and track count, best first.
+
+        Raises:
+            ValueError: If the metric is not indexed.
+        """
+        m = self._metric_code(metric)
+        return [
+            {'artist': self.artists[code], 'rank': rank, 'total': _to_json_number(self.sums[code, m]),
+             'tracks': int(self.counts[code])}
+            for rank, code in enumerate(self.order[:max(n, 0), m], start=1)
+        ]
+
+    def rank(self, artist: str, metric: str = 'spotify_streams') -> int:
+        """
+        Returns an artist's 1-based rank by the total of a metric.
+
+        Raises:
+            KeyError: If the artist is not in the index.
+            ValueError: If the metric is not indexed.
+        """
+        return int(self.ranks[self._artist_code(artist), self._metric_code(metric)])
+
+    def summary(self, artist: str) -> dict:
+        """
+        Returns an artist's track count and, per metric, total and rank.
+
+        Raises:
+            KeyError: If the artist is not in the index.
+        """
+        code = self._artist_code(artist)
+        return {
+            'artist': self.artists[code],
+            'tracks': int(self.counts[code]),
+            'metrics': {
+                metric: {'total': _to_json_number(self.sums[code, m]), 'rank': int(self.ranks[code, m])}
+                for m, metric in enumerate(self.metrics)
+            },
+        }
+
+    def tracks(self, artist: str) -> list[dict]:
+        """
+        Returns all tracks of an artist with their metrics, most streamed first.
+
+        Raises:
+            KeyError: If the artist is not in the index.
+        """
+        code = self._artist_code(artist)
+        start, stop = self._track_offsets[code], self._track_offsets[code + 1]
+        return [
+            {'track': name, **{metric: _to_json_number(value) for metric, value in zip(self.metrics, row)}}
+            for name, row in zip(self._track_names[start:stop], self._track_values[start:stop])
+        ]
+
+
+def normalize_name(name) -> str:
+    """
+    Normalizes a track or artist name for search.
+
+    Lower-cases, strips accents and apostrophes, and reduces other punctuation
+    and runs of whitespace to single spaces, so "Beyoncé", "BEYONCE" and
+    "beyonce" all match, as do "Don't" and "dont".
+    """
+    text = unicodedata.normalize('NFKD', str(name).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[\W_]+', ' ', re.sub(r"['’`]", '', text)).split())
+
+
+def _word_suffix_index(names: np.ndarray) -> tuple[list[str], np.ndarray]:
+    """
+    Builds a sorted prefix index over every word of every name.
+
+    Each normalized name is indexed from the start of each of its words, so a
+    prefix matches names containing a word (or run of words) that starts with it.
+
+    Returns:
+        tuple[list[str], np.ndarray]: The sorted keys, and the position in
+            `names` each key comes from.
+    """
+    keys, positions = [], []
+    for position, name in enumerate(names):
+        words = normalize_name(name).split(' ')
+        for start in range(len(words)):
+            keys.append(' '.join(words[start:]))
+            positions.append(position)
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [keys[i] for i in order], np.array(positions, dtype=np.int64)[order]
+
+
+def _prefix_range(keys: list[str], prefix: str) -> tuple[int, int]:
+    """Returns the slice of the sorted `keys` that start with `prefix`."""
+    return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + '\U0010ffff')
+
+
+class TrackIndex:
+    """
+    Search index over the tracks of the cleaned data.
+
+    Built once per data version: track and artist names are normalized and
+    indexed in sorted arrays of word-start keys, so a name prefix is found by
+    bisection; rows are grouped by artist; and every row's position in the
+    ordering by each sort key (each metric, most first, and the track name,
+    A to Z) is precomputed. A search gathers the matching rows, filters them
+    on metric ranges with array comparisons and picks one page in sort order
+    without sorting the catalog.
+
+    Pages are addressed by opaque cursors that carry the data version, so a
+    cursor from before a reload is rejected instead of skipping rows.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset with `track`, `artist` and any of the metrics.
+        data_version (str): Version of the cleaned data, embedded in cursors.
+        metrics (list[str] | None): Metrics to filter and sort by. Defaults to
+            the columns of `config.ARTIST_INDEX_METRICS` present in `df`.
+    """
+
+    def __init__(self, df: pd.DataFrame, data_version: str, metrics: list[str] | None = None):
+        if metrics is None:
+            metrics = [col for col in config.ARTIST_INDEX_METRICS if col in df.columns]
+        self.metrics = metrics
+        self.data_version = data_version
+        self.sort_keys = metrics + ['track']
+        self._default_descending = {key: key != 'track' for key in self.sort_keys}
+
+        df = df[df['track'].notna() & df['artist'].notna()]
+        self.tracks = df['track'].to_numpy(dtype=object)
+        artist_codes, artists = pd.factorize(df['artist'])
+        self.artists = np.asarray(artists, dtype=object)
+        self._artist_of_row = artist_codes
+        self.values = df[metrics].to_numpy(dtype=np.float64, na_value=np.nan)
+        n_rows = len(self.tracks)
+
+        self._track_keys, self._track_key_rows = _word_suffix_index(self.tracks)
+        self._artist_keys, self._artist_key_codes = _word_suffix_index(self.artists)
+        self._rows_by_artist = np.argsort(artist_codes, kind='stable')
+        self._artist_offsets = np.concatenate([[0], np.cumsum(np.bincount(artist_codes, minlength=len(self.artists)))])
+
+        # positions[:, k]: place of each row in the default order of sort key k; ties keep row order
+        self.positions = np.empty((n_rows, len(self.sort_keys)), dtype=np.int64)
+        for k, metric in enumerate(metrics):
+            order = np.argsort(-np.nan_to_num(self.values[:, k], nan=-np.inf), kind='stable')
+            self.positions[order, k] = np.arange(n_rows)
+        names = [normalize_name(track) for track in self.tracks]
+        self.positions[sorted(range(n_rows), key=names.__getitem__), -1] = np.arange(n_rows)
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def _matching_rows(self, query: str, field: str) -> np.ndarray | None:
+        """Returns the sorted rows whose track or artist name matches the query, or None for all rows."""
+        prefix = normalize_name(query)
+        if not prefix:
+            return None
+        matches = []
+        if field in ('any', 'track'):
+            start, stop = _prefix_range(self._track_keys, prefix)
+            matches.append(self._track_key_rows[start:stop])
+        if field in ('any', 'artist'):
+            start, stop = _prefix_range(self._artist_keys, prefix)
+            codes = np.unique(self._artist_key_codes[start:stop])
+            matches += [self._rows_by_artist[self._artist_offsets[code]:self._artist_offsets[code + 1]]
+                        for code in codes]
+        return np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int64)
+
+    def _encode_cursor(self, sort: str, descending: bool, position: int) -> str:
+        token = json.dumps([self.data_version, sort, descending, position], separators=(',', ':'))
+        return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor: str, sort: str, descending: bool) -> int:
+        try:
+            version, cursor_sort, cursor_descending, position = json.loads(base64.urlsafe_b64decode(cursor))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor.") from None
+        if version != self.data_version:
+            raise ValueError("The cursor belongs to an earlier version of the data; start the search again.")
+        if (cursor_sort, cursor_descending) != (sort, descending) or not isinstance(position, int):
+            raise ValueError("The cursor belongs to a search with a different sort order.")
+        return position
+
+    def search(self, query: str = '', field: str = 'any', filters: dict[str, tuple[float, float]] | None = None,
+               sort: str = 'spotify_streams', descending: bool | None = None, limit: int = 20,
+               cursor: str | None = None) -> dict:
+        """
+        Finds tracks by name prefix and metric ranges, one page at a time.
+
+        Args:
+            query (str): Prefix of any word of the track or artist name; empty matches every track.
+            field (str): Name to match: 'track', 'artist' or 'any'.
+            filters (dict[str, tuple[float, float]] | None): Inclusive (min, max)
+                range per metric; tracks missing the metric never match.
+            sort (str): A metric or 'track'.
+            descending (bool | None): Sort direction. Defaults to most first for
+                metrics and A to Z for names.
+            limit (int): Page size.
+            cursor (str | None): `next_cursor` of the previous page.
+
+        Returns:
+            dict: The page of tracks with their artist and metrics, the total
+                number of matches, and `next_cursor`, None on the last page.
+
+        Raises:
+            ValueError: If the field, sort key, a filtered metric, the limit or
+                the cursor is invalid.
+        """
+        if field not in ('any', 'track', 'artist'):
+            raise ValueError(f"Unknown field '{field}'; use 'track', 'artist' or 'any'.")
+        if sort not in self.sort_keys:
+            raise ValueError(f"Unknown sort key '{sort}'. Available: {', '.join(self.sort_keys)}.")
+        if limit < 1:
+            raise ValueError("The limit must be at least 1.")
+        if descending is None:
+            descending = self._default_descending[sort]
+
+        rows = self._matching_rows(query, field)
+        keep = None
+        for metric, (low, high) in (filters or {}).items():
+            if metric not in self.metrics:
+                raise ValueError(f"Unknown metric '{metric}'. Available metrics: {', '.join(self.metrics)}.")
+            values = self.values[:, self.metrics.index(metric)] if rows is None else \
+                self.values[rows, self.metrics.index(metric)]
+            in_range = (values >= low) & (values <= high)
+            keep = in_range if keep is None else keep & in_range
+        if keep is not None:
+            rows = np.flatnonzero(keep) if rows is None else rows[keep]
+
+        k = self.sort_keys.index(sort)
+        flip = descending != self._default_descending[sort]
+        if rows is None:
+            places = self.positions[:, k]
+            rows = np.arange(len(self.tracks))
+        else:
+            places = self.positions[rows, k]
+        if flip:
+            places = len(self.tracks) - 1 - places
+        total = len(rows)
+
+        if cursor is not None:
+            after = places > self._decode_cursor(cursor, sort, descending)
+            rows, places = rows[after], places[after]
+        has_more = len(rows) > limit
+        if has_more:
+            page = np.argpartition(places, limit)[:limit]
+            rows, places = rows[page], places[page]
+        order = np.argsort(places)
+        rows, places = rows[order], places[order]
+
+        # tolist() converts a whole page to Python floats at once; NaN (never equal to itself) becomes None
+        return {
+            'tracks': [
+                {'track': track, 'artist': artist,
+                 **{metric: value if value == value else None for metric, value in zip(self.metrics, values)}}
+                for track, artist, values in zip(self.tracks[rows], self.artists[self._artist_of_row[rows]],
+                                                 self.values[rows].tolist())
+            ],
+            'total': total,
+            'next_cursor': self._encode_cursor(sort, descending, int(places[-1])) if has_more else None,
+        }
+
+
+class DashboardAggregates:
+    """
+    Dashboard figures computed once per version of the cleaned data.
+
+    The cleaned dataset does not change while it is being served, so KPIs,
+    top tracks and the artist and track indexes are computed when the data is
+    loaded instead of on every request.
+
+    Attributes:
+        data_version (str): Version of the cleaned data the figures were computed from.
+        artists (ArtistIndex): Per-artist totals and ranks.
+        tracks (TrackIndex): Track search by name prefix and metric ranges.
+        kpis (dict): Output of `get_key_performance_indicators`.
+        top_tracks (list[dict]): Output of `get_top_n_tracks`.
+    """
+
+    def __init__(self, df: pd.DataFrame, data_version: str, top_n: int = 10):
+        self.data_version = data_version
+        self.artists = ArtistIndex(df)
+        self.kpis = get_key_performance_indicators(df, artist_index=self.artists)
+        self.top_tracks = get_top_n_tracks(df, n=top_n)
+        self.tracks = TrackIndex(df, data_version)
+
+
 def create_streams_distribution_plot(df: pd.DataFrame) -> str:
     """
     Creates and saves a histogram of track stream counts (in millions).
@@ -73,23 +551,10 @@ def create_streams_distribution_plot(df: pd.DataFrame) -> str:
     Returns:
         str: Relative path to the saved plot image.
     """
-    PLOTS_PATH.mkdir(parents=True, exist_ok=True)
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    sns.histplot(df['spotify_streams'] / 1_000_000, bins=30, kde=True, ax=ax, color='#1DB954')
-
-    ax.set_title('Distribution of Track Streams (in Millions)', fontsize=16, color='white')
-    ax.set_xlabel('Streams (Millions)', fontsize=12, color='white')
-    ax.set_ylabel('Track Count', fontsize=12, color='white')
-    ax.grid(axis='y', linestyle='--', alpha=0.3)
-    ax.tick_params(colors='white')
-    fig.patch.set_facecolor('#121212')
-    ax.set_facecolor('#1e1e1e')
+    # Plotting code is imported on first use to keep the web app's startup light
+    from src.plotting import render_streams_distribution, save_figure
 
     plot_filename = 'streams_distribution.png'
-    save_path = PLOTS_PATH / plot_filename
-    plt.savefig(save_path, bbox_inches='tight', facecolor=fig.get_facecolor())
-    plt.close()
+    save_figure(render_streams_distribution(df), PLOTS_PATH / plot_filename)
 
     return f'plots/{plot_filename}'
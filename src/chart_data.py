@@ -0,0 +1,439 @@
+"""
+Module for aggregating the cleaned data into compact, chart-ready JSON.
+
+Scatter and distribution charts are served as aggregates instead of points:
+1-D histograms with a binned KDE curve, 2-D density grids, and per-bin means
+and quantile bands of one column against another, which replace per-point
+trendlines such as LOWESS. Everything is computed with vectorized NumPy in
+time linear in the number of rows, and the number of bins is capped, so the
+size of a chart's payload and the work needed to render it do not depend on
+the size of the dataset. `ChartAggregates` computes the named charts in
+`CHARTS` once per data version and caches parameterized variants.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from src import config
+
+SCALES = ('linear', 'log')
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """A named chart: its kind ('histogram' or 'density') and its default parameters."""
+    kind: str
+    defaults: dict = field(default_factory=dict)
+
+
+CHARTS = {
+    'streams_distribution': ChartSpec('histogram', {
+        'column': 'spotify_streams', 'bins': 30, 'scale': 'linear', 'kde': True,
+    }),
+    'streams_vs_release_date': ChartSpec('density', {
+        'x': 'release_date', 'y': 'spotify_streams', 'x_bins': 50, 'y_bins': 40,
+        'x_scale': 'linear', 'y_scale': 'log', 'quantiles': '0.1,0.25,0.5,0.75,0.9',
+    }),
+    'popularity_vs_age': ChartSpec('density', {
+        'x': 'days_since_release', 'y': 'spotify_popularity', 'x_bins': 50, 'y_bins': 40,
+        'x_scale': 'linear', 'y_scale': 'linear', 'quantiles': '0.1,0.25,0.5,0.75,0.9',
+    }),
+}
+
+# Columns derived from a stored column when a chart asks for them
+DERIVED_COLUMNS = {'days_since_release': 'release_date'}
+
+
+def chart_columns() -> list[str]:
+    """Lists the stored columns read by the default parameters of the charts in `CHARTS`."""
+    columns = []
+    for spec in CHARTS.values():
+        for key in ('column', 'x', 'y'):
+            if key in spec.defaults:
+                columns.append(DERIVED_COLUMNS.get(spec.defaults[key], spec.defaults[key]))
+    return list(dict.fromkeys(columns))
+
+
+def column_values(df: pd.DataFrame, column: str) -> tuple[np.ndarray, bool]:
+    """
+    Reads a column as float64 for binning.
+
+    Dates become days since the Unix epoch and `days_since_release` is derived
+    from `release_date` as in `modeling.add_days_since_release`.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        column (str): A numeric or date column, or `days_since_release`.
+
+    Returns:
+        tuple[np.ndarray, bool]: The values with NaN for missing ones, and
+            whether the column holds dates.
+
+    Raises:
+        ValueError: If the column does not exist or is not numeric.
+    """
+    source = DERIVED_COLUMNS.get(column, column)
+    if source not in df.columns:
+        raise ValueError(f"Unknown column '{column}'.")
+    series = df[source]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        dates = pd.to_datetime(series)
+        if column == 'days_since_release':
+            days = (pd.Timestamp(config.DAYS_SINCE_RELEASE_REFERENCE_DATE) - dates).dt.days
+            return days.to_numpy(dtype=np.float64, na_value=np.nan), False
+        nanoseconds = dates.to_numpy(dtype='datetime64[ns]').view(np.int64).astype(np.float64)
+        nanoseconds[dates.isna().to_numpy()] = np.nan
+        return nanoseconds / 86_400e9, True
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        raise ValueError(f"Column '{column}' is not numeric.")
+    return series.to_numpy(dtype=np.float64, na_value=np.nan), False
+
+
+@dataclass(frozen=True)
+class Axis:
+    """
+    Equal-width bins over a column, in linear or log10 space.
+
+    Attributes:
+        lo (float): Lower edge, in the transformed space.
+        hi (float): Upper edge, in the transformed space.
+        bins (int): Number of bins.
+        scale (str): 'linear' or 'log'.
+        is_date (bool): Whether the values are days since the Unix epoch.
+    """
+    lo: float
+    hi: float
+    bins: int
+    scale: str
+    is_date: bool = False
+
+    @classmethod
+    def fit(cls, values: np.ndarray, bins: int, scale: str, is_date: bool = False) -> 'Axis':
+        """Spans the usable `values` (finite, and positive on a log scale) with `bins` bins."""
+        usable = transform(values, scale)
+        usable = usable[np.isfinite(usable)]
+        if not len(usable):
+            return cls(0.0, 1.0, bins, scale, is_date)
+        lo, hi = float(usable.min()), float(usable.max())
+        if hi <= lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        return cls(lo, hi, bins, scale, is_date)
+
+    def index(self, values: np.ndarray) -> np.ndarray:
+        """Returns each value's bin, or -1 if it is missing or outside the axis."""
+        t = transform(values, self.scale)
+        position = (t - self.lo) * (self.bins / (self.hi - self.lo))
+        inside = np.isfinite(position) & (position >= 0) & (position <= self.bins)
+        index = np.full(len(t), -1, dtype=np.int64)
+        index[inside] = np.minimum(position[inside].astype(np.int64), self.bins - 1)
+        return index
+
+    def grid(self, points: int) -> np.ndarray:
+        """Evenly spaced points across the axis, in the transformed space."""
+        return np.linspace(self.lo, self.hi, points)
+
+    def to_values(self, t: np.ndarray) -> list:
+        """Converts points of the transformed space back to JSON-ready values in the column's units."""
+        values = 10.0 ** t if self.scale == 'log' else t
+        if self.is_date:
+            return np.datetime_as_string(np.round(values * 86_400).astype('datetime64[s]'), unit='s').tolist()
+        return values.tolist()
+
+    def describe(self, column: str) -> dict:
+        """The axis's column, scale and bin edges as JSON."""
+        return {'column': column, 'scale': self.scale, 'type': 'date' if self.is_date else 'number',
+                'edges': self.to_values(self.grid(self.bins + 1))}
+
+
+def transform(values: np.ndarray, scale: str) -> np.ndarray:
+    """Maps values to the space bins are equal-width in; non-positive values become NaN on a log scale."""
+    if scale == 'log':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(values > 0, np.log10(values), np.nan)
+    return values
+
+
+def binned_kde(t: np.ndarray, axis: Axis, points: int = config.CHART_KDE_GRID_POINTS) -> np.ndarray:
+    """
+    Evaluates a Gaussian KDE with Scott's bandwidth on `points` points of the axis.
+
+    The values are first spread onto the evaluation grid by linear binning and
+    the grid weights are convolved with the kernel, so the cost is linear in the number of values
+    plus `points` times the kernel width, instead of values times points.
+
+    Args:
+        t (np.ndarray): Finite values in the axis's transformed space.
+        axis (Axis): Axis the curve is drawn over.
+        points (int): Number of grid points.
+
+    Returns:
+        np.ndarray: Density at each grid point; zeros if the values have no spread.
+    """
+    if len(t) < 2:
+        return np.zeros(points)
+    bandwidth = t.std(ddof=1) * len(t) ** (-1 / 5)
+    if not bandwidth > 0:
+        return np.zeros(points)
+    spacing = (axis.hi - axis.lo) / (points - 1)
+    position = np.clip((t - axis.lo) / spacing, 0, points - 1)
+    left = np.minimum(position.astype(np.int64), points - 2)
+    right_share = position - left
+    counts = (np.bincount(left, weights=1 - right_share, minlength=points)
+              + np.bincount(left + 1, weights=right_share, minlength=points))
+    reach = min(points - 1, int(np.ceil(4 * bandwidth / spacing)))
+    offsets = np.arange(-reach, reach + 1) * spacing
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    return np.convolve(counts, kernel, mode='same') / (len(t) * bandwidth * np.sqrt(2 * np.pi))
+
+
+def binned_quantiles(index: np.ndarray, order: np.ndarray, values: np.ndarray, bins: int,
+                     quantiles: list[float]) -> tuple[np.ndarray, dict[float, np.ndarray]]:
+    """
+    Computes the quantiles of `values` within each bin, like `np.quantile` per bin.
+
+    Args:
+        index (np.ndarray): Bin of each value, in [0, bins]; values in bin
+            `bins` are left out.
+        order (np.ndarray): Positions of `values` in ascending order.
+        values (np.ndarray): The values; those left out may be NaN.
+        bins (int): Number of bins, at most 32,766.
+        quantiles (list[float]): Quantiles to compute, each in [0, 1].
+
+    Returns:
+        tuple[np.ndarray, dict[float, np.ndarray]]: The number of values per bin,
+            and each quantile per bin (NaN for empty bins).
+    """
+    # A stable sort by bin keeps each bin's values in ascending order; bins fit
+    # in 16 bits, which NumPy sorts with a linear-time radix sort
+    sorted_values = values[order[np.argsort(index[order].astype(np.int16), kind='stable')]]
+    if not len(sorted_values):
+        sorted_values = np.full(1, np.nan)
+    counts = np.bincount(index, minlength=bins + 1)[:bins]
+    starts = np.cumsum(counts) - counts
+    last = np.maximum(starts + counts - 1, 0)
+    result = {}
+    for q in quantiles:
+        position = starts + q * np.maximum(counts - 1, 0)
+        below = np.minimum(np.floor(position).astype(np.int64), last)
+        above = np.minimum(below + 1, last)
+        with np.errstate(invalid='ignore'):
+            estimate = sorted_values[below] + (sorted_values[above] - sorted_values[below]) * (position - below)
+        result[q] = np.where(counts > 0, estimate, np.nan)
+    return counts, result
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Converts an array to a JSON-ready list, mapping NaN to None."""
+    return [None if value != value else value for value in values.tolist()]
+
+
+def histogram_chart(df: pd.DataFrame, column: str, bins: int, scale: str, kde: bool) -> dict:
+    """
+    Bins a column into a histogram, optionally with a KDE curve scaled to counts per bin.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        column (str): Column to bin; see `column_values`.
+        bins (int): Number of bins, at most `config.CHART_MAX_BINS`.
+        scale (str): 'linear' or 'log' (bins of equal width in log10 space).
+        kde (bool): Add a kernel density estimate at `config.CHART_KDE_GRID_POINTS` points.
+
+    Returns:
+        dict: The axis and its edges, counts per bin, the rows binned and left
+            out (missing, or not positive on a log scale) and the optional curve.
+    """
+    values, is_date = column_values(df, column)
+    axis = Axis.fit(values, bins, scale, is_date)
+    index = axis.index(values)
+    binned = index >= 0
+    chart = {
+        'x': axis.describe(column),
+        'counts': np.bincount(index[binned], minlength=bins).tolist(),
+        'rows': int(binned.sum()),
+        'excluded': int(len(values) - binned.sum()),
+    }
+    if kde:
+        grid = axis.grid(config.CHART_KDE_GRID_POINTS)
+        density = binned_kde(transform(values, scale)[binned], axis)
+        bin_width = (axis.hi - axis.lo) / bins
+        chart['kde'] = {'x': axis.to_values(grid), 'y': (density * binned.sum() * bin_width).tolist()}
+    return chart
+
+
+def density_chart(df: pd.DataFrame, x: str, y: str, x_bins: int, y_bins: int, x_scale: str, y_scale: str,
+                  quantiles: list[float], y_order: np.ndarray | None = None) -> dict:
+    """
+    Bins two columns into a 2-D count grid and summarizes `y` per bin of `x`.
+
+    The per-bin mean and quantile bands stand in for a scatter plot's
+    trendline: they show the same relationship at a fixed size.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        x (str): Column along the horizontal axis; see `column_values`.
+        y (str): Column along the vertical axis.
+        x_bins (int): Bins along x, at most `config.CHART_MAX_GRID_BINS`.
+        y_bins (int): Bins along y, at most `config.CHART_MAX_GRID_BINS`.
+        x_scale (str): 'linear' or 'log'.
+        y_scale (str): 'linear' or 'log'.
+        quantiles (list[float]): Quantiles of `y` to report per bin of `x`.
+        y_order (np.ndarray | None): Precomputed `np.argsort` of the `y` values,
+            NaN last. Computed if not given.
+
+    Returns:
+        dict: Both axes with their edges, the counts as a (y_bins x x_bins)
+            grid, the rows binned and left out, and per bin of x the row count,
+            mean and quantiles of y (None for empty bins).
+    """
+    x_values, x_is_date = column_values(df, x)
+    y_values, y_is_date = column_values(df, y)
+    x_axis = Axis.fit(x_values, x_bins, x_scale, x_is_date)
+    y_axis = Axis.fit(y_values, y_bins, y_scale, y_is_date)
+    x_index, y_index = x_axis.index(x_values), y_axis.index(y_values)
+    binned = (x_index >= 0) & (y_index >= 0)
+    rows = int(binned.sum())
+
+    # Rows outside either axis go to one extra bin that is dropped, so no array is filtered
+    cells = np.bincount(np.where(binned, y_index * x_bins + x_index, x_bins * y_bins),
+                        minlength=x_bins * y_bins + 1)[:-1]
+    trend_index = np.where(binned, x_index, x_bins)
+    if y_order is None:
+        y_order = np.argsort(y_values, kind='stable')
+    counts, bands = binned_quantiles(trend_index, y_order, y_values, x_bins, quantiles)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(trend_index, weights=np.where(binned, y_values, 0.0), minlength=x_bins + 1)[:-1] / counts
+
+    return {
+        'x': x_axis.describe(x),
+        'y': y_axis.describe(y),
+        'counts': cells.reshape(y_bins, x_bins).tolist(),
+        'rows': rows,
+        'excluded': len(x_values) - rows,
+        'trend': {
+            'x': x_axis.to_values(x_axis.lo + (np.arange(x_bins) + 0.5) * (x_axis.hi - x_axis.lo) / x_bins),
+            'count': counts.tolist(),
+            'mean': _nullable(means),
+            'quantiles': {f'{q:g}': _nullable(band) for q, band in bands.items()},
+        },
+    }
+
+
+def _parse_quantiles(value: str) -> list[float]:
+    try:
+        quantiles = sorted({float(part) for part in value.split(',') if part.strip()})
+    except ValueError:
+        raise ValueError(f"'quantiles' must be comma-separated numbers, got {value!r}.") from None
+    if not quantiles or len(quantiles) > 9 or not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("'quantiles' must list 1 to 9 values between 0 and 1.")
+    return quantiles
+
+
+def resolve_params(name: str, params: dict | None = None) -> dict:
+    """
+    Merges request parameters into a chart's defaults and validates them.
+
+    Raises:
+        KeyError: If the chart does not exist.
+        ValueError: If a parameter is unknown, cannot be converted or is out of range.
+    """
+    if name not in CHARTS:
+        raise KeyError(f"Unknown chart '{name}'. Available charts: {', '.join(CHARTS)}.")
+    defaults = CHARTS[name].defaults
+    resolved = dict(defaults)
+    for key, value in (params or {}).items():
+        if key not in defaults:
+            raise ValueError(f"Unknown parameter '{key}' for chart '{name}'.")
+        if isinstance(defaults[key], bool) and isinstance(value, str):
+            value = value.lower() in ('1', 'true', 'yes')
+        try:
+            resolved[key] = type(defaults[key])(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for '{key}': {value!r}.") from None
+
+    for key, value in resolved.items():
+        if key.endswith('scale') and value not in SCALES:
+            raise ValueError(f"'{key}' must be one of {', '.join(SCALES)}.")
+    if 'bins' in resolved and not 1 <= resolved['bins'] <= config.CHART_MAX_BINS:
+        raise ValueError(f"'bins' must be between 1 and {config.CHART_MAX_BINS}.")
+    for key in ('x_bins', 'y_bins'):
+        if key in resolved and not 1 <= resolved[key] <= config.CHART_MAX_GRID_BINS:
+            raise ValueError(f"'{key}' must be between 1 and {config.CHART_MAX_GRID_BINS}.")
+    if 'quantiles' in resolved:
+        _parse_quantiles(resolved['quantiles'])
+    return resolved
+
+
+class ChartAggregates:
+    """
+    Chart data for one version of the cleaned data, cached per parameter set.
+
+    The default variant of every chart in `CHARTS` is computed when the data is
+    loaded; other parameters are computed on first request and kept in a
+    bounded LRU cache. The sort order of each column used as a density chart's
+    `y` is kept as well, so its quantile bands are linear-time after the first
+    request.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        data_version (str): Version of the cleaned data.
+        max_entries (int): Parameterized charts kept in the cache.
+    """
+
+    def __init__(self, df: pd.DataFrame, data_version: str, max_entries: int = config.CHART_CACHE_SIZE):
+        self.df = df
+        self.data_version = data_version
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._orders: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        for name in CHARTS:
+            self.get(name)
+
+    def _y_order(self, column: str) -> np.ndarray:
+        with self._lock:
+            order = self._orders.get(column)
+        if order is None:
+            order = np.argsort(column_values(self.df, column)[0], kind='stable')
+            with self._lock:
+                self._orders[column] = order
+        return order
+
+    def _compute(self, name: str, params: dict) -> dict:
+        if CHARTS[name].kind == 'histogram':
+            data = histogram_chart(self.df, **params)
+        else:
+            params = {**params, 'quantiles': _parse_quantiles(params['quantiles'])}
+            data = density_chart(self.df, **params, y_order=self._y_order(params['y']))
+        return {'chart': name, 'kind': CHARTS[name].kind, 'data_version': self.data_version, **data}
+
+    def get(self, name: str, params: dict | None = None) -> dict:
+        """
+        Returns a chart's data, computing it if this parameter set is not cached.
+
+        Args:
+            name (str): One of the charts in `CHARTS`.
+            params (dict | None): Overrides of the chart's default parameters.
+
+        Returns:
+            dict: The chart data, ready to be sent as JSON.
+
+        Raises:
+            KeyError: If the chart does not exist.
+            ValueError: If the parameters are invalid or name an unusable column.
+        """
+        params = resolve_params(name, params)
+        key = (name, json.dumps(params, sort_keys=True))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        chart = self._compute(name, params)
+        with self._lock:
+            self._entries[key] = chart
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return chart
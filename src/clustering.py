@@ -0,0 +1,326 @@
+"""
+Module for clustering tracks into song archetypes.
+
+Promotes the analysis in `notebooks/03_Clustering.ipynb` to a pipeline step:
+the success-profile features are log1p-transformed and standardized, and
+K-Means groups the tracks into archetypes named after their mean Spotify
+streams. Both the scaler and the centroids are fitted with mini-batches streamed
+from the cleaned Parquet file, so memory use does not grow with the catalog, and
+the elbow sweep over k runs in parallel processes.
+
+The fitted model is stored as plain JSON, and `assign_archetype` labels a new
+track with a few NumPy operations.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pyarrow.parquet as pq
+from src import config
+from src.data_store import data_version
+
+
+def _iter_feature_batches(data_path: Path, batch_size: int) -> Iterator[np.ndarray]:
+    """Yields the cluster features as float64 arrays, with missing values as 0."""
+    parquet_file = pq.ParquetFile(data_path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=config.CLUSTER_FEATURES):
+        raw = np.column_stack([batch.column(name).to_numpy(zero_copy_only=False) for name in config.CLUSTER_FEATURES])
+        yield np.nan_to_num(raw.astype(np.float64), nan=0.0)
+
+
+def _log_transform(raw: np.ndarray) -> np.ndarray:
+    return np.log1p(np.clip(raw, 0, None))
+
+
+def _fit_scaler(data_path: Path, batch_size: int) -> tuple[np.ndarray, np.ndarray, int]:
+    """Computes the mean and standard deviation of the log features in one streaming pass."""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for raw in _iter_feature_batches(data_path, batch_size):
+        scaler.partial_fit(_log_transform(raw))
+    if not hasattr(scaler, 'n_samples_seen_'):
+        n_features = len(config.CLUSTER_FEATURES)
+        return np.zeros(n_features), np.ones(n_features), 0
+    return scaler.mean_, scaler.scale_, int(scaler.n_samples_seen_)
+
+
+def _fit_centroids(data_path: Path, k: int, mean: np.ndarray, scale: np.ndarray,
+                   batch_size: int, epochs: int, seed: int) -> dict:
+    """
+    Fits mini-batch K-Means for one k and measures it in a final streaming pass.
+
+    Returns:
+        dict: Centroids in scaled space, inertia, cluster sizes and the mean raw
+            feature values per cluster.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    start = time.perf_counter()
+    kmeans = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, random_state=seed, n_init=3)
+    for _ in range(epochs):
+        for raw in _iter_feature_batches(data_path, batch_size):
+            kmeans.partial_fit((_log_transform(raw) - mean) / scale)
+
+    centroids = kmeans.cluster_centers_
+    inertia = 0.0
+    counts = np.zeros(k, dtype=np.int64)
+    sums = np.zeros((k, len(config.CLUSTER_FEATURES)))
+    for raw in _iter_feature_batches(data_path, batch_size):
+        distances = _squared_distances((_log_transform(raw) - mean) / scale, centroids)
+        labels = distances.argmin(axis=1)
+        inertia += distances[np.arange(len(labels)), labels].sum()
+        counts += np.bincount(labels, minlength=k)
+        np.add.at(sums, labels, raw)
+
+    return {
+        'k': k,
+        'centroids': centroids,
+        'inertia': float(inertia),
+        'counts': counts,
+        'profile': sums / np.maximum(counts, 1)[:, np.newaxis],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _squared_distances(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Returns the squared Euclidean distance of every point to every centroid."""
+    return (
+        (points ** 2).sum(axis=1)[:, np.newaxis]
+        - 2 * points @ centroids.T
+        + (centroids ** 2).sum(axis=1)[np.newaxis, :]
+    )
+
+
+class ArchetypeModel:
+    """
+    Fitted song-archetype clustering: the feature scaling and the named centroids.
+
+    Args:
+        mean (np.ndarray): Mean of each log1p feature.
+        scale (np.ndarray): Standard deviation of each log1p feature.
+        centroids (np.ndarray): Cluster centers in standardized space, shape (k, features).
+        names (list[str]): Archetype name of each centroid.
+        metadata (dict | None): Fit details kept with the model (profile, sweep, sizes).
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, centroids: np.ndarray,
+                 names: list[str], metadata: dict | None = None):
+        self.features = config.CLUSTER_FEATURES
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.names = list(names)
+        self.metadata = metadata or {}
+
+    def assign(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Returns the cluster index of each row of raw (untransformed) feature values.
+
+        Args:
+            raw (np.ndarray): Array of shape (n, len(config.CLUSTER_FEATURES)); NaN counts as 0.
+
+        Returns:
+            np.ndarray: Index into `names` for each row.
+        """
+        raw = np.nan_to_num(np.atleast_2d(np.asarray(raw, dtype=np.float64)), nan=0.0)
+        return _squared_distances((_log_transform(raw) - self.mean) / self.scale, self.centroids).argmin(axis=1)
+
+    def assign_archetype(self, record: dict) -> str:
+        """
+        Names the archetype of one track.
+
+        Args:
+            record (dict): Mapping with a number or numeric string for each
+                cluster feature; missing or empty values count as 0.
+
+        Returns:
+            str: The archetype name.
+
+        Raises:
+            ValueError: If a value is not numeric.
+        """
+        raw = np.zeros(len(self.features))
+        for j, feature in enumerate(self.features):
+            value = record.get(feature)
+            if value is None or value == '':
+                continue
+            try:
+                raw[j] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Non-numeric value for '{feature}': {value!r}.") from None
+        return self.names[self.assign(raw)[0]]
+
+    def save(self, model_path: Path = config.ARCHETYPE_MODEL_FILE) -> None:
+        """Writes the model as JSON through a temporary file."""
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'features': self.features,
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'centroids': self.centroids.tolist(),
+            'names': self.names,
+            **self.metadata,
+        }
+        tmp_path = model_path.with_name(model_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as model_file:
+            json.dump(payload, model_file, indent=2)
+        os.replace(tmp_path, model_path)
+
+    @classmethod
+    def load(cls, model_path: Path = config.ARCHETYPE_MODEL_FILE) -> 'ArchetypeModel':
+        """
+        Loads a model written by `save`.
+
+        Raises:
+            FileNotFoundError: If the model file does not exist.
+            ValueError: If it was fitted on different features than `config.CLUSTER_FEATURES`.
+        """
+        if not model_path.exists():
+            raise FileNotFoundError(f"Archetype model not found at: {model_path}")
+        with open(model_path, encoding='utf-8') as model_file:
+            payload = json.load(model_file)
+        if payload['features'] != config.CLUSTER_FEATURES:
+            raise ValueError("Archetype model features do not match config.CLUSTER_FEATURES.")
+        metadata = {key: value for key, value in payload.items()
+                    if key not in ('features', 'mean', 'scale', 'centroids', 'names')}
+        return cls(payload['mean'], payload['scale'], payload['centroids'], payload['names'], metadata)
+
+
+def _name_clusters(profile: np.ndarray) -> list[str]:
+    """Names clusters by descending mean Spotify streams, as in the clustering notebook."""
+    k = len(profile)
+    names = config.ARCHETYPE_NAMES if k == len(config.ARCHETYPE_NAMES) else [f'Archetype {i + 1}' for i in range(k)]
+    order = np.argsort(-profile[:, config.CLUSTER_FEATURES.index('spotify_streams')], kind='stable')
+    cluster_names = [''] * k
+    for position, cluster in enumerate(order):
+        cluster_names[cluster] = names[position]
+    return cluster_names
+
+
+def fit_archetypes(data_path: Path = config.CLEANED_DATA_FILE, k: int = config.CLUSTER_K,
+                   k_sweep: list[int] = config.CLUSTER_K_SWEEP, batch_size: int = config.CLUSTER_BATCH_SIZE,
+                   epochs: int = config.CLUSTER_EPOCHS, n_workers: int | None = None, seed: int = 42,
+                   model_path: Path = config.ARCHETYPE_MODEL_FILE) -> ArchetypeModel:
+    """
+    Fits the song-archetype model and saves it.
+
+    This function:
+    - Fits the log1p + standard scaling in one streaming pass
+    - Fits mini-batch K-Means for every k in `k_sweep` (and `k`) in parallel processes
+    - Reports the elbow curve (inertia per k)
+    - Names the clusters for `k` and saves scaler, centroids and profile as JSON
+
+    Args:
+        data_path (Path): Cleaned Parquet file.
+        k (int): Number of archetypes in the saved model; lowered to the
+            number of tracks if there are fewer.
+        k_sweep (list[int]): Values of k fitted for the elbow curve.
+        batch_size (int): Rows per mini-batch.
+        epochs (int): Passes over the data per fit.
+        n_workers (int | None): Processes for the sweep. Defaults to one per core.
+        seed (int): Random seed for centroid initialization.
+        model_path (Path): Destination of the model file.
+
+    Returns:
+        ArchetypeModel: The fitted model.
+
+    Raises:
+        FileNotFoundError: If the cleaned data file does not exist.
+        ValueError: If the cleaned data has no tracks to cluster.
+    """
+    if not data_path.exists():
+        raise FileNotFoundError(f"Cleaned data file not found at {data_path}")
+
+    print("Starting song archetype clustering...")
+    start = time.perf_counter()
+    mean, scale, n_tracks = _fit_scaler(data_path, batch_size)
+    scale = np.where(scale > 0, scale, 1.0)
+    if n_tracks == 0:
+        raise ValueError("The cleaned data has no tracks with clustering features to cluster.")
+    if k > n_tracks:
+        print(f"Warning: k={k} exceeds the {n_tracks:,} tracks available; fitting k={n_tracks} instead.")
+        k = n_tracks
+    ks = sorted(set(k_sweep) | {k})
+    skipped = [value for value in ks if value > n_tracks]
+    if skipped:
+        print(f"Skipping k in {skipped} from the sweep: more clusters than the {n_tracks:,} tracks.")
+    ks = [value for value in ks if value <= n_tracks]
+    n_workers = max(1, min(len(ks), n_workers or os.cpu_count() or 1))
+    print(f"Fitting mini-batch K-Means for k in {ks} on {n_tracks:,} tracks with {n_workers} worker(s)...")
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(_fit_centroids, data_path, value, mean, scale, batch_size, epochs, seed)
+                   for value in ks]
+        fits = {fit['k']: fit for fit in (future.result() for future in futures)}
+
+    print("Elbow curve (k: inertia):")
+    for value in ks:
+        print(f"  {value:>3}: {fits[value]['inertia']:,.1f}")
+
+    chosen = fits[k]
+    names = _name_clusters(chosen['profile'])
+    model = ArchetypeModel(mean, scale, chosen['centroids'], names, metadata={
+        'k': k,
+        'n_tracks': n_tracks,
+        'cluster_sizes': dict(zip(names, chosen['counts'].tolist())),
+        'profile': {name: dict(zip(config.CLUSTER_FEATURES, row.tolist()))
+                    for name, row in zip(names, chosen['profile'])},
+        'elbow': {str(value): fits[value]['inertia'] for value in ks},
+    })
+    model.save(model_path)
+    print(f"Archetype model saved to: {model_path}")
+    print(f"Song archetype clustering finished in {time.perf_counter() - start:.1f}s.")
+    return model
+
+
+# Saved model used by assign_archetype, reloaded when its file changes
+_saved_model: tuple[str, ArchetypeModel] | None = None
+
+
+def get_archetype_model(model_path: Path = config.ARCHETYPE_MODEL_FILE) -> ArchetypeModel:
+    """
+    Returns the saved archetype model, loading it again only if its file was rewritten.
+
+    Raises:
+        FileNotFoundError: If the model file does not exist.
+    """
+    global _saved_model
+    if not model_path.exists():
+        raise FileNotFoundError(f"Archetype model not found at: {model_path}")
+    version = f"{model_path}:{data_version(model_path)}"
+    if _saved_model is None or _saved_model[0] != version:
+        _saved_model = (version, ArchetypeModel.load(model_path))
+    return _saved_model[1]
+
+
+def assign_archetype(record: dict, model_path: Path = config.ARCHETYPE_MODEL_FILE) -> str:
+    """
+    Names the archetype of one track with the saved model.
+
+    Args:
+        record (dict): Mapping of cluster feature name to value.
+        model_path (Path): Saved archetype model.
+
+    Returns:
+        str: The archetype name.
+
+    Raises:
+        FileNotFoundError: If the model file does not exist.
+        ValueError: If a value is not numeric.
+    """
+    return get_archetype_model(model_path).assign_archetype(record)
+
+
+if __name__ == '__main__':
+    print("Running clustering module as a standalone script...")
+    if config.CLEANED_DATA_FILE.exists():
+        fit_archetypes()
+    else:
+        print(f"Error: Cleaned dataset not found at {config.CLEANED_DATA_FILE}")
+        print("Please execute the data processing script before clustering.")
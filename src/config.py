@@ -25,12 +25,32 @@ PROCESSED_DATA_DIR = DATA_DIR / 'processed'
 
 # File paths
 RAW_DATA_FILE = RAW_DATA_DIR / 'most_streamed_spotify_songs_2024.csv'
-CLEANED_DATA_FILE = PROCESSED_DATA_DIR / 'cleaned_spotify_data_2024.csv'
+CLEANED_DATA_FILE = PROCESSED_DATA_DIR / 'cleaned_spotify_data_2024.parquet'
+# Compact, memory-mappable copy of the cleaned data shared by web workers
+SHARED_DATA_FILE = PROCESSED_DATA_DIR / 'cleaned_spotify_data_2024.arrow'
+CLEANED_DATA_CSV_FILE = PROCESSED_DATA_DIR / 'cleaned_spotify_data_2024.csv'
 MODEL_FILE = MODELS_DIR / 'track_score_predictor.joblib'
+# Pickle-free export of the same model: native XGBoost booster + feature schema
+MODEL_BOOSTER_FILE = MODELS_DIR / 'track_score_predictor.ubj'
+MODEL_SCHEMA_FILE = MODELS_DIR / 'track_score_predictor.schema.json'
+PREDICTIONS_FILE = PROCESSED_DATA_DIR / 'track_score_predictions.parquet'
+PIPELINE_MANIFEST_FILE = DATA_DIR / 'pipeline_manifest.json'
+PIPELINE_RUN_REPORT_FILE = DATA_DIR / 'pipeline_run_report.json'
+ARCHETYPE_MODEL_FILE = MODELS_DIR / 'song_archetypes.json'
+BEST_PARAMS_FILE = MODELS_DIR / 'best_params.json'
+CV_REPORT_FILE = MODELS_DIR / 'cv_report.json'
+
+
+def ensure_directories():
+    """
+    Creates the project's data, model and report directories if missing.
+
+    Called by the steps that write to them rather than at import time, so
+    that importing the configuration has no side effects.
+    """
+    for path in [RAW_DATA_DIR, SNAPSHOT_INBOX_DIR, PROCESSED_DATA_DIR, MODELS_DIR, PLOTS_DIR]:
+        path.mkdir(parents=True, exist_ok=True)
 
-# Ensure required directories exist
-for path in [RAW_DATA_DIR, PROCESSED_DATA_DIR, MODELS_DIR, PLOTS_DIR]:
-    path.mkdir(parents=True, exist_ok=True)
 
 # Data ingestion settings
 KAGGLE_DATASET_ID = 'nelgiriyewithana/most-streamed-spotify-songs-2024'
@@ -43,7 +63,32 @@ PROXY_URL = None
 GARBAGE_PATTERN = r'\ufffd|ý'
 CRITICAL_COLS_FOR_CLEANING = ['track', 'artist']
 
+# Near-duplicate track detection (src.deduplication), run after exact deduplication
+NEAR_DUPLICATE_DEDUP_ENABLED = True
+# Same-artist titles whose character 3-gram Jaccard similarity reaches this are merged.
+NEAR_DUPLICATE_THRESHOLD = 0.85
+# MinHash signature length, split into bands of NEAR_DUPLICATE_NUM_PERM / NEAR_DUPLICATE_BANDS rows.
+NEAR_DUPLICATE_NUM_PERM = 32
+NEAR_DUPLICATE_BANDS = 8
+# LSH buckets larger than this are not expanded into candidate pairs.
+NEAR_DUPLICATE_MAX_BUCKET = 200
+
+# Incremental snapshot ingestion (src.snapshots)
+# New raw chart snapshots, in the Kaggle export format, are picked up from here in name order.
+SNAPSHOT_INBOX_DIR = RAW_DATA_DIR / 'snapshots_inbox'
+# Ingested snapshots: raw copies under raw/, per-snapshot change logs under changes/,
+# history.json and the hashes of the raw rows already ingested (row_hashes.npy).
+SNAPSHOTS_DIR = DATA_DIR / 'snapshots'
+
+# Streaming (chunked) processing settings
+# Rows per chunk when process_raw_data runs in streaming mode.
+PROCESSING_CHUNK_SIZE = 100_000
+# Maximum number of leading bytes fed to chardet when detecting the raw encoding.
+ENCODING_SAMPLE_BYTES = 1024 * 1024
+
 # Modeling settings
+# days_since_release is counted up to this date.
+DAYS_SINCE_RELEASE_REFERENCE_DATE = '2025-07-07'
 TARGET_VARIABLE = 'track_score'
 
 MODEL_FEATURES = [
@@ -71,3 +116,144 @@ XGB_PARAMS = {
     'random_state': 42,
     'n_jobs': -1
 }
+
+# Fast training mode (modeling.fit_fast_model): histogram trees on a
+# QuantileDMatrix, stopped early on a validation split of the training data.
+FAST_TRAINING_ENABLED = False
+FAST_TRAINING_PARAMS = {
+    'tree_method': 'hist',
+    'max_bin': 256,
+}
+FAST_TRAINING_VALIDATION_SIZE = 0.1
+FAST_TRAINING_EARLY_STOPPING_ROUNDS = 50
+
+# Hyperparameter tuning settings (modeling.tune_hyperparameters)
+# Values sampled for each random-search trial, on top of XGB_PARAMS.
+TUNING_SEARCH_SPACE = {
+    'learning_rate': [0.01, 0.02, 0.05, 0.1],
+    'max_depth': [3, 4, 5, 6, 8],
+    'min_child_weight': [1, 3, 5, 10],
+    'subsample': [0.6, 0.7, 0.8, 0.9, 1.0],
+    'colsample_bytree': [0.6, 0.7, 0.8, 0.9, 1.0],
+    'reg_lambda': [0.5, 1.0, 2.0, 5.0],
+}
+TUNING_N_TRIALS = 24
+TUNING_CV_FOLDS = 5
+# Upper bound on trees per fit; early stopping usually ends well before it.
+TUNING_MAX_ESTIMATORS = 3000
+TUNING_EARLY_STOPPING_ROUNDS = 50
+# Trials not started within this many seconds are skipped.
+TUNING_TIME_BUDGET_SECONDS = 900
+
+# Analysis settings
+# Per-track metrics summed and ranked per artist by analysis.ArtistIndex.
+ARTIST_INDEX_METRICS = [
+    'spotify_streams', 'spotify_playlist_count', 'spotify_playlist_reach',
+    'youtube_views', 'youtube_likes', 'youtube_playlist_reach',
+    'tiktok_posts', 'tiktok_likes', 'tiktok_views',
+    'apple_music_playlist_count', 'airplay_spins', 'siriusxm_spins',
+    'deezer_playlist_count', 'deezer_playlist_reach', 'amazon_playlist_count',
+    'pandora_streams', 'pandora_track_stations', 'soundcloud_streams',
+    'shazam_counts', 'track_score'
+]
+
+# Chart data settings (src.chart_data, /api/charts)
+# Bins are capped so chart payloads stay the same size however large the data grows.
+CHART_MAX_BINS = 200
+# Bins per axis of 2-D density grids.
+CHART_MAX_GRID_BINS = 100
+# Points a histogram's KDE curve is evaluated at.
+CHART_KDE_GRID_POINTS = 200
+# Parameterized chart payloads kept per data version; the default charts are always precomputed.
+CHART_CACHE_SIZE = 64
+
+# Track search settings (analysis.TrackIndex, /api/tracks)
+TRACK_SEARCH_DEFAULT_LIMIT = 20
+TRACK_SEARCH_MAX_LIMIT = 100
+
+# Compact in-memory data settings (analysis.load_compact_data)
+# Float columns are stored as float32 when no value moves by more than this relative error.
+COMPACT_FLOAT_RTOL = 1e-6
+# Map one read-only copy of the compact data into every web worker instead of loading a copy each.
+COMPACT_DATA_MEMORY_MAP = True
+
+# Song archetype clustering settings (src.clustering)
+# Features that define a song's success profile; log1p-transformed and standardized.
+CLUSTER_FEATURES = [
+    'spotify_streams', 'youtube_views', 'tiktok_views',
+    'shazam_counts', 'airplay_spins', 'spotify_playlist_count'
+]
+CLUSTER_K = 4
+# Values of k fitted in parallel to report the elbow curve.
+CLUSTER_K_SWEEP = list(range(1, 11))
+# Rows per mini-batch streamed from the cleaned data.
+CLUSTER_BATCH_SIZE = 4096
+# Passes over the data when fitting the centroids.
+CLUSTER_EPOCHS = 5
+# Names given to the clusters in descending order of mean Spotify streams.
+ARCHETYPE_NAMES = ['Global Superstar', 'Radio & Playlist Hit', 'Digital Native', 'Niche/Emerging Hit']
+
+# Statistics engine settings (src.stats_engine)
+# Resamples drawn by bootstrap confidence intervals and permutation tests.
+STATS_RESAMPLES = 10_000
+# Resamples generated per vectorized chunk; each chunk runs in a worker process.
+STATS_CHUNK_SIZE = 500
+# Largest (resamples x rows) matrix a chunk builds at once; a chunk is drawn in
+# blocks of fewer resamples when the data has many rows. 4M elements are 32 MB of float64.
+STATS_MAX_CHUNK_ELEMENTS = 4_000_000
+
+# Plot rendering settings (plotting.PlotService)
+PLOT_CACHE_DIR = PROJECT_ROOT / 'static' / 'plots' / 'cache'
+PLOT_RENDER_WORKERS = 2
+# Longest a request waits for a plot that is not cached yet.
+PLOT_RENDER_TIMEOUT_SECONDS = 30
+
+# Batch scoring settings (scripts/score_tracks.py)
+# Rows read, scored and written at a time.
+SCORING_CHUNK_SIZE = 50_000
+# Input columns copied next to each prediction, when present.
+SCORING_ID_COLUMNS = ['track', 'artist', 'isrc']
+
+# Prediction serving settings
+# Maximum number of records accepted by a single /api/predict request.
+API_MAX_BATCH_RECORDS = 10_000
+# Coalesce concurrent single-record predictions into one batched predict call.
+MICRO_BATCHING_ENABLED = False
+MICRO_BATCH_WINDOW_MS = 5
+MICRO_BATCH_MAX_SIZE = 512
+# LRU cache of simulator predictions, keyed by the feature vector rounded to
+# this many decimals (the form's number inputs accept whole numbers).
+PREDICTION_CACHE_SIZE = 4096
+PREDICTION_CACHE_DECIMALS = 0
+# What-if sweeps (/api/sweep): a base record scored over a grid of one or two
+# swept features with a single batched predict call.
+SWEEP_MAX_FEATURES = 2
+SWEEP_MAX_STEPS = 200
+SWEEP_DEFAULT_STEPS = 50
+# Exact (SHAP) contributions cost about 10 ms per grid point per core with the
+# default model, so they are refused for sweeps with more distinct points than this.
+SWEEP_MAX_EXACT_CONTRIBUTION_ROWS = 200
+# Reload the cleaned data and model in the background when their files change.
+HOT_RELOAD_ENABLED = True
+HOT_RELOAD_POLL_SECONDS = 5
+# Serve the native booster export (serving.NativeModel) instead of the joblib model.
+SERVE_NATIVE_MODEL = True
+
+# Observability settings
+# Upper bounds in seconds of the /metrics latency histogram buckets.
+METRICS_REQUEST_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+METRICS_PREDICT_LATENCY_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0]
+
+# Synthetic data and benchmark settings (src.synthetic_data, scripts/benchmark_suite.py)
+SYNTHETIC_DATA_DIR = DATA_DIR / 'synthetic'
+BENCHMARK_RESULTS_DIR = REPORTS_DIR / 'benchmarks'
+# Rows generated at scale 1, about the size of the Kaggle file.
+SYNTHETIC_BASE_ROWS = 4_600
+# Rows generated and written to the CSV at a time.
+SYNTHETIC_CHUNK_ROWS = 100_000
+# Share of rows that repeat an earlier track's title, often in different case.
+SYNTHETIC_DUPLICATE_RATE = 0.05
+# Share of rows whose title or artist is mojibake matching GARBAGE_PATTERN.
+SYNTHETIC_GARBAGE_RATE = 0.01
+# Share of rows without a release date.
+SYNTHETIC_MISSING_DATE_RATE = 0.01
@@ -1,7 +1,10 @@
 # src/data_ingestion.py
 
 import os
+import shutil
 import sys
+import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path para encontrar o 'src'
@@ -10,7 +13,6 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from src import config
-from kaggle.api.kaggle_api_extended import KaggleApi
 
 def set_proxy(proxy_url: str | None):
     """Sets proxy environment variables."""
@@ -43,12 +45,51 @@ def download_data():
         print(f"Raw data file already exists at '{config.RAW_DATA_FILE}'. Skipping download.")
         return
 
+    config.ensure_directories()
     print(f"Downloading dataset '{config.KAGGLE_DATASET_ID}'...")
     try:
+        # Imported here because the kaggle package authenticates on import
+        from kaggle.api.kaggle_api_extended import KaggleApi
         api = KaggleApi()
         api.authenticate()
         api.dataset_download_files(config.KAGGLE_DATASET_ID, path=config.RAW_DATA_DIR, unzip=True, quiet=True)
         print("Download and extraction complete.")
         standardize_filename()
     except Exception as e:
-        print(f"An error occurred during download: {e}")
\ No newline at end of file
+        print(f"An error occurred during download: {e}")
+
+def download_snapshot(dest_dir: Path = config.SNAPSHOT_INBOX_DIR) -> Path | None:
+    """
+    Downloads the current Kaggle export as a new snapshot for incremental ingestion.
+
+    The dataset is downloaded to a temporary directory and its CSV moved into
+    `dest_dir`, named after the UTC download time so snapshots sort in order.
+    Unlike `download_data`, this always downloads.
+
+    Args:
+        dest_dir (Path): Snapshot inbox read by `src.snapshots.ingest_snapshots`.
+
+    Returns:
+        Path | None: The new snapshot file, or None if the download failed.
+    """
+    set_proxy(config.PROXY_URL)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Downloading a snapshot of dataset '{config.KAGGLE_DATASET_ID}'...")
+    try:
+        from kaggle.api.kaggle_api_extended import KaggleApi
+        api = KaggleApi()
+        api.authenticate()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            api.dataset_download_files(config.KAGGLE_DATASET_ID, path=tmp_dir, unzip=True, quiet=True)
+            downloaded_csvs = sorted(Path(tmp_dir).glob('*.csv'))
+            if not downloaded_csvs:
+                print("Error: No CSV file found after download.")
+                return None
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+            snapshot_path = dest_dir / f"{stamp}-{config.RAW_DATA_FILE.name}"
+            shutil.move(downloaded_csvs[0], snapshot_path)
+        print(f"Snapshot saved to '{snapshot_path}'.")
+        return snapshot_path
+    except Exception as e:
+        print(f"An error occurred during download: {e}")
+        return None
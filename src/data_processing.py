@@ -2,99 +2,403 @@
 Module for all data ingestion, cleaning, and preparation tasks.
 
 This script processes the raw data from Kaggle and transforms it into a clean,
-analysis-ready DataFrame. All cleaning steps are encapsulated in a single function.
+analysis-ready DataFrame. All cleaning steps are driven by `process_raw_data`,
+which can either load the raw file in one go or stream it in fixed-size chunks
+so that large chart exports never have to fit in memory as a whole.
 """
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import ftfy
 import chardet
 import io
 from pathlib import Path
+from typing import Iterator
 from src import config  # Centralized configuration
+from src.data_store import save_cleaned_data
+from src.deduplication import remove_near_duplicates
 
+# Columns stored as thousands-separated strings in the raw export
+NUMERIC_COLS = [
+    'spotify_playlist_count', 'spotify_playlist_reach', 'youtube_views',
+    'youtube_likes', 'tiktok_posts', 'tiktok_likes', 'tiktok_views',
+    'youtube_playlist_reach', 'airplay_spins', 'siriusxm_spins',
+    'deezer_playlist_reach', 'pandora_streams', 'pandora_track_stations',
+    'soundcloud_streams', 'shazam_counts'
+]
 
-def process_raw_data() -> pd.DataFrame | None:
+# Numeric literals accepted once thousands separators and surrounding whitespace are removed
+_NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+_INTEGER_PATTERN = r'^[+-]?\d+$'
+
+
+class _FixedTextStream(io.TextIOBase):
     """
-    Executes the full data processing pipeline:
-    - Reads and decodes raw CSV
-    - Cleans and standardizes data
-    - Handles deduplication and type conversion
-    - Saves cleaned dataset to disk
+    Read-only text stream that decodes a raw file and repairs it with ftfy line by line.
+
+    Segmentation mirrors `ftfy.fix_text`, which already fixes text one line at a
+    time, so the stream yields exactly what fixing the whole decoded file would.
+    """
+
+    def __init__(self, raw_file_path: Path, encoding: str):
+        self._source = open(raw_file_path, 'r', encoding=encoding, errors='replace', newline='\n')
+        self._fix_config = ftfy.TextFixerConfig(explain=False)
+        self._buffer = ''
+
+    def readable(self) -> bool:
+        return True
+
+    def _fix_line(self, line: str) -> str:
+        max_length = self._fix_config.max_decode_length
+        fixed = []
+        for pos in range(0, len(line), max_length):
+            segment = line[pos:pos + max_length]
+            if self._fix_config.unescape_html == 'auto' and '<' in segment:
+                self._fix_config = self._fix_config._replace(unescape_html=False)
+            fixed.append(ftfy.fix_and_explain(segment, self._fix_config)[0])
+        return ''.join(fixed)
+
+    def read(self, size: int | None = -1) -> str:
+        parts = [self._buffer]
+        buffered = len(self._buffer)
+        while size is None or size < 0 or buffered < size:
+            line = self._source.readline()
+            if not line:
+                break
+            fixed_line = self._fix_line(line)
+            parts.append(fixed_line)
+            buffered += len(fixed_line)
+
+        text = ''.join(parts)
+        if size is None or size < 0:
+            size = len(text)
+        self._buffer = text[size:]
+        return text[:size]
+
+    def close(self):
+        self._source.close()
+        super().close()
+
+
+def _detect_encoding(raw_file_path: Path, sample_size: int = config.ENCODING_SAMPLE_BYTES) -> str:
+    """
+    Detects the encoding of a raw file from a bounded sample of its leading bytes.
+
+    Args:
+        raw_file_path (Path): Path to the raw CSV file.
+        sample_size (int): Maximum number of bytes handed to chardet.
 
     Returns:
-        pd.DataFrame | None: The cleaned dataset, or None if raw file is not found.
+        str: The detected encoding, falling back to 'latin-1'.
     """
-    print("Starting Data Processing Pipeline...")
+    detector = chardet.UniversalDetector()
+    with open(raw_file_path, 'rb') as raw_file:
+        remaining = sample_size
+        while remaining > 0 and not detector.done:
+            block = raw_file.read(min(64 * 1024, remaining))
+            if not block:
+                break
+            detector.feed(block)
+            remaining -= len(block)
+    detector.close()
+    return detector.result['encoding'] or 'latin-1'
 
-    raw_file_path = config.RAW_DATA_FILE
-    processed_file_path = config.CLEANED_DATA_FILE
 
-    if not raw_file_path.exists():
-        print(f"Error: Raw data file not found at: {raw_file_path}")
-        print("Please run the dataset download script before processing.")
-        return None
+def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-cases and snake-cases the raw column names."""
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace(r'[()\[\]]', '', regex=True)
+    return df
 
-    print(f"Reading raw data from: {raw_file_path}")
+
+def _parse_text_numbers(values: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """
+    Parses thousands-separated numeric strings entirely inside Arrow compute kernels.
+
+    Mirrors `pd.to_numeric(..., errors='coerce')`: unparseable values become NaN,
+    and the result is int64 only when every value is an integer literal.
+    """
+    if pa.types.is_null(values.type):
+        return np.full(len(values), np.nan)
+
+    text = pc.replace_substring(values, ',', '')
+
+    # Fast path: plain integer counts, the common case in the raw export
+    try:
+        integers = pc.cast(text, pa.int64())
+    except pa.ArrowInvalid:
+        integers = None
+    if integers is not None:
+        if integers.null_count == 0:
+            return integers.to_numpy(zero_copy_only=False)
+        return pc.cast(integers, pa.float64(), safe=False).to_numpy(zero_copy_only=False)
+
+    text = pc.utf8_trim_whitespace(text)
+    is_number = pc.match_substring_regex(text, _NUMBER_PATTERN)
+    numbers = pc.utf8_ltrim(pc.if_else(is_number, text, pa.scalar(None, pa.string())), '+')
+
+    if numbers.null_count == 0 and pc.all(pc.match_substring_regex(numbers, _INTEGER_PATTERN)).as_py() is not False:
+        try:
+            return pc.cast(numbers, pa.int64()).to_numpy(zero_copy_only=False)
+        except pa.ArrowInvalid:
+            pass  # Out of int64 range, fall back to float like pandas
+    return pc.cast(numbers, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def parse_numeric_columns(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """
+    Converts thousands-separated numeric string columns to numbers in place.
+
+    Text columns are handed to Arrow as a batch and parsed without creating
+    intermediate Python strings. Columns that are already numeric are left
+    untouched, and columns Arrow cannot take as strings fall back to pandas.
+
+    Args:
+        df (pd.DataFrame): DataFrame to convert.
+        cols (list[str]): Columns to convert. Missing columns are ignored.
+
+    Returns:
+        pd.DataFrame: The same DataFrame with the columns converted.
+    """
+    text_cols = [col for col in cols if col in df.columns and not pd.api.types.is_numeric_dtype(df[col])]
+    for col in text_cols:
+        try:
+            values = pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
+            continue
+        if not (pa.types.is_string(values.type) or pa.types.is_null(values.type)):
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
+            continue
+        df[col] = _parse_text_numbers(values)
+    return df
+
+
+def _filter_rows(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """
+    Drops garbage and incomplete rows in a single pass and adds the deduplication keys.
+
+    Rows are removed when their track or artist contains `config.GARBAGE_PATTERN`,
+    or when track, artist or a parseable `spotify_streams` value is missing.
+
+    Returns:
+        tuple[pd.DataFrame, int]: The filtered frame, with `track_normalized` and
+            int64 `spotify_streams`, and the number of rows removed as garbage.
+    """
+    garbage = (df['track'].str.contains(config.GARBAGE_PATTERN, na=False)
+               | df['artist'].str.contains(config.GARBAGE_PATTERN, na=False))
+    parse_numeric_columns(df, ['spotify_streams'])
+    df['track_normalized'] = df['track'].str.lower().str.strip()
+
+    keep = ~garbage & df['track'].notna() & df['artist'].notna() & df['spotify_streams'].notna()
+    df = df.take(np.flatnonzero(keep.to_numpy()))
+    df['spotify_streams'] = df['spotify_streams'].astype('int64')
+    return df, int(garbage.sum())
+
+
+def _deduplicate_tracks(df: pd.DataFrame, drop_key: bool = True) -> pd.DataFrame:
+    """
+    Keeps the most streamed row per normalized track name.
+
+    A stable sort is used so that ties on `spotify_streams` always resolve to the
+    row that appears first in the raw file, whether or not it was read in chunks.
+    """
+    df = df.sort_values('spotify_streams', ascending=False, kind='stable')
+    df = df.drop_duplicates(subset=['track_normalized'], keep='first')
+    if drop_key:
+        df = df.drop(columns=['track_normalized'])
+    return df
+
+
+def _merge_near_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """Drops near-duplicate tracks left after exact deduplication, if enabled in the config."""
+    if not config.NEAR_DUPLICATE_DEDUP_ENABLED:
+        return df
+    df, stats = remove_near_duplicates(df)
+    print(f"Removed {stats['removed']} near-duplicate tracks "
+          f"({stats['exact_key_matches']} by canonical title and artist, {stats['similarity_matches']} "
+          f"similar-title matches from {stats['candidate_pairs']} candidate pairs) in {stats['seconds']:.2f}s.")
+    return df
+
+
+def _finalize_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts numeric and date columns and fills remaining numeric gaps with zero."""
+    parse_numeric_columns(df, NUMERIC_COLS)
+
+    df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
+    df.dropna(subset=['release_date'], inplace=True)
+    numeric_fill_cols = [col for col in df.select_dtypes(include=np.number).columns if df[col].hasnans]
+    if numeric_fill_cols:
+        df.fillna(dict.fromkeys(numeric_fill_cols, 0), inplace=True)
+    return df
+
+
+def _infer_column_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Restores numeric dtypes on columns that were streamed in as strings."""
+    for col in df.select_dtypes(include='object').columns:
+        try:
+            df[col] = pd.to_numeric(df[col])
+        except (ValueError, TypeError):
+            pass
+    return df
+
+
+def _load_raw_data(raw_file_path: Path) -> pd.DataFrame:
+    """Reads, decodes and fixes the whole raw file in memory."""
     with open(raw_file_path, 'rb') as raw_file:
         raw_data = raw_file.read()
 
     detected_encoding = chardet.detect(raw_data)['encoding']
     text_data = raw_data.decode(detected_encoding or 'latin-1', errors='replace')
     text_data = ftfy.fix_text(text_data)
-    df = pd.read_csv(io.StringIO(text_data))
+    return pd.read_csv(io.StringIO(text_data))
+
+
+def _clean_in_memory(raw_file_path: Path) -> pd.DataFrame:
+    """Runs the cleaning steps over the fully loaded raw file."""
+    df = _load_raw_data(raw_file_path)
     print(f"Raw data successfully loaded with {len(df)} rows.")
 
-    # Standardize column names
-    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace(r'[()\[\]]', '', regex=True)
+    df = _standardize_columns(df)
     print("Column names standardized.")
 
-    # Remove rows with invalid characters in key fields
-    initial_rows = len(df)
-    df = df[~df['track'].str.contains(config.GARBAGE_PATTERN, na=False)]
-    df = df[~df['artist'].str.contains(config.GARBAGE_PATTERN, na=False)]
-    rows_removed = initial_rows - len(df)
+    df, rows_removed = _filter_rows(df)
     print(f"Removed {rows_removed} rows containing invalid characters.")
 
-    # Remove rows with missing critical values and deduplicate
-    df.dropna(subset=['track', 'artist'], inplace=True)
-    df['track_normalized'] = df['track'].str.lower().str.strip()
-    df['spotify_streams'] = pd.to_numeric(df['spotify_streams'].astype(str).str.replace(',', ''), errors='coerce')
-    df.dropna(subset=['spotify_streams', 'track_normalized'], inplace=True)
-    df['spotify_streams'] = df['spotify_streams'].astype('int64')
-    df.sort_values('spotify_streams', ascending=False, inplace=True)
-    
     dedup_initial = len(df)
-    df.drop_duplicates(subset=['track_normalized'], keep='first', inplace=True)
-    df.drop(columns=['track_normalized'], inplace=True)
-    dedup_removed = dedup_initial - len(df)
-    print(f"Removed {dedup_removed} duplicate tracks based on normalized names.")
-
-    # Convert relevant columns to numeric
-    numeric_cols = [
-        'spotify_playlist_count', 'spotify_playlist_reach', 'youtube_views',
-        'youtube_likes', 'tiktok_posts', 'tiktok_likes', 'tiktok_views',
-        'youtube_playlist_reach', 'airplay_spins', 'siriusxm_spins',
-        'deezer_playlist_reach', 'pandora_streams', 'pandora_track_stations',
-        'soundcloud_streams', 'shazam_counts'
-    ]
-
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
+    df = _deduplicate_tracks(df)
+    print(f"Removed {dedup_initial - len(df)} duplicate tracks based on normalized names.")
 
-    # Handle date parsing and missing values
-    df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
-    df.dropna(subset=['release_date'], inplace=True)
-    numeric_fill_cols = df.select_dtypes(include=np.number).columns.tolist()
-    df[numeric_fill_cols] = df[numeric_fill_cols].fillna(0)
+    df = _merge_near_duplicates(df)
+    return _finalize_types(df)
+
+
+def read_raw_chunks(raw_file_path: Path, chunksize: int = config.PROCESSING_CHUNK_SIZE,
+                    encoding: str | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Streams a raw CSV as decoded, ftfy-fixed chunks of string columns with standardized names.
+
+    Args:
+        raw_file_path (Path): Path to the raw CSV file.
+        chunksize (int): Rows per chunk.
+        encoding (str | None): Encoding of the file. Detected from its leading
+            bytes when not given.
+
+    Yields:
+        pd.DataFrame: The next chunk of up to `chunksize` rows, every field a string or NaN.
+    """
+    encoding = encoding or _detect_encoding(raw_file_path)
+    with _FixedTextStream(raw_file_path, encoding) as stream:
+        for chunk in pd.read_csv(stream, chunksize=chunksize, dtype=str):
+            yield _standardize_columns(chunk)
+
+
+def clean_raw_rows(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    Cleans a batch of raw rows read as strings, without near-duplicate merging.
+
+    Garbage and incomplete rows are dropped, exact duplicates are reduced to
+    their most streamed row, and `NUMERIC_COLS` and the release date are
+    parsed as in a full run. Other columns are left as strings for the caller
+    to type, e.g. like the store the rows are merged into: a small batch is
+    not enough to infer them. Used to clean only the new rows of a snapshot.
+
+    Args:
+        df (pd.DataFrame): Raw rows with standardized column names, e.g. from `read_raw_chunks`.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: The cleaned rows, and the number of rows
+            removed as garbage, as exact duplicates and for a missing release date.
+    """
+    df, garbage = _filter_rows(df)
+    filtered = len(df)
+    df = _deduplicate_tracks(df)
+    deduplicated = len(df)
+    df = _finalize_types(df)
+    return df, {'garbage': garbage, 'duplicates': filtered - deduplicated, 'missing_dates': deduplicated - len(df)}
+
+
+def _clean_in_chunks(raw_file_path: Path, chunksize: int) -> pd.DataFrame:
+    """
+    Runs the cleaning steps while streaming the raw file in chunks of `chunksize` rows.
+
+    Only the current chunk and the deduplicated survivors so far are held in memory.
+    Raw fields are read as strings and their dtypes inferred once on the merged
+    result, so a chunk that happens to look integral cannot change column types.
+    """
+    encoding = _detect_encoding(raw_file_path)
+    print(f"Detected encoding '{encoding}' from the first {config.ENCODING_SAMPLE_BYTES:,} bytes.")
+
+    survivors = None
+    total_rows = rows_removed = dedup_initial = n_chunks = 0
+    for chunk in read_raw_chunks(raw_file_path, chunksize, encoding):
+        n_chunks += 1
+        total_rows += len(chunk)
+        chunk, removed = _filter_rows(chunk)
+        rows_removed += removed
+        dedup_initial += len(chunk)
+        if survivors is not None:
+            chunk = pd.concat([survivors, chunk])
+        survivors = _deduplicate_tracks(chunk, drop_key=False)
+
+    print(f"Raw data successfully streamed: {total_rows} rows in {n_chunks} chunks of up to {chunksize}.")
+    print("Column names standardized.")
+    print(f"Removed {rows_removed} rows containing invalid characters.")
+
+    df = survivors.drop(columns=['track_normalized'])
+    print(f"Removed {dedup_initial - len(df)} duplicate tracks based on normalized names.")
+
+    df = _merge_near_duplicates(df)
+    df = _infer_column_types(df)
+    return _finalize_types(df)
+
+
+def process_raw_data(chunksize: int | None = None, export_csv: bool = False,
+                     raw_file_path: Path = config.RAW_DATA_FILE,
+                     processed_file_path: Path = config.CLEANED_DATA_FILE) -> pd.DataFrame | None:
+    """
+    Executes the full data processing pipeline:
+    - Reads and decodes raw CSV
+    - Cleans and standardizes data
+    - Handles deduplication and type conversion
+    - Saves cleaned dataset to disk as Parquet
+
+    Args:
+        chunksize (int | None): If set, stream the raw file in chunks of this many
+            rows instead of loading it whole. The encoding is then detected from
+            the first `config.ENCODING_SAMPLE_BYTES` bytes. The cleaned output is
+            the same either way. Defaults to None (in-memory mode).
+        export_csv (bool): Also write a CSV copy to `config.CLEANED_DATA_CSV_FILE`.
+            Defaults to False.
+        raw_file_path (Path): Raw CSV to read. Defaults to `config.RAW_DATA_FILE`.
+        processed_file_path (Path): Where to save the cleaned Parquet file.
+            Defaults to `config.CLEANED_DATA_FILE`.
+
+    Returns:
+        pd.DataFrame | None: The cleaned dataset, or None if raw file is not found.
+    """
+    print("Starting Data Processing Pipeline...")
+
+    if not raw_file_path.exists():
+        print(f"Error: Raw data file not found at: {raw_file_path}")
+        print("Please run the dataset download script before processing.")
+        return None
+
+    print(f"Reading raw data from: {raw_file_path}")
+    if chunksize:
+        df = _clean_in_chunks(raw_file_path, chunksize)
+    else:
+        df = _clean_in_memory(raw_file_path)
 
     print("Final data type conversions and missing value handling completed.")
 
     # Save cleaned data
-    processed_file_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(processed_file_path, index=False, encoding='utf-8')
+    csv_path = config.CLEANED_DATA_CSV_FILE if export_csv else None
+    save_cleaned_data(df, processed_file_path, csv_path=csv_path)
     print(f"\nSaved {len(df)} cleaned records to: {processed_file_path}")
+    if csv_path is not None:
+        print(f"Exported CSV copy to: {csv_path}")
     print("Data Processing Pipeline Completed Successfully.")
 
     return df
@@ -0,0 +1,75 @@
+"""
+Module for reading and writing the cleaned dataset.
+
+The cleaned data is stored as a typed, columnar Parquet file so that consumers
+get int64 stream counts, datetime release dates and categorical artist columns
+back without re-parsing, and can load only the columns they need.
+"""
+
+import os
+import pandas as pd
+from pathlib import Path
+from src import config
+
+# Repeated string columns stored dictionary-encoded and loaded as categoricals
+CATEGORICAL_COLS = ['artist', 'album_name']
+
+
+def save_cleaned_data(df: pd.DataFrame, data_path: Path = config.CLEANED_DATA_FILE,
+                      csv_path: Path | None = None) -> None:
+    """
+    Saves the cleaned dataset as Parquet, optionally exporting a CSV copy.
+
+    Args:
+        df (pd.DataFrame): The cleaned dataset.
+        data_path (Path): Destination of the Parquet file.
+        csv_path (Path | None): If given, also write a CSV export to this path.
+    """
+    typed_df = df.copy()
+    for col in CATEGORICAL_COLS:
+        if col in typed_df.columns:
+            typed_df[col] = typed_df[col].astype('category')
+
+    # Write to a temporary file and swap it in, so readers never see a partial file
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = data_path.with_name(data_path.name + '.tmp')
+    typed_df.to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, data_path)
+
+    if csv_path is not None:
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(csv_path, index=False, encoding='utf-8')
+
+
+def load_cleaned_data(data_path: Path = config.CLEANED_DATA_FILE,
+                      columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Loads the cleaned dataset, reading only the requested columns.
+
+    Args:
+        data_path (Path): Path to the cleaned Parquet file.
+        columns (list[str] | None): Columns to load. Defaults to all columns.
+
+    Returns:
+        pd.DataFrame: The cleaned dataset with its stored dtypes.
+
+    Raises:
+        FileNotFoundError: If the file does not exist at the specified path.
+    """
+    if not data_path.exists():
+        raise FileNotFoundError(f"Cleaned data file not found at {data_path}")
+    return pd.read_parquet(data_path, engine='pyarrow', columns=columns)
+
+
+def data_version(data_path: Path = config.CLEANED_DATA_FILE) -> str:
+    """
+    Returns a token that changes whenever the cleaned data file is rewritten.
+
+    Args:
+        data_path (Path): Path to the cleaned Parquet file.
+
+    Returns:
+        str: Version token built from the file's modification time and size.
+    """
+    stat = data_path.stat()
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
@@ -0,0 +1,233 @@
+"""
+Module for finding near-duplicate tracks in the cleaned data.
+
+Exact deduplication on the lower-cased title misses the same song listed as
+"Song (feat. X)", "Song - Remix", "Canción" vs "Cancion" or "Dont" vs "Don't".
+Comparing every pair of titles would be quadratic, so candidates are found by
+blocking instead:
+
+1. Every track gets a canonical title (accents, punctuation, featured artists
+   and version suffixes removed) and a canonical primary artist. Tracks sharing
+   both are the same song.
+2. MinHash signatures over character 3-grams of the canonical title are split
+   into LSH bands; tracks by the same artist, with the same numbers in their
+   titles ("Part 1" is not "Part 2"), that share a band bucket become
+   candidate pairs, which are kept if their exact 3-gram Jaccard similarity
+   reaches `config.NEAR_DUPLICATE_THRESHOLD`.
+
+Matched tracks are merged into groups, and each group keeps its most streamed
+row, the same rule exact deduplication uses.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from src import config
+
+# Bracketed parts naming featured artists or a version, e.g. "(feat. X)" or "[Remix]"
+_BRACKETED_VERSION = (r'\s*[\(\[][^\)\]]*\b(?:feat|ft|featuring|with|remix|mix|edit|version|'
+                      r'remaster|remastered|live|acoustic|sped up|slowed)\b[^\)\]]*[\)\]]')
+# Unbracketed suffixes: " - Remix", " - 2011 Remaster", " feat. X"
+_DASH_VERSION = r'\s+-\s+[^-]*\b(?:remix|mix|edit|version|remaster|remastered|live|acoustic)\b.*$'
+_FEATURING = r'\s+(?:feat\.?|ft\.?|featuring)\s+.*$'
+# Explicit markers of a featured or collaborating artist. Commas, "&" and "and"
+# are not separators: they are part of names like "Simon & Garfunkel",
+# "Earth, Wind & Fire" or "Tyler, The Creator".
+_ARTIST_SEPARATOR = r'\s+[\(\[]?(?:feat\.?|ft\.?|featuring|with|x)\s+'
+
+# Mersenne prime for the universal hash family used by MinHash
+_MINHASH_PRIME = (1 << 31) - 1
+
+
+def _normalize_text(values: pd.Series) -> pd.Series:
+    """Lower-cases, strips Latin accents and apostrophes, and turns other punctuation into spaces."""
+    return (
+        values.astype(str).str.lower()
+        .str.normalize('NFKD').str.replace(r'[̀-ͯ]', '', regex=True)
+        .str.replace(r"['’`]", '', regex=True)
+        .str.replace(r'[\W_]+', ' ', regex=True)
+        .str.strip()
+    )
+
+
+def canonical_titles(tracks: pd.Series) -> pd.Series:
+    """
+    Reduces track titles to the song they name.
+
+    Featured artists and version markers are removed before normalizing. A
+    title that would become empty keeps its normalized full form.
+    """
+    stripped = (
+        tracks.astype(str)
+        .str.replace(_BRACKETED_VERSION, '', regex=True, case=False)
+        .str.replace(_DASH_VERSION, '', regex=True, case=False)
+        .str.replace(_FEATURING, '', regex=True, case=False)
+    )
+    canonical = _normalize_text(stripped)
+    return canonical.where(canonical != '', _normalize_text(tracks))
+
+
+def canonical_artists(artists: pd.Series) -> pd.Series:
+    """
+    Reduces artist credits to the normalized primary artist.
+
+    Only explicit featuring markers ("feat.", "ft.", "featuring", "with", " x ")
+    split a credit, so band names containing "&" or a comma stay whole.
+    """
+    primary = artists.astype(str).str.lower().str.split(_ARTIST_SEPARATOR, n=1, regex=True).str[0]
+    return _normalize_text(primary)
+
+
+def _shingles(text: str) -> set[str]:
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _minhash_signatures(shingle_sets: list[set[str]], num_perm: int, seed: int = 42,
+                        chunk_size: int = 50_000) -> np.ndarray:
+    """
+    Computes MinHash signatures of shape (records, num_perm).
+
+    Shingles are mapped to integer ids through a shared vocabulary, hashed with
+    `num_perm` functions (a * id + b) mod p, and reduced per record with
+    `np.minimum.reduceat`, a chunk of records at a time. Every set must be
+    non-empty: `reduceat` cannot reduce an empty segment.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MINHASH_PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _MINHASH_PRIME, size=num_perm, dtype=np.int64)
+    vocabulary = {}
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.int64)
+
+    for start in range(0, len(shingle_sets), chunk_size):
+        chunk = shingle_sets[start:start + chunk_size]
+        ids = np.fromiter(
+            (vocabulary.setdefault(shingle, len(vocabulary)) for shingles in chunk for shingle in shingles),
+            dtype=np.int64,
+        )
+        lengths = np.fromiter((len(shingles) for shingles in chunk), dtype=np.int64, count=len(chunk))
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        hashed = (ids[:, np.newaxis] * a + b) % _MINHASH_PRIME
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(hashed, offsets, axis=0)
+    return signatures
+
+
+def _find(parents: np.ndarray, i: int) -> int:
+    root = i
+    while parents[root] != root:
+        root = parents[root]
+    while parents[i] != root:
+        parents[i], i = root, parents[i]
+    return root
+
+
+def _union(parents: np.ndarray, i: int, j: int):
+    root_i, root_j = _find(parents, i), _find(parents, j)
+    if root_i != root_j:
+        parents[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def near_duplicate_groups(tracks: pd.Series, artists: pd.Series, threshold: float = config.NEAR_DUPLICATE_THRESHOLD,
+                          num_perm: int = config.NEAR_DUPLICATE_NUM_PERM, bands: int = config.NEAR_DUPLICATE_BANDS,
+                          max_bucket: int = config.NEAR_DUPLICATE_MAX_BUCKET) -> tuple[np.ndarray, dict]:
+    """
+    Assigns a group id to every track so that near-duplicates share one.
+
+    Args:
+        tracks (pd.Series): Track titles.
+        artists (pd.Series): Artist credits, aligned with `tracks`.
+        threshold (float): Minimum 3-gram Jaccard similarity of canonical titles.
+        num_perm (int): MinHash signature length; must be divisible by `bands`.
+        bands (int): Number of LSH bands.
+        max_bucket (int): LSH buckets with more tracks than this are skipped.
+
+    Returns:
+        tuple[np.ndarray, dict]: Group id per track (the position of its first
+            member), and counts of candidate pairs and matches per stage.
+    """
+    n = len(tracks)
+    titles = canonical_titles(tracks).to_numpy(dtype=object)
+    artist_codes = pd.factorize(canonical_artists(artists))[0].astype(np.int64)
+    number_codes = pd.factorize(pd.Series(titles).str.findall(r'\d+').str.join(' '))[0].astype(np.int64)
+    parents = np.arange(n)
+
+    # Stage 1: identical canonical title and primary artist
+    key_groups = pd.DataFrame({'artist': artist_codes, 'title': titles}).groupby(['artist', 'title'], sort=False).ngroup()
+    first_of_key = pd.Series(np.arange(n)).groupby(key_groups.to_numpy()).transform('first').to_numpy()
+    exact_matches = int(np.count_nonzero(first_of_key != np.arange(n)))
+    parents[:] = first_of_key
+
+    # Stage 2: MinHash LSH over the titles of one representative per canonical key.
+    # Titles that normalize to nothing (only punctuation or emoji) have no shingles
+    # and can only match in stage 1.
+    representatives = np.flatnonzero(first_of_key == np.arange(n))
+    shingle_sets = [_shingles(titles[i]) for i in representatives]
+    has_shingles = np.fromiter((len(shingles) > 0 for shingles in shingle_sets), dtype=bool,
+                               count=len(shingle_sets))
+    representatives = representatives[has_shingles]
+    shingle_sets = [shingles for shingles in shingle_sets if shingles]
+    signatures = _minhash_signatures(shingle_sets, num_perm)
+    rows_per_band = num_perm // bands
+
+    candidates = set()
+    skipped_buckets = 0
+    for band in range(bands):
+        band_keys = np.column_stack([artist_codes[representatives], number_codes[representatives],
+                                     signatures[:, band * rows_per_band:(band + 1) * rows_per_band]])
+        _, buckets, sizes = np.unique(band_keys, axis=0, return_inverse=True, return_counts=True)
+        buckets = buckets.ravel()
+        shared = np.flatnonzero(sizes[buckets] > 1)
+        if not len(shared):
+            continue
+        order = shared[np.argsort(buckets[shared], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(buckets[order])) + 1
+        for members in np.split(order, boundaries):
+            if len(members) > max_bucket:
+                skipped_buckets += 1
+                continue
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+
+    lsh_matches = 0
+    for x, y in candidates:
+        shingles_x, shingles_y = shingle_sets[x], shingle_sets[y]
+        if len(shingles_x & shingles_y) >= threshold * len(shingles_x | shingles_y):
+            lsh_matches += 1
+            _union(parents, representatives[x], representatives[y])
+
+    groups = np.array([_find(parents, i) for i in range(n)])
+    return groups, {
+        'exact_key_matches': exact_matches,
+        'candidate_pairs': len(candidates),
+        'similarity_matches': lsh_matches,
+        'skipped_buckets': skipped_buckets,
+    }
+
+
+def remove_near_duplicates(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    Drops near-duplicate tracks, keeping the most streamed row of each group.
+
+    Ties on `spotify_streams` keep the row that comes first, as in exact deduplication.
+
+    Args:
+        df (pd.DataFrame): Tracks with `track`, `artist` and int64 `spotify_streams`.
+
+    Returns:
+        tuple[pd.DataFrame, dict]: The deduplicated frame and a report with the
+            number of rows removed, per-stage counts and the elapsed seconds.
+    """
+    start = time.perf_counter()
+    groups, stats = near_duplicate_groups(df['track'], df['artist'])
+
+    order = np.argsort(-df['spotify_streams'].to_numpy(dtype=np.float64), kind='stable')
+    _, first = np.unique(groups[order], return_index=True)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[order[first]] = True
+    deduplicated = df.take(np.flatnonzero(keep))
+
+    stats['removed'] = len(df) - len(deduplicated)
+    stats['seconds'] = time.perf_counter() - start
+    return deduplicated, stats
@@ -0,0 +1,103 @@
+"""
+Module for tracking pipeline inputs between runs.
+
+The manifest is a small JSON file that records a content hash for every file
+the pipeline reads and the input fingerprint each stage last completed with,
+so that stages whose inputs have not changed can be skipped on the next run.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from src import config
+
+
+def fingerprint(inputs: dict) -> str:
+    """
+    Computes a stable hash of a stage's inputs.
+
+    Args:
+        inputs (dict): JSON-serializable description of everything the stage depends on.
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding of `inputs`.
+    """
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PipelineManifest:
+    """
+    Persistent record of file hashes and completed stage fingerprints.
+
+    File hashes are cached against the file's size and modification time, so an
+    untouched multi-GB raw file is not re-read on every run.
+    """
+
+    def __init__(self, manifest_path: Path = config.PIPELINE_MANIFEST_FILE):
+        self.path = manifest_path
+        self.files = {}
+        self.stages = {}
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+                content = json.load(manifest_file)
+            self.files = content.get('files', {})
+            self.stages = content.get('stages', {})
+
+    def file_digest(self, path: Path) -> str | None:
+        """
+        Returns the SHA-256 of a file's content, or None if it does not exist.
+
+        Args:
+            path (Path): File to hash.
+
+        Returns:
+            str | None: Hex digest of the file content.
+        """
+        if not path.exists():
+            return None
+
+        stat = path.stat()
+        key = str(path.resolve())
+        cached = self.files.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        self.files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        return sha256
+
+    def is_current(self, stage: str, stage_fingerprint: str, outputs: list[Path]) -> bool:
+        """
+        Checks whether a stage already completed with the same inputs and its outputs still exist.
+
+        Args:
+            stage (str): Stage name.
+            stage_fingerprint (str): Fingerprint of the stage's current inputs.
+            outputs (list[Path]): Files the stage is expected to produce.
+
+        Returns:
+            bool: True if the stage can be skipped.
+        """
+        record = self.stages.get(stage)
+        if record is None or record['fingerprint'] != stage_fingerprint:
+            return False
+        return all(output.exists() for output in outputs)
+
+    def record(self, stage: str, stage_fingerprint: str):
+        """Marks a stage as completed with the given input fingerprint."""
+        self.stages[stage] = {
+            'fingerprint': stage_fingerprint,
+            'completed_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+
+    def save(self):
+        """Writes the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({'files': self.files, 'stages': self.stages}, manifest_file, indent=2, sort_keys=True)
@@ -0,0 +1,166 @@
+"""
+Module for collecting web app metrics in the Prometheus text format.
+
+A small, dependency-free subset of the Prometheus client: counters and
+histograms with labels are updated in place under a lock, and gauges are read
+from callbacks when `/metrics` is scraped, so values that already live
+elsewhere (cache counters, loaded versions) are never copied. `MetricsRegistry`
+renders everything in the text exposition format, version 0.0.4.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    """Base class holding a metric's name, help text and label names."""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"Metric '{self.name}' expects labels {list(self.label_names)}, got {list(labels)}.")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        """Returns (name suffix, formatted labels, value) for every sample."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines += [f'{self.name}{suffix}{labels} {_format_value(value)}' for suffix, labels, value in self.samples()]
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set."""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        with self._lock:
+            return [('', _format_labels(self.label_names, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative bucket counts, sum and count of observations per label set.
+
+    Args:
+        buckets (Iterable[float]): Increasing upper bounds; +Inf is added automatically.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = ()):
+        super().__init__(name, documentation, labels)
+        self.buckets = sorted(float(bound) for bound in buckets)
+        # Per label set: [non-cumulative bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + [math.inf], counts):
+                    cumulative += bucket_count
+                    bucket_labels = _format_labels(self.label_names + ('le',), key + (_format_value(bound),))
+                    samples.append(('_bucket', bucket_labels, cumulative))
+                labels = _format_labels(self.label_names, key)
+                samples += [('_sum', labels, total), ('_count', labels, count)]
+        return samples
+
+
+class CallbackGauge(_Metric):
+    """
+    A gauge whose samples are read from a callback at scrape time.
+
+    Args:
+        read (Callable[[], Iterable[tuple[dict, float]]]): Returns (labels, value)
+            pairs; a value of None is skipped.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], Iterable[tuple[dict, float]]],
+                 labels: Iterable[str] = (), kind: str = 'gauge'):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self._read = read
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        return [('', _format_labels(self.label_names, self._key(labels)), value)
+                for labels, value in self._read() if value is not None]
+
+
+class MetricsRegistry:
+    """Creates metrics and renders them all for a scrape."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(self, name: str, documentation: str, read: Callable[[], Iterable[tuple[dict, float]]],
+              labels: Iterable[str] = (), kind: str = 'gauge') -> CallbackGauge:
+        """Registers a callback metric; `kind='counter'` exposes a count kept elsewhere."""
+        return self._register(CallbackGauge(name, documentation, read, labels, kind))
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
@@ -1,15 +1,121 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
 import xgboost as xgb
 import joblib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
 
 from src import config
-from src.visualization import plot_actual_vs_predicted
+from src.data_store import load_cleaned_data
 
 
-def train_and_evaluate_model(df: pd.DataFrame) -> xgb.XGBRegressor:
+def training_columns() -> list[str]:
+    """
+    Lists the stored columns needed to train the model.
+
+    `days_since_release` is engineered from `release_date` at training time,
+    so it is replaced by that column.
+
+    Returns:
+        list[str]: Column names to load from the cleaned dataset.
+    """
+    stored_features = [col for col in config.MODEL_FEATURES if col != 'days_since_release']
+    return stored_features + ['release_date', config.TARGET_VARIABLE]
+
+
+def add_days_since_release(df: pd.DataFrame, errors: str = 'raise') -> pd.DataFrame:
+    """
+    Engineers the `days_since_release` feature from `release_date` in place.
+
+    Args:
+        df (pd.DataFrame): Dataset with a `release_date` column.
+        errors (str): 'raise' to fail on a date that cannot be parsed, or
+            'coerce' to make it NaT, leaving `days_since_release` missing.
+
+    Returns:
+        pd.DataFrame: The same DataFrame with `release_date` parsed and
+            `days_since_release` added.
+    """
+    df['release_date'] = pd.to_datetime(df['release_date'], errors=errors)
+    df['days_since_release'] = (pd.to_datetime(config.DAYS_SINCE_RELEASE_REFERENCE_DATE) - df['release_date']).dt.days
+    return df
+
+
+def prepare_features(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Engineers `days_since_release` and splits the dataset into features and target.
+
+    Args:
+        df (pd.DataFrame): Cleaned dataset; `release_date` and `days_since_release`
+            are updated in place.
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: Features in `config.MODEL_FEATURES` order and the target.
+    """
+    add_days_since_release(df)
+    return df[config.MODEL_FEATURES].copy(), df[config.TARGET_VARIABLE].copy()
+
+
+def fit_fast_model(X_train: pd.DataFrame, y_train: pd.Series,
+                   params: dict | None = None) -> xgb.XGBRegressor:
+    """
+    Trains with histogram trees and early stopping on a held-out validation split.
+
+    The features are quantized once into a `QuantileDMatrix`; the validation
+    matrix reuses its bin boundaries. Boosting stops once validation RMSE has not
+    improved for `config.FAST_TRAINING_EARLY_STOPPING_ROUNDS` rounds, and
+    `n_estimators` acts as an upper bound.
+
+    Args:
+        X_train (pd.DataFrame): Training features in `config.MODEL_FEATURES` order.
+        y_train (pd.Series): Training target.
+        params (dict | None): XGBoost parameters. Defaults to `config.XGB_PARAMS`;
+            `config.FAST_TRAINING_PARAMS` is applied on top.
+
+    Returns:
+        xgb.XGBRegressor: The fitted model. Its booster stores `best_iteration`,
+            which `predict` uses and which is kept in the saved artifact.
+    """
+    from sklearn.model_selection import train_test_split
+
+    params = {**(params or config.XGB_PARAMS), **config.FAST_TRAINING_PARAMS}
+    X_fit, X_valid, y_fit, y_valid = train_test_split(
+        X_train, y_train, test_size=config.FAST_TRAINING_VALIDATION_SIZE, random_state=42
+    )
+
+    dtrain = xgb.QuantileDMatrix(X_fit, y_fit, max_bin=params['max_bin'])
+    dvalid = xgb.QuantileDMatrix(X_valid, y_valid, ref=dtrain)
+
+    # Map the sklearn-style parameters onto xgb.train's
+    train_params = {key: value for key, value in params.items() if key not in ('n_estimators', 'random_state', 'n_jobs')}
+    train_params['seed'] = params.get('random_state', 0)
+    if params.get('n_jobs', -1) > 0:
+        train_params['nthread'] = params['n_jobs']
+
+    booster = xgb.train(
+        train_params, dtrain,
+        num_boost_round=params['n_estimators'],
+        evals=[(dvalid, 'validation')],
+        early_stopping_rounds=config.FAST_TRAINING_EARLY_STOPPING_ROUNDS,
+        verbose_eval=False,
+    )
+    booster.set_attr(training_mode='fast')
+    print(f"Early stopping kept {booster.best_iteration + 1} of {booster.num_boosted_rounds()} trees.")
+
+    # Wrap the booster so the artifact keeps the XGBRegressor interface the app uses
+    model = xgb.XGBRegressor(**params)
+    model.load_model(booster.save_raw('json'))
+    return model
+
+
+def train_and_evaluate_model(df: pd.DataFrame, params: dict | None = None,
+                             fast: bool = config.FAST_TRAINING_ENABLED,
+                             models_dir: Path = config.MODELS_DIR) -> xgb.XGBRegressor:
     """
     Trains, evaluates, and saves an XGBoost regression model.
 
@@ -23,19 +129,26 @@ def train_and_evaluate_model(df: pd.DataFrame) -> xgb.XGBRegressor:
 
     Args:
         df (pd.DataFrame): Cleaned and preprocessed dataset.
+        params (dict | None): XGBoost parameters. Defaults to `config.XGB_PARAMS`.
+        fast (bool): Train with `fit_fast_model` instead of building every tree.
+        models_dir (Path): Directory the model files are saved to, under the
+            names of `config.MODEL_FILE`, `config.MODEL_BOOSTER_FILE` and
+            `config.MODEL_SCHEMA_FILE`. Defaults to `config.MODELS_DIR`.
 
     Returns:
         xgb.XGBRegressor: The trained XGBoost model.
     """
+    # Training and plotting dependencies are imported here so that serving,
+    # which only needs load_model, does not pay for them.
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from src.visualization import plot_actual_vs_predicted
+
     print("Starting model training pipeline...")
 
     print("Performing final feature engineering...")
-    df['release_date'] = pd.to_datetime(df['release_date'])
-    df['days_since_release'] = (pd.to_datetime('2025-07-07') - df['release_date']).dt.days
-
     print("Preparing features and target variable...")
-    X = df[config.MODEL_FEATURES].copy()
-    y = df[config.TARGET_VARIABLE].copy()
+    X, y = prepare_features(df)
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42
@@ -43,8 +156,11 @@ def train_and_evaluate_model(df: pd.DataFrame) -> xgb.XGBRegressor:
     print(f"Split data: {len(X_train)} for training, {len(X_test)} for testing.")
 
     print("Training XGBoost model...")
-    model = xgb.XGBRegressor(**config.XGB_PARAMS)
-    model.fit(X_train, y_train)
+    if fast:
+        model = fit_fast_model(X_train, y_train, params)
+    else:
+        model = xgb.XGBRegressor(**(params or config.XGB_PARAMS))
+        model.fit(X_train, y_train)
     print("Model training completed.")
 
     print("Evaluating model performance on test data...")
@@ -57,14 +173,37 @@ def train_and_evaluate_model(df: pd.DataFrame) -> xgb.XGBRegressor:
 
     plot_actual_vs_predicted(y_test, y_pred, title="Model Performance: Actual vs. Predicted")
 
-    print(f"Saving trained model to: {config.MODEL_FILE}")
-    joblib.dump(model, config.MODEL_FILE)
+    model_file = models_dir / config.MODEL_FILE.name
+    print(f"Saving trained model to: {model_file}")
+    # Write to a temporary file and swap it in, so a running app never loads a partial file
+    config.ensure_directories()
+    models_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = model_file.with_name(model_file.name + '.tmp')
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, model_file)
+    export_native_model(model, models_dir / config.MODEL_BOOSTER_FILE.name, models_dir / config.MODEL_SCHEMA_FILE.name)
     print("Model saved successfully.")
 
     print("Model training pipeline finished.")
     return model
 
 
+def load_best_params(params_path: Path = config.BEST_PARAMS_FILE) -> dict | None:
+    """
+    Loads the parameters saved by the last `tune_hyperparameters` run.
+
+    Args:
+        params_path (Path): Path to the saved parameters.
+
+    Returns:
+        dict | None: The tuned XGBoost parameters, or None if no tuning has run yet.
+    """
+    if not params_path.exists():
+        return None
+    with open(params_path, 'r', encoding='utf-8') as params_file:
+        return json.load(params_file)
+
+
 def load_model(model_path: Path = config.MODEL_FILE) -> xgb.XGBRegressor:
     """
     Loads a trained XGBoost model from disk.
@@ -86,12 +225,249 @@ def load_model(model_path: Path = config.MODEL_FILE) -> xgb.XGBRegressor:
     return model
 
 
+def export_native_model(model: xgb.XGBRegressor, model_path: Path = config.MODEL_BOOSTER_FILE,
+                        schema_path: Path = config.MODEL_SCHEMA_FILE) -> None:
+    """
+    Exports the model's booster in XGBoost's native format with a feature schema.
+
+    The booster is written as UBJ (or JSON, if `model_path` ends in `.json`) and
+    can be loaded by `serving.NativeModel` without pickle or the sklearn wrapper.
+    The schema records the feature order, input dtype and how many trees to use,
+    so early-stopped models keep predicting with their best iteration.
+
+    Args:
+        model (xgb.XGBRegressor): The trained model.
+        model_path (Path): Destination of the booster file.
+        schema_path (Path): Destination of the feature schema.
+    """
+    booster = model.get_booster()
+    best_iteration = booster.attr('best_iteration')
+    num_trees = int(best_iteration) + 1 if best_iteration is not None else booster.num_boosted_rounds()
+    schema = {
+        'features': config.MODEL_FEATURES,
+        'target': config.TARGET_VARIABLE,
+        'dtype': 'float32',
+        'num_trees': num_trees,
+        'model_file': model_path.name,
+        'xgboost_version': xgb.__version__,
+        'exported_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+    print(f"Exporting native booster to: {model_path}")
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    # The schema is swapped in before the booster, so a watcher that sees the
+    # new booster file also finds its schema.
+    tmp_schema = schema_path.with_name(schema_path.name + '.tmp')
+    with open(tmp_schema, 'w', encoding='utf-8') as schema_file:
+        json.dump(schema, schema_file, indent=2)
+    os.replace(tmp_schema, schema_path)
+    tmp_model = model_path.with_name(f"{model_path.stem}.tmp{model_path.suffix}")
+    booster.save_model(tmp_model)
+    os.replace(tmp_model, model_path)
+
+
+# Per-process training data for tuning workers, set by _init_tuning_worker
+_tuning_data = {}
+
+
+def _init_tuning_worker(X: pd.DataFrame, y: pd.Series, folds: list):
+    """Stores the training data once per worker process instead of once per trial."""
+    _tuning_data.update(X=X, y=y, folds=folds)
+
+
+def _evaluate_candidate(trial: int, params: dict, n_jobs: int, deadline: float) -> dict | None:
+    """
+    Cross-validates one parameter set with early stopping on every fold.
+
+    Each fold's training part is split again so that early stopping watches
+    data the fold is not scored on. The deadline is checked before every fold:
+    once it has passed, the trial is abandoned, so at most the fold in progress
+    runs past the budget.
+
+    Returns:
+        dict | None: Fold scores and best iterations, or None if the time budget
+            ran out before every fold finished.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    start = time.perf_counter()
+    X, y = _tuning_data['X'], _tuning_data['y']
+    fit_params = {
+        **config.XGB_PARAMS, **params,
+        'n_estimators': config.TUNING_MAX_ESTIMATORS,
+        'early_stopping_rounds': config.TUNING_EARLY_STOPPING_ROUNDS,
+        'n_jobs': n_jobs,
+    }
+    r2_scores, mae_scores, best_iterations = [], [], []
+    for train_idx, val_idx in _tuning_data['folds']:
+        if time.time() > deadline:
+            return None
+        X_fit, X_stop, y_fit, y_stop = train_test_split(
+            X.iloc[train_idx], y.iloc[train_idx], test_size=0.1, random_state=42
+        )
+        model = xgb.XGBRegressor(**fit_params)
+        model.fit(X_fit, y_fit, eval_set=[(X_stop, y_stop)], verbose=False)
+        y_pred = model.predict(X.iloc[val_idx])
+        r2_scores.append(r2_score(y.iloc[val_idx], y_pred))
+        mae_scores.append(mean_absolute_error(y.iloc[val_idx], y_pred))
+        best_iterations.append(int(model.best_iteration))
+
+    return {
+        'trial': trial,
+        'params': params,
+        'r2_mean': float(np.mean(r2_scores)),
+        'r2_std': float(np.std(r2_scores)),
+        'mae_mean': float(np.mean(mae_scores)),
+        'mae_std': float(np.std(mae_scores)),
+        'best_iterations': best_iterations,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _split_cores(n_trials: int, n_workers: int | None) -> tuple[int, int]:
+    """
+    Splits the available cores between the process pool and XGBoost threads.
+
+    Trials are independent, so by default every core runs its own trial and
+    XGBoost gets a single thread; with fewer trials than cores, the spare cores
+    go to XGBoost inside each worker.
+    """
+    cpu_count = os.cpu_count() or 1
+    if n_workers is None:
+        n_workers = min(n_trials, cpu_count)
+    n_workers = max(1, n_workers)
+    return n_workers, max(1, cpu_count // n_workers)
+
+
+def tune_hyperparameters(df: pd.DataFrame, n_trials: int = config.TUNING_N_TRIALS,
+                         n_folds: int = config.TUNING_CV_FOLDS,
+                         time_budget: float = config.TUNING_TIME_BUDGET_SECONDS,
+                         n_workers: int | None = None, seed: int = 42) -> dict:
+    """
+    Searches XGBoost hyperparameters with k-fold cross-validation in parallel.
+
+    This function:
+    - Holds out the same 20% test split as `train_and_evaluate_model`
+    - Samples `n_trials` random candidates from `config.TUNING_SEARCH_SPACE`
+    - Cross-validates each candidate on the training split across a process
+      pool, with early stopping on every fold
+    - Abandons candidates whose folds have not all started within
+      `time_budget` seconds; only a fold already running can overrun it
+    - Retrains the best candidate with `train_and_evaluate_model`, using the
+      median best iteration across folds as the number of trees
+    - Writes the best parameters to `config.BEST_PARAMS_FILE`, which later
+      pipeline runs train with, and the full CV report to `config.CV_REPORT_FILE`
+
+    Args:
+        df (pd.DataFrame): Cleaned and preprocessed dataset.
+        n_trials (int): Number of random-search candidates.
+        n_folds (int): Number of cross-validation folds.
+        time_budget (float): Wall-clock budget in seconds for starting folds.
+        n_workers (int | None): Worker processes. Defaults to one per core, up to `n_trials`.
+        seed (int): Seed for candidate sampling and fold assignment.
+
+    Returns:
+        dict: The CV report, including the best parameters.
+    """
+    from sklearn.model_selection import KFold, train_test_split
+
+    print("Starting hyperparameter tuning...")
+    start = time.perf_counter()
+    deadline = time.time() + time_budget
+
+    X, y = prepare_features(df)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+    folds = list(KFold(n_splits=n_folds, shuffle=True, random_state=seed).split(X_train))
+
+    rng = np.random.default_rng(seed)
+    candidates = [
+        {name: values[rng.integers(len(values))] for name, values in config.TUNING_SEARCH_SPACE.items()}
+        for _ in range(n_trials)
+    ]
+    # Cast NumPy scalars so the parameters serialize cleanly to JSON
+    candidates = [{name: value.item() if hasattr(value, 'item') else value for name, value in c.items()}
+                  for c in candidates]
+
+    n_workers, n_jobs = _split_cores(n_trials, n_workers)
+    print(f"Evaluating {n_trials} candidates with {n_folds}-fold CV on {n_workers} "
+          f"worker(s) x {n_jobs} XGBoost thread(s), budget {time_budget:.0f}s...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_tuning_worker,
+                             initargs=(X_train, y_train, folds)) as pool:
+        futures = [pool.submit(_evaluate_candidate, trial, params, n_jobs, deadline)
+                   for trial, params in enumerate(candidates)]
+        for future in as_completed(futures):
+            result = future.result()
+            if result is None:
+                continue
+            results.append(result)
+            print(f"  Trial {result['trial']:>3}: R² {result['r2_mean']:.4f} ± {result['r2_std']:.4f}, "
+                  f"MAE {result['mae_mean']:.4f} ({result['seconds']:.1f}s)")
+
+    if not results:
+        raise RuntimeError("No tuning trial finished within the time budget.")
+
+    results.sort(key=lambda r: r['r2_mean'], reverse=True)
+    best = results[0]
+    best_params = {
+        **config.XGB_PARAMS, **best['params'],
+        'n_estimators': int(np.median(best['best_iterations'])) + 1,
+    }
+    print(f"Best trial {best['trial']}: R² {best['r2_mean']:.4f}, params {best['params']}")
+
+    model = train_and_evaluate_model(df, params=best_params)
+
+    report = {
+        'best_params': best_params,
+        'best_trial': best['trial'],
+        'n_trials': n_trials,
+        'n_completed': len(results),
+        'cv_folds': n_folds,
+        'workers': n_workers,
+        'xgb_threads_per_worker': n_jobs,
+        'elapsed_seconds': time.perf_counter() - start,
+        'trials': results,
+    }
+    # The pipeline's train stage reads this file, so never leave it half-written
+    tmp_path = config.BEST_PARAMS_FILE.with_name(config.BEST_PARAMS_FILE.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as params_file:
+        json.dump(best_params, params_file, indent=2)
+    os.replace(tmp_path, config.BEST_PARAMS_FILE)
+    with open(config.CV_REPORT_FILE, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f"Best parameters saved to: {config.BEST_PARAMS_FILE}")
+    print(f"CV report saved to: {config.CV_REPORT_FILE}")
+    print(f"Hyperparameter tuning finished in {report['elapsed_seconds']:.1f}s.")
+    return report
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the track score model, optionally tuning it first.")
+    parser.add_argument('--fast', action='store_true', default=config.FAST_TRAINING_ENABLED,
+                        help='Train with histogram trees and early stopping.')
+    parser.add_argument('--tune', action='store_true', help='Run the cross-validated hyperparameter search.')
+    parser.add_argument('--export', action='store_true',
+                        help='Export the saved joblib model in native format without retraining.')
+    parser.add_argument('--trials', type=int, default=config.TUNING_N_TRIALS)
+    parser.add_argument('--folds', type=int, default=config.TUNING_CV_FOLDS)
+    parser.add_argument('--budget', type=float, default=config.TUNING_TIME_BUDGET_SECONDS,
+                        help='Wall-clock budget in seconds for starting cross-validation folds.')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
     print("Running model training module as a standalone script...")
 
-    if config.CLEANED_DATA_FILE.exists():
-        df_clean = pd.read_csv(config.CLEANED_DATA_FILE)
-        train_and_evaluate_model(df_clean)
+    if args.export:
+        export_native_model(load_model())
+    elif config.CLEANED_DATA_FILE.exists():
+        df_clean = load_cleaned_data(columns=training_columns())
+        if args.tune:
+            tune_hyperparameters(df_clean, n_trials=args.trials, n_folds=args.folds,
+                                 time_budget=args.budget, n_workers=args.workers)
+        else:
+            train_and_evaluate_model(df_clean, fast=args.fast)
     else:
         print(f"Error: Cleaned dataset not found at {config.CLEANED_DATA_FILE}")
         print("Please execute the data processing script before training.")
@@ -0,0 +1,281 @@
+"""
+Module for rendering and caching plots outside the request path.
+
+Plots are drawn with matplotlib's object-oriented `Figure` API, which keeps no
+global state, so several can be rendered at once from a thread pool without
+touching `pyplot`. `PlotService` stores each rendered PNG on disk under a name
+derived from the data version and the plot parameters: a repeat request is a
+file lookup, and a new data version is rendered in the background as soon as
+it is loaded.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from src import config
+from src.stats_engine import correlation_matrix
+
+# Colors of the web app's dark theme
+BACKGROUND_COLOR = '#121212'
+AXES_COLOR = '#1e1e1e'
+ACCENT_COLOR = '#1DB954'
+
+
+def _new_figure(figsize: tuple[float, float]):
+    """Creates a standalone dark-themed figure and axes without pyplot."""
+    # Imported on first render to keep the web app's startup light
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, facecolor=BACKGROUND_COLOR)
+    ax = fig.add_subplot()
+    ax.set_facecolor(AXES_COLOR)
+    ax.tick_params(colors='white')
+    for spine in ax.spines.values():
+        spine.set_color('#555555')
+    return fig, ax
+
+
+def _gaussian_kde(values: np.ndarray, grid: np.ndarray, max_points: int = 5_000) -> np.ndarray:
+    """
+    Evaluates a Gaussian kernel density estimate with Scott's bandwidth on `grid`.
+
+    Large inputs are evenly subsampled to `max_points`, which keeps the cost
+    bounded without visibly changing the curve.
+    """
+    if len(values) > max_points:
+        values = np.sort(values)[np.linspace(0, len(values) - 1, max_points).astype(int)]
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    if not bandwidth > 0:
+        return np.zeros_like(grid)
+    z = (grid[:, np.newaxis] - values[np.newaxis, :]) / bandwidth
+    return np.exp(-0.5 * z ** 2).sum(axis=1) / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+
+
+def render_streams_distribution(df: pd.DataFrame, bins: int = 30, kde: bool = True):
+    """
+    Draws a histogram of track stream counts in millions, optionally with a KDE curve.
+
+    Args:
+        df (pd.DataFrame): Data with a `spotify_streams` column.
+        bins (int): Number of histogram bins.
+        kde (bool): Overlay a kernel density estimate scaled to track counts.
+
+    Returns:
+        matplotlib.figure.Figure: The rendered figure.
+
+    Raises:
+        ValueError: If `bins` is outside 1-200.
+    """
+    if not 1 <= bins <= 200:
+        raise ValueError("bins must be between 1 and 200.")
+    streams = (df['spotify_streams'].dropna().to_numpy(dtype=np.float64)) / 1_000_000
+    fig, ax = _new_figure((10, 6))
+
+    counts, edges, _ = ax.hist(streams, bins=bins, color=ACCENT_COLOR, alpha=0.6, edgecolor=AXES_COLOR)
+    if kde and len(streams) > 1:
+        grid = np.linspace(edges[0], edges[-1], 200)
+        ax.plot(grid, _gaussian_kde(streams, grid) * len(streams) * (edges[1] - edges[0]), color=ACCENT_COLOR)
+
+    ax.set_title('Distribution of Track Streams (in Millions)', fontsize=16, color='white')
+    ax.set_xlabel('Streams (Millions)', fontsize=12, color='white')
+    ax.set_ylabel('Track Count', fontsize=12, color='white')
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    return fig
+
+
+def render_top_artists(df: pd.DataFrame, metric: str = 'spotify_streams', n: int = 10):
+    """
+    Draws a horizontal bar chart of the top N artists by the total of a metric.
+
+    Args:
+        df (pd.DataFrame): Data with `artist` and `metric` columns.
+        metric (str): Column to total per artist.
+        n (int): Number of artists to show.
+
+    Returns:
+        matplotlib.figure.Figure: The rendered figure.
+
+    Raises:
+        ValueError: If `metric` is not a numeric column of `df` or `n` is outside 1-50.
+    """
+    if metric not in df.columns or metric == 'artist':
+        raise ValueError(f"Unknown metric '{metric}'.")
+    if not pd.api.types.is_numeric_dtype(df[metric]) or pd.api.types.is_bool_dtype(df[metric]):
+        raise ValueError(f"Metric '{metric}' is not numeric.")
+    if not 1 <= n <= 50:
+        raise ValueError("n must be between 1 and 50.")
+    totals = df.groupby('artist', observed=True)[metric].sum().nlargest(n)
+    fig, ax = _new_figure((12, 8))
+
+    ax.barh(totals.index.astype(str)[::-1], totals.to_numpy()[::-1], color=ACCENT_COLOR)
+    label = metric.replace('_', ' ').title()
+    ax.set_title(f'Top {n} Artists by {label}', fontsize=16, color='white')
+    ax.set_xlabel(label, fontsize=12, color='white')
+    ax.grid(axis='x', linestyle='--', alpha=0.3)
+    return fig
+
+
+def render_correlation_heatmap(df: pd.DataFrame, cols: tuple[str, ...] = tuple(config.MODEL_FEATURES[:-2])):
+    """
+    Draws an annotated Pearson correlation heatmap.
+
+    Args:
+        df (pd.DataFrame): Data with the given columns.
+        cols (tuple[str, ...]): Columns to correlate.
+
+    Returns:
+        matplotlib.figure.Figure: The rendered figure.
+    """
+    corr = correlation_matrix(df[list(cols)].to_numpy(dtype=np.float64, na_value=np.nan))
+    fig, ax = _new_figure((12, 10))
+
+    image = ax.imshow(corr, cmap='viridis', vmin=-1, vmax=1)
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks(range(len(cols)), cols, rotation=45, ha='right')
+    ax.set_yticks(range(len(cols)), cols)
+    for i in range(len(cols)):
+        for j in range(len(cols)):
+            ax.text(j, i, f'{corr[i, j]:.2f}', ha='center', va='center', color='white', fontsize=8)
+    ax.set_title('Correlation Matrix', fontsize=16, color='white')
+    return fig
+
+
+@dataclass(frozen=True)
+class PlotSpec:
+    """A named plot: its renderer, the data columns it reads and its default parameters."""
+    render: Callable
+    columns: list[str]
+    defaults: dict = field(default_factory=dict)
+
+
+PLOTS = {
+    'streams_distribution': PlotSpec(render_streams_distribution, ['spotify_streams'], {'bins': 30, 'kde': True}),
+    'top_artists': PlotSpec(render_top_artists, ['artist'] + config.ARTIST_INDEX_METRICS,
+                            {'metric': 'spotify_streams', 'n': 10}),
+    'correlation_heatmap': PlotSpec(render_correlation_heatmap, config.MODEL_FEATURES[:-2], {}),
+}
+
+
+def save_figure(fig, path: Path) -> None:
+    """Writes a figure as PNG through a temporary file, so readers never see a partial image."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp.png")
+    fig.savefig(tmp_path, format='png', bbox_inches='tight', facecolor=fig.get_facecolor())
+    os.replace(tmp_path, path)
+
+
+class PlotService:
+    """
+    Renders plots in a thread pool and caches the PNGs on disk per data version.
+
+    Args:
+        cache_dir (Path): Directory holding the cached PNG files.
+        workers (int): Threads rendering plots concurrently.
+        warm_plots (list[str] | None): Plots rendered with default parameters
+            whenever a new data version is loaded. Defaults to all plots.
+    """
+
+    def __init__(self, cache_dir: Path = config.PLOT_CACHE_DIR, workers: int = config.PLOT_RENDER_WORKERS,
+                 warm_plots: list[str] | None = None):
+        self.cache_dir = cache_dir
+        self.warm_plots = list(PLOTS) if warm_plots is None else warm_plots
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='plot-render')
+        self._in_flight: dict[Path, Future] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def resolve_params(name: str, params: dict | None = None) -> dict:
+        """
+        Merges request parameters into a plot's defaults, coercing them to the defaults' types.
+
+        Raises:
+            KeyError: If the plot does not exist.
+            ValueError: If a parameter is unknown or cannot be converted.
+        """
+        if name not in PLOTS:
+            raise KeyError(f"Unknown plot '{name}'. Available plots: {', '.join(PLOTS)}.")
+        defaults = PLOTS[name].defaults
+        resolved = dict(defaults)
+        for key, value in (params or {}).items():
+            if key not in defaults:
+                raise ValueError(f"Unknown parameter '{key}' for plot '{name}'.")
+            if isinstance(defaults[key], bool) and isinstance(value, str):
+                value = value.lower() in ('1', 'true', 'yes')
+            try:
+                resolved[key] = type(defaults[key])(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for '{key}': {value!r}.") from None
+        return resolved
+
+    def cache_path(self, name: str, data_version: str, params: dict) -> Path:
+        """Returns the file a plot is cached in for a data version and resolved parameters."""
+        params_hash = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"{name}-{data_version}-{params_hash}.png"
+
+    def _render(self, name: str, df: pd.DataFrame, params: dict, path: Path) -> Path:
+        try:
+            save_figure(PLOTS[name].render(df, **params), path)
+            with self._lock:
+                self.renders += 1
+            return path
+        finally:
+            with self._lock:
+                self._in_flight.pop(path, None)
+
+    def submit(self, name: str, df: pd.DataFrame, data_version: str, params: dict | None = None) -> Future:
+        """
+        Returns a future for the cached PNG path, rendering it only if it is not cached yet.
+
+        Concurrent requests for the same plot share one render.
+
+        Raises:
+            KeyError: If the plot does not exist.
+            ValueError: If the parameters are invalid.
+        """
+        params = self.resolve_params(name, params)
+        path = self.cache_path(name, data_version, params)
+        with self._lock:
+            if path in self._in_flight:
+                return self._in_flight[path]
+            if path.exists():
+                self.cache_hits += 1
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._pool.submit(self._render, name, df, params, path)
+            self._in_flight[path] = future
+            return future
+
+    def get(self, name: str, df: pd.DataFrame, data_version: str, params: dict | None = None,
+            timeout: float | None = config.PLOT_RENDER_TIMEOUT_SECONDS) -> Path:
+        """Returns the path of the cached PNG, waiting for it to be rendered if needed."""
+        return self.submit(name, df, data_version, params).result(timeout=timeout)
+
+    def warm(self, df: pd.DataFrame, data_version: str) -> None:
+        """
+        Removes plots of older data versions and renders the default plots for this one.
+
+        Meant to run whenever new data is loaded; rendering happens in the pool,
+        so this returns immediately.
+        """
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.png'):
+                if f"-{data_version}-" not in path.name and not path.name.endswith('.tmp.png'):
+                    path.unlink(missing_ok=True)
+        for name in self.warm_plots:
+            self.submit(name, df, data_version)
+
+    def stats(self) -> dict:
+        """Returns render and cache-hit counters as a JSON-serializable dict."""
+        with self._lock:
+            return {'renders': self.renders, 'cache_hits': self.cache_hits, 'in_flight': len(self._in_flight)}
@@ -0,0 +1,164 @@
+"""
+Module for profiling pipeline stages.
+
+`StageProfiler` measures wall time, CPU time and peak resident memory of each
+pipeline stage and writes them to `config.PIPELINE_RUN_REPORT_FILE` as a JSON
+run report. On Linux the kernel's resident-memory high-water mark is reset
+when a stage starts, so its peak is exact; elsewhere only growth of the
+process's lifetime peak can be attributed to a stage, and a stage that stays
+below an earlier stage's peak reports the larger of its start and end size.
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src import config
+
+_MB = 1024 * 1024
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _proc_status_bytes(field: str) -> int | None:
+    """Reads a memory field such as 'VmRSS' from /proc/self/status in bytes, or None if unavailable."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(f'{field}:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _max_rss(who: int = resource.RUSAGE_SELF) -> int:
+    return resource.getrusage(who).ru_maxrss * _MAXRSS_UNIT
+
+
+def current_rss() -> int:
+    """Returns this process's resident set size in bytes, or its peak where the current value is unavailable."""
+    rss = _proc_status_bytes('VmRSS')
+    return _max_rss() if rss is None else rss
+
+
+def _reset_peak_rss() -> bool:
+    """Resets the kernel's high-water mark of this process's resident memory (Linux 4.0+)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _cpu_seconds() -> tuple[float, float]:
+    """Returns the user + system CPU time of this process and of its waited-for children."""
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+
+@dataclass
+class StageProfile:
+    """Resource usage of one pipeline stage."""
+    name: str
+    status: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    child_cpu_seconds: float = 0.0
+    rss_start_mb: float = 0.0
+    rss_end_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+
+
+class StageProfiler:
+    """
+    Profiles the stages of one pipeline run and writes the run report.
+
+    Args:
+        report_path (Path): Where `save` writes the JSON report.
+    """
+
+    def __init__(self, report_path: Path = config.PIPELINE_RUN_REPORT_FILE):
+        self.report_path = report_path
+        self._max_rss = _max_rss()
+        self.started_at = datetime.now(timezone.utc)
+        self._start_wall = time.perf_counter()
+        self.stages: list[StageProfile] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profiles the code run inside the `with` block as one stage.
+
+        The stage is recorded as 'completed' unless the block changes the
+        yielded profile's `status` (e.g. to 'skipped') or raises.
+
+        Yields:
+            StageProfile: The stage's record, filled in when the block exits.
+        """
+        start_rss = current_rss()
+        profile = StageProfile(name, 'completed', rss_start_mb=start_rss / _MB)
+        # Resetting the high-water mark also resets ru_maxrss, so keep the run's peak first
+        self._max_rss = max(self._max_rss, _max_rss())
+        exact_peak = _reset_peak_rss()
+        max_rss_start = _max_rss()
+        cpu_start, child_cpu_start = _cpu_seconds()
+        wall_start = time.perf_counter()
+        try:
+            yield profile
+        except BaseException:
+            profile.status = 'failed'
+            raise
+        finally:
+            cpu_end, child_cpu_end = _cpu_seconds()
+            profile.wall_seconds = time.perf_counter() - wall_start
+            profile.cpu_seconds = cpu_end - cpu_start
+            profile.child_cpu_seconds = child_cpu_end - child_cpu_start
+            end_rss = current_rss()
+            max_rss_end = _max_rss()
+            self._max_rss = max(self._max_rss, max_rss_end)
+            peak_rss = _proc_status_bytes('VmHWM') if exact_peak else None
+            if peak_rss is None:
+                peak_rss = max_rss_end if max_rss_end > max_rss_start else max(start_rss, end_rss)
+            profile.rss_end_mb = end_rss / _MB
+            profile.peak_rss_mb = peak_rss / _MB
+            self.stages.append(profile)
+
+    def report(self) -> dict:
+        """Returns the run report as a JSON-serializable dict."""
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self._start_wall, 4),
+            'max_rss_mb': round(max(self._max_rss, _max_rss()) / _MB, 1),
+            'children_max_rss_mb': round(_max_rss(resource.RUSAGE_CHILDREN) / _MB, 1),
+            'stages': [
+                {key: round(value, 4 if key.endswith('seconds') else 1) if isinstance(value, float) else value
+                 for key, value in asdict(stage).items()}
+                for stage in self.stages
+            ],
+        }
+
+    def save(self) -> dict:
+        """Writes the run report atomically and returns it."""
+        report = self.report()
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.report_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+        os.replace(tmp_path, self.report_path)
+        return report
+
+    def summary(self) -> str:
+        """Returns a fixed-width table of the profiled stages."""
+        lines = [f"{'stage':<10}{'status':<11}{'wall s':>9}{'cpu s':>9}{'child cpu s':>13}{'peak RSS MB':>13}"]
+        for stage in self.stages:
+            lines.append(f"{stage.name:<10}{stage.status:<11}{stage.wall_seconds:>9.2f}{stage.cpu_seconds:>9.2f}"
+                         f"{stage.child_cpu_seconds:>13.2f}{stage.peak_rss_mb:>13.1f}")
+        return '\n'.join(lines)
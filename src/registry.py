@@ -0,0 +1,164 @@
+"""
+Module for serving versioned copies of the cleaned data and the trained model.
+
+`ServingRegistry` watches `config.CLEANED_DATA_FILE` and `config.MODEL_FILE`,
+loads new versions in a background thread and swaps them in atomically as an
+immutable `ServingSnapshot`. A request reads the current snapshot once and
+keeps using it, so in-flight requests finish on the version they started with.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from src import config
+from src.data_store import data_version
+
+
+@dataclass(frozen=True, eq=False)
+class LoadedArtifact:
+    """A loaded file together with the version it was loaded from."""
+    value: Any
+    version: str
+    loaded_at: datetime
+    load_seconds: float
+
+    def describe(self) -> dict:
+        """Returns JSON-serializable version information."""
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at.isoformat(timespec='seconds'),
+            'load_seconds': round(self.load_seconds, 4),
+        }
+
+
+@dataclass(frozen=True, eq=False)
+class ServingSnapshot:
+    """
+    Immutable view of everything a request needs.
+
+    Attributes:
+        data (LoadedArtifact | None): The cleaned DataFrame, if available.
+        model (LoadedArtifact | None): The trained model, if available.
+        extras (dict): Values derived from `data` when it was loaded.
+    """
+    data: LoadedArtifact | None = None
+    model: LoadedArtifact | None = None
+    extras: dict = field(default_factory=dict)
+
+
+class ServingRegistry:
+    """
+    Loads the cleaned data and model, and hot-swaps them when their files change.
+
+    Args:
+        load_data (Callable[[Path], Any]): Loads the cleaned data from a path.
+        load_model (Callable[[Path], Any]): Loads the model from a path.
+        data_extras (dict | None): Name -> function(data, version) computed in the
+            background whenever a new data version is loaded.
+        data_path (Path): Cleaned data file to watch.
+        model_path (Path): Model file to watch.
+    """
+
+    def __init__(self, load_data: Callable[[Path], Any], load_model: Callable[[Path], Any],
+                 data_extras: dict[str, Callable[[Any, str], Any]] | None = None,
+                 data_path: Path = config.CLEANED_DATA_FILE, model_path: Path = config.MODEL_FILE):
+        self._load_data = load_data
+        self._load_model = load_model
+        self._data_extras = data_extras or {}
+        self.data_path = data_path
+        self.model_path = model_path
+        self._snapshot = ServingSnapshot()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.last_checked_at = None
+        self.last_error = None
+
+    def current(self) -> ServingSnapshot:
+        """Returns the snapshot requests should use."""
+        return self._snapshot
+
+    def _load_if_changed(self, path: Path, current: LoadedArtifact | None,
+                         loader: Callable[[Path], Any]) -> LoadedArtifact | None:
+        if not path.exists():
+            return current
+        version = data_version(path)
+        if current is not None and current.version == version:
+            return current
+
+        start = time.perf_counter()
+        value = loader(path)
+        elapsed = time.perf_counter() - start
+        if data_version(path) != version:
+            raise RuntimeError(f"{path.name} changed while it was being loaded; will retry.")
+        return LoadedArtifact(value, version, datetime.now(timezone.utc), elapsed)
+
+    def refresh(self) -> bool:
+        """
+        Loads any changed files and swaps in a new snapshot.
+
+        On failure the previous snapshot stays in place and the error is kept in
+        `last_error`; the next refresh tries again.
+
+        Returns:
+            bool: True if a new snapshot was published.
+        """
+        with self._refresh_lock:
+            previous = self._snapshot
+            self.last_checked_at = datetime.now(timezone.utc)
+            try:
+                data = self._load_if_changed(self.data_path, previous.data, self._load_data)
+                model = self._load_if_changed(self.model_path, previous.model, self._load_model)
+                extras = previous.extras
+                if data is not previous.data:
+                    extras = {name: derive(data.value, data.version) for name, derive in self._data_extras.items()}
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Registry refresh failed, keeping current versions. {self.last_error}")
+                return False
+
+            self.last_error = None
+            if data is previous.data and model is previous.model:
+                return False
+
+            self._snapshot = ServingSnapshot(data=data, model=model, extras=extras)
+            if data is not previous.data:
+                print(f"Loaded cleaned data version {data.version} in {data.load_seconds:.2f}s.")
+            if model is not previous.model:
+                print(f"Loaded model version {model.version} in {model.load_seconds:.2f}s.")
+            return True
+
+    def start_watching(self, interval: float = config.HOT_RELOAD_POLL_SECONDS):
+        """Starts a daemon thread that calls `refresh` every `interval` seconds."""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.refresh()
+
+        self._watcher = threading.Thread(target=watch, name='registry-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stops the watcher thread, if running."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self._stop.clear()
+
+    def status(self) -> dict:
+        """Returns the current versions and load times as a JSON-serializable dict."""
+        snapshot = self._snapshot
+        return {
+            'data': snapshot.data.describe() if snapshot.data else None,
+            'model': snapshot.model.describe() if snapshot.model else None,
+            'watching': self._watcher is not None,
+            'last_checked_at': self.last_checked_at.isoformat(timespec='seconds') if self.last_checked_at else None,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,443 @@
+"""
+Module for preparing model inputs and scoring them at request time.
+
+Feature records are turned into a NumPy matrix in `config.MODEL_FEATURES`
+order so a whole batch can be scored with one `predict` call, and
+`MicroBatcher` coalesces concurrent single-record requests into such batches.
+`NativeModel` scores such matrices with the exported XGBoost booster directly,
+and `PredictionCache` remembers recent single-row results per model version.
+`sweep_grid` expands one record into the grid of a what-if sweep, scored with
+one call as well, after `distinct_sweep_values` has dropped the swept values
+the model cannot tell apart.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import cached_property
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import xgboost as xgb
+from src import config
+
+
+def records_to_matrix(records: list[dict]) -> np.ndarray:
+    """
+    Builds a float32 feature matrix from a list of feature records.
+
+    Args:
+        records (list[dict]): Mappings of feature name to a number or numeric string.
+            Missing values may be given as None or an empty string.
+
+    Returns:
+        np.ndarray: Array of shape (len(records), len(config.MODEL_FEATURES)).
+
+    Raises:
+        ValueError: If a record is not a mapping, lacks a feature, or holds a
+            non-numeric value.
+    """
+    matrix = np.empty((len(records), len(config.MODEL_FEATURES)), dtype=np.float32)
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"Record {i} is not an object of feature values.")
+        for j, feature in enumerate(config.MODEL_FEATURES):
+            if feature not in record:
+                raise ValueError(f"Record {i} is missing feature '{feature}'.")
+            value = record[feature]
+            if value is None or value == '':
+                matrix[i, j] = np.nan
+                continue
+            try:
+                matrix[i, j] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Record {i} has a non-numeric value for '{feature}': {value!r}.") from None
+    return matrix
+
+
+def _sweep_values(spec: dict, max_steps: int) -> np.ndarray:
+    """Returns the values of one swept feature, given explicitly or as a linear or log-spaced range."""
+    if 'values' in spec:
+        values = spec['values']
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Sweep of '{spec['feature']}' needs a non-empty list of 'values'.")
+        try:
+            values = np.array(values, dtype=np.float32)
+        except (TypeError, ValueError):
+            values = None
+        if values is None or values.ndim != 1:
+            raise ValueError(f"Sweep of '{spec['feature']}' has non-numeric values.")
+    else:
+        try:
+            low, high = float(spec['min']), float(spec['max'])
+            steps = int(spec.get('steps', config.SWEEP_DEFAULT_STEPS))
+        except KeyError as e:
+            raise ValueError(f"Sweep of '{spec['feature']}' needs 'values' or 'min' and 'max', "
+                             f"missing {e.args[0]!r}.") from None
+        except (TypeError, ValueError):
+            raise ValueError(f"Sweep of '{spec['feature']}' has a non-numeric range.") from None
+        if not 1 <= steps <= max_steps:
+            raise ValueError(f"Sweep of '{spec['feature']}' needs 1 to {max_steps} steps.")
+        scale = spec.get('scale', 'linear')
+        if scale == 'log':
+            if low <= 0 or high <= 0:
+                raise ValueError(f"Log sweep of '{spec['feature']}' needs a positive range.")
+            values = np.geomspace(low, high, steps, dtype=np.float32)
+        elif scale == 'linear':
+            values = np.linspace(low, high, steps, dtype=np.float32)
+        else:
+            raise ValueError(f"Unknown sweep scale '{scale}'; use 'linear' or 'log'.")
+    if not np.isfinite(values).all():
+        raise ValueError(f"Sweep of '{spec['feature']}' has missing or non-finite values.")
+    if len(values) > max_steps:
+        raise ValueError(f"Sweep of '{spec['feature']}' has {len(values)} values; at most {max_steps} are allowed.")
+    return values
+
+
+def sweep_axes(sweeps: list[dict], max_steps: int = config.SWEEP_MAX_STEPS) -> dict[str, np.ndarray]:
+    """
+    Parses the swept features of a what-if sweep into their values.
+
+    Args:
+        sweeps (list[dict]): Per swept feature, its name as 'feature' and either
+            'values', a list of numbers, or 'min', 'max', optional 'steps'
+            (default `config.SWEEP_DEFAULT_STEPS`) and 'scale' ('linear' or 'log').
+        max_steps (int): Maximum number of values per swept feature.
+
+    Returns:
+        dict[str, np.ndarray]: The float32 values of each swept feature, in sweep order.
+
+    Raises:
+        ValueError: If a sweep is malformed, names an unknown or repeated
+            feature, or has too many values.
+    """
+    axes = {}
+    for i, spec in enumerate(sweeps):
+        if not isinstance(spec, dict) or 'feature' not in spec:
+            raise ValueError(f"Sweep {i} is not an object with a 'feature'.")
+        feature = spec['feature']
+        if feature not in config.MODEL_FEATURES:
+            raise ValueError(f"Unknown feature '{feature}'; expected one of {config.MODEL_FEATURES}.")
+        if feature in axes:
+            raise ValueError(f"Feature '{feature}' is swept more than once.")
+        axes[feature] = _sweep_values(spec, max_steps)
+    return axes
+
+
+def sweep_grid(base: np.ndarray, axes: dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Builds the feature matrix of a what-if sweep around a base record.
+
+    Every row is the base record with the swept features set to one
+    combination of their values. Rows run over the last swept feature
+    fastest, so predictions reshape to (len(values_1), len(values_2), ...).
+
+    Args:
+        base (np.ndarray): A single row in `config.MODEL_FEATURES` order.
+        axes (dict[str, np.ndarray]): Values of each swept feature.
+
+    Returns:
+        np.ndarray: The float32 grid, one row per combination.
+    """
+    size = int(np.prod([len(values) for values in axes.values()]))
+    grid = np.repeat(np.asarray(base, dtype=np.float32).reshape(1, -1), size, axis=0)
+    for feature, values in zip(axes, np.meshgrid(*axes.values(), indexing='ij')):
+        grid[:, config.MODEL_FEATURES.index(feature)] = values.ravel()
+    return grid
+
+
+def distinct_sweep_values(model, axes: dict[str, np.ndarray]) -> tuple[dict[str, np.ndarray], list[np.ndarray]]:
+    """
+    Keeps one value per swept feature for each range between the model's split thresholds.
+
+    Values between the same two thresholds take the same branch at every split,
+    so they get identical predictions and contributions. Scoring only the
+    distinct ones and expanding the result with `values[np.ix_(*inverse)]` is
+    exact. Models without `split_thresholds` keep every value.
+
+    Args:
+        model (NativeModel | xgb.XGBRegressor): The served model.
+        axes (dict[str, np.ndarray]): Values of each swept feature.
+
+    Returns:
+        tuple[dict[str, np.ndarray], list[np.ndarray]]: The distinct values of
+            each swept feature, and per feature the position of each original
+            value's representative among them.
+    """
+    thresholds = getattr(model, 'split_thresholds', None)
+    distinct, inverse = {}, []
+    for feature, values in axes.items():
+        if thresholds is None:
+            distinct[feature] = values
+            inverse.append(np.arange(len(values)))
+            continue
+        ranges = np.searchsorted(thresholds[config.MODEL_FEATURES.index(feature)], values, side='right')
+        _, first, positions = np.unique(ranges, return_index=True, return_inverse=True)
+        distinct[feature] = values[first]
+        inverse.append(positions.ravel())
+    return distinct, inverse
+
+
+def feature_contributions(model, features: np.ndarray, approximate: bool = False) -> np.ndarray:
+    """
+    Splits each prediction into per-feature contributions with XGBoost's `pred_contribs`.
+
+    Exact contributions are SHAP values (TreeSHAP), whose cost grows with the
+    square of the tree depth; approximate ones attribute each split's change
+    in expected value to its feature along the row's path only, which is about
+    as fast as predicting.
+
+    Args:
+        model (NativeModel | xgb.XGBRegressor): The served model.
+        features (np.ndarray): Matrix in `config.MODEL_FEATURES` column order.
+        approximate (bool): Use XGBoost's `approx_contribs` instead of SHAP values.
+
+    Returns:
+        np.ndarray: Array of shape (n, len(config.MODEL_FEATURES) + 1); the last
+            column is the bias, and each row sums to the row's prediction.
+    """
+    if isinstance(model, NativeModel):
+        booster, iteration_range = model.booster, model._iteration_range
+    else:
+        booster = model.get_booster()
+        best_iteration = booster.attr('best_iteration')
+        iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+    matrix = xgb.DMatrix(np.ascontiguousarray(features, dtype=np.float32), missing=np.nan,
+                         feature_names=config.MODEL_FEATURES)
+    return booster.predict(matrix, pred_contribs=True, approx_contribs=approximate,
+                           iteration_range=iteration_range, validate_features=False)
+
+
+class NativeModel:
+    """
+    Scores float32 feature matrices with a native XGBoost booster.
+
+    Loads the booster written by `modeling.export_native_model` without
+    unpickling the sklearn wrapper, and predicts with `inplace_predict`, which
+    skips DMatrix construction and pandas feature-name validation. The feature
+    order is checked once at load time against the exported schema instead.
+
+    Args:
+        booster (xgb.Booster): The trained booster.
+        schema (dict): The feature schema exported with the booster.
+    """
+
+    def __init__(self, booster: xgb.Booster, schema: dict):
+        self.booster = booster
+        self.schema = schema
+        self.features = schema['features']
+        self._iteration_range = (0, schema['num_trees'])
+
+    @classmethod
+    def load(cls, model_path: Path = config.MODEL_BOOSTER_FILE,
+             schema_path: Path = config.MODEL_SCHEMA_FILE) -> 'NativeModel':
+        """
+        Loads an exported booster and its feature schema.
+
+        Args:
+            model_path (Path): Booster file in XGBoost's JSON or UBJ format.
+            schema_path (Path): Feature schema written next to it.
+
+        Returns:
+            NativeModel: The loaded model.
+
+        Raises:
+            FileNotFoundError: If either file does not exist.
+            ValueError: If the schema's features do not match `config.MODEL_FEATURES`.
+        """
+        for path in (model_path, schema_path):
+            if not path.exists():
+                raise FileNotFoundError(f"Model file not found at: {path}")
+
+        with open(schema_path, encoding='utf-8') as schema_file:
+            schema = json.load(schema_file)
+        if schema['features'] != config.MODEL_FEATURES:
+            raise ValueError(f"Model schema features {schema['features']} do not match config.MODEL_FEATURES.")
+
+        booster = xgb.Booster()
+        booster.load_model(model_path)
+        return cls(booster, schema)
+
+    @cached_property
+    def split_thresholds(self) -> list[np.ndarray]:
+        """
+        The sorted distinct split conditions on each feature over all trees, as float32.
+
+        A row goes left at a split when its value is below the condition, so
+        values with the same number of thresholds at or below them always take
+        the same branches. Read from the booster's JSON dump on first use.
+        """
+        trees = json.loads(self.booster.save_raw('json'))['learner']['gradient_booster']['model']['trees']
+        is_split = np.concatenate([np.array(tree['left_children']) != -1 for tree in trees])
+        indices = np.concatenate([tree['split_indices'] for tree in trees])[is_split]
+        conditions = np.concatenate([np.array(tree['split_conditions'], dtype=np.float32) for tree in trees])[is_split]
+        return [np.unique(conditions[indices == j]) for j in range(len(self.features))]
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Scores a feature matrix.
+
+        Args:
+            features (np.ndarray): Array of shape (n, len(features)) in schema order;
+                NaN marks a missing value.
+
+        Returns:
+            np.ndarray: One float32 prediction per row.
+        """
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        return self.booster.inplace_predict(features, iteration_range=self._iteration_range,
+                                            validate_features=False)
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of single-row predictions for one model version.
+
+    Feature rows are rounded to `decimals` places to form the key, so inputs
+    that differ only below the form's precision share an entry. Entries belong
+    to the model version they were computed with; the first lookup for a new
+    version clears the cache, so a reloaded or retrained model never serves
+    stale results.
+
+    Args:
+        max_size (int): Maximum number of cached predictions.
+        decimals (int): Decimal places kept when quantizing feature values.
+    """
+
+    def __init__(self, max_size: int = config.PREDICTION_CACHE_SIZE,
+                 decimals: int = config.PREDICTION_CACHE_DECIMALS):
+        self.max_size = max_size
+        self.decimals = decimals
+        self._entries = OrderedDict()
+        self._model_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def quantize(self, row: np.ndarray) -> np.ndarray:
+        """Rounds a feature row to the cache precision; adding 0.0 folds -0.0 into 0.0."""
+        return np.round(np.asarray(row, dtype=np.float32), self.decimals) + np.float32(0.0)
+
+    def _sync_version(self, model_version: str):
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get_or_compute(self, row: np.ndarray, model_version: str,
+                       compute: Callable[[np.ndarray], float]) -> float:
+        """
+        Returns the cached prediction for `row`, computing and storing it on a miss.
+
+        Args:
+            row (np.ndarray): A single row in `config.MODEL_FEATURES` order.
+            model_version (str): Version of the model that `compute` uses.
+            compute (Callable[[np.ndarray], float]): Scores the quantized row.
+
+        Returns:
+            float: The prediction for the quantized row.
+        """
+        row = self.quantize(row)
+        key = row.tobytes()
+        with self._lock:
+            self._sync_version(model_version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Score outside the lock so concurrent misses do not queue behind each other
+        prediction = float(compute(row))
+        with self._lock:
+            if model_version == self._model_version:
+                self._entries[key] = prediction
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return prediction
+
+    def stats(self) -> dict:
+        """Returns size and hit/miss counters as a JSON-serializable dict."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'model_version': self._model_version,
+            }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record predictions into batched predict calls.
+
+    A background thread waits for the first queued row, then keeps collecting
+    rows for up to `window_ms` milliseconds (or until `max_batch_size` rows are
+    queued) and scores them all with one call to `predict_fn`.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 window_ms: float = config.MICRO_BATCH_WINDOW_MS,
+                 max_batch_size: int = config.MICRO_BATCH_MAX_SIZE):
+        self._predict_fn = predict_fn
+        self._window = window_ms / 1000
+        self._max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, row: np.ndarray) -> Future:
+        """
+        Queues one feature row for scoring.
+
+        Args:
+            row (np.ndarray): A single row in `config.MODEL_FEATURES` order.
+
+        Returns:
+            Future: Resolves to the predicted value as a float.
+        """
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def predict(self, row: np.ndarray, timeout: float | None = None) -> float:
+        """Scores one feature row, blocking until its batch has been predicted."""
+        return self.submit(row).result(timeout=timeout)
+
+    def _collect_batch(self) -> list[tuple[np.ndarray, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                predictions = self._predict_fn(np.vstack([row for row, _ in batch]))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                future.set_result(float(prediction))
@@ -0,0 +1,417 @@
+"""
+Module for ingesting new raw chart snapshots into the cleaned data incrementally.
+
+`data_processing.process_raw_data` rebuilds the cleaned data from a single raw
+file. Weekly chart snapshots are instead merged into the existing cleaned
+store by `ingest_snapshots`:
+
+1. Every CSV in the source directory (`config.SNAPSHOT_INBOX_DIR` by default)
+   whose content has not been ingested before is archived under
+   `config.SNAPSHOTS_DIR`, in name order.
+2. Raw rows identical to a row of an earlier snapshot are skipped by their
+   hash; only the new rows are cleaned (`data_processing.clean_raw_rows`).
+3. The cleaned rows are upserted on the normalized track name: unseen tracks
+   are inserted, and a known track is replaced only if the snapshot reports
+   more streams, the rule a full rebuild applies. Rows without a release date
+   are dropped while cleaning, so unlike in a rebuild they never displace a
+   dated row. Near-duplicate merging then runs over the tracks of the
+   affected artists only.
+4. The rows each snapshot added to and removed from the store are written to
+   a change log, and the snapshot is appended to the history, so aggregates
+   over the store can be brought up to date with `changes_since` and
+   `apply_changes` instead of being recomputed.
+
+When the cleaned data is rebuilt from `config.RAW_DATA_FILE`, the next ingest
+replays every archived snapshot on top of it and the history's `base_version`
+changes, telling consumers to recompute their aggregates from scratch.
+
+Usage:
+    python -m src.snapshots [--source DIR] [--fetch]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src import config
+from src.data_processing import clean_raw_rows, parse_numeric_columns, read_raw_chunks
+from src.data_store import data_version, load_cleaned_data, save_cleaned_data
+from src.deduplication import canonical_artists, remove_near_duplicates
+
+# Internal column tying merged rows back to their position in the store
+_STORE_ROW = '_store_row'
+
+
+def _snapshot_paths(snapshots_dir: Path) -> tuple[Path, Path, Path, Path]:
+    """Returns the archive and change log directories, and the history and row hash files."""
+    return (snapshots_dir / 'raw', snapshots_dir / 'changes',
+            snapshots_dir / 'history.json', snapshots_dir / 'row_hashes.npy')
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path: Path, content: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as json_file:
+        json.dump(content, json_file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_history(snapshots_dir: Path = config.SNAPSHOTS_DIR) -> dict:
+    """
+    Loads the snapshot history.
+
+    Args:
+        snapshots_dir (Path): Where the snapshots are kept.
+
+    Returns:
+        dict: `base_version`, the cleaned data version the snapshots were
+            applied on top of; `store_version`, its version after the last
+            merge; and `snapshots`, one entry per ingested snapshot in order.
+    """
+    history_path = _snapshot_paths(snapshots_dir)[2]
+    if not history_path.exists():
+        return {'base_version': None, 'store_version': None, 'snapshots': []}
+    with open(history_path, 'r', encoding='utf-8') as history_file:
+        return json.load(history_file)
+
+
+def _load_row_hashes(hashes_path: Path) -> np.ndarray:
+    if not hashes_path.exists():
+        return np.empty(0, dtype=np.uint64)
+    return np.load(hashes_path)
+
+
+def _save_row_hashes(hashes: np.ndarray, hashes_path: Path) -> None:
+    hashes_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = hashes_path.with_name(hashes_path.name + '.tmp')
+    with open(tmp_path, 'wb') as hashes_file:
+        np.save(hashes_file, hashes)
+    os.replace(tmp_path, hashes_path)
+
+
+def _read_new_rows(raw_path: Path, seen: np.ndarray) -> tuple[pd.DataFrame, np.ndarray, int]:
+    """
+    Reads the raw rows of a snapshot that are not in `seen`.
+
+    Rows are hashed as read, with their columns in name order, so a snapshot
+    that lists the columns differently still matches earlier rows.
+
+    Returns:
+        tuple[pd.DataFrame, np.ndarray, int]: The new raw rows, their sorted
+            unique hashes, and the number of rows in the snapshot.
+    """
+    new_chunks, new_hashes = [], []
+    total_rows = 0
+    for chunk in read_raw_chunks(raw_path):
+        total_rows += len(chunk)
+        hashes = pd.util.hash_pandas_object(chunk[sorted(chunk.columns)], index=False).to_numpy()
+        is_new = ~np.isin(hashes, seen)
+        if new_hashes:
+            is_new &= ~np.isin(hashes, np.concatenate(new_hashes))
+        # Identical rows within the chunk are kept once
+        _, first = np.unique(hashes, return_index=True)
+        is_first = np.zeros(len(hashes), dtype=bool)
+        is_first[first] = True
+        keep = np.flatnonzero(is_new & is_first)
+        new_chunks.append(chunk.take(keep))
+        new_hashes.append(hashes[keep])
+
+    if not new_chunks:
+        return pd.DataFrame(), np.empty(0, dtype=np.uint64), 0
+    return pd.concat(new_chunks, ignore_index=True), np.unique(np.concatenate(new_hashes)), total_rows
+
+
+def _track_keys(tracks: pd.Series) -> pd.Index:
+    """The normalized track name rows are deduplicated and upserted on."""
+    return pd.Index(tracks.astype(str).str.lower().str.strip())
+
+
+def _align_to_store(rows: pd.DataFrame, store: pd.DataFrame) -> pd.DataFrame:
+    """Gives cleaned snapshot rows the store's columns, and its numeric dtypes where lossless."""
+    aligned = rows.reindex(columns=store.columns)
+    numeric_cols = [col for col in store.columns if pd.api.types.is_numeric_dtype(store[col])]
+    parse_numeric_columns(aligned, numeric_cols)
+    for col in numeric_cols:
+        dtype = store[col].dtype
+        values = aligned[col].fillna(0)
+        if pd.api.types.is_integer_dtype(dtype) and (values % 1 == 0).all():
+            values = values.astype(dtype)
+        aligned[col] = values
+    return aligned
+
+
+def _upsert(store: pd.DataFrame, rows: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """
+    Upserts cleaned rows into the store on the normalized track name, keeping the most streamed row.
+
+    Ties keep the store's row. The result stays ordered by descending streams
+    (stable), like the output of a full rebuild.
+    """
+    store_keys = _track_keys(store['track'])
+    positions = store_keys.get_indexer(_track_keys(rows['track']))
+    is_new = positions == -1
+    known = np.flatnonzero(~is_new)
+    store_streams = store['spotify_streams'].to_numpy()
+    row_streams = rows['spotify_streams'].to_numpy()
+    is_better = row_streams[known] > store_streams[positions[known]]
+
+    replaced = positions[known[is_better]]
+    added = rows.take(np.concatenate([np.flatnonzero(is_new), known[is_better]]))
+    kept = store.drop(index=store.index[replaced])
+    merged = pd.concat([kept, added.assign(**{_STORE_ROW: -1})], ignore_index=True)
+    merged = merged.sort_values('spotify_streams', ascending=False, kind='stable', ignore_index=True)
+    return merged, {'inserted': int(is_new.sum()), 'updated': len(replaced),
+                    'unchanged': int(len(known) - len(replaced))}
+
+
+def _merge_affected_near_duplicates(merged: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """
+    Merges near-duplicates among the tracks of artists that received new rows.
+
+    Near-duplicates only ever share a canonical primary artist, and the store
+    had none left before the merge, so only those artists' tracks are compared.
+    """
+    if not config.NEAR_DUPLICATE_DEDUP_ENABLED:
+        return merged, 0
+    codes, artists = pd.factorize(merged['artist'].astype(str))
+    row_artists = canonical_artists(pd.Series(artists)).to_numpy()[codes]
+    is_added = merged[_STORE_ROW].to_numpy() == -1
+    affected = merged[np.isin(row_artists, np.unique(row_artists[is_added]))]
+    if affected.empty:
+        return merged, 0
+
+    deduplicated, _ = remove_near_duplicates(affected)
+    dropped = affected.index.difference(deduplicated.index)
+    return merged.drop(index=dropped), len(dropped)
+
+
+def merge_snapshot_rows(store: pd.DataFrame, rows: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Merges cleaned snapshot rows into the cleaned store.
+
+    Args:
+        store (pd.DataFrame): The cleaned dataset.
+        rows (pd.DataFrame): Cleaned rows of a snapshot, from `data_processing.clean_raw_rows`.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict]: The merged store; the change
+            log, i.e. the rows the merge added and the store rows it removed
+            with a `change` column of 'added' or 'removed'; and the number of
+            rows inserted, updated, left unchanged and merged as near-duplicates.
+    """
+    store = store.assign(**{_STORE_ROW: np.arange(len(store))}).reset_index(drop=True)
+    merged, stats = _upsert(store, _align_to_store(rows, store.drop(columns=[_STORE_ROW])))
+    merged, stats['near_duplicates'] = _merge_affected_near_duplicates(merged)
+
+    store_rows = merged[_STORE_ROW].to_numpy()
+    removed = np.setdiff1d(np.arange(len(store)), store_rows[store_rows >= 0])
+    changes = pd.concat([
+        merged[store_rows == -1].assign(change='added'),
+        store.take(removed).assign(change='removed'),
+    ], ignore_index=True).drop(columns=[_STORE_ROW])
+    return merged.drop(columns=[_STORE_ROW]).reset_index(drop=True), changes, stats
+
+
+def _apply_snapshot(entry: dict, store: pd.DataFrame, seen: np.ndarray,
+                    snapshots_dir: Path) -> tuple[pd.DataFrame, np.ndarray]:
+    """Cleans the new rows of an archived snapshot, merges them and records the outcome in `entry`."""
+    archive_dir, changes_dir, _, _ = _snapshot_paths(snapshots_dir)
+    start = time.perf_counter()
+    new_raw, new_hashes, entry['raw_rows'] = _read_new_rows(archive_dir / entry['archived_as'], seen)
+    entry['new_rows'] = len(new_raw)
+
+    rows = clean_raw_rows(new_raw)[0] if len(new_raw) else None
+    entry['cleaned_rows'] = 0 if rows is None else len(rows)
+    if entry['cleaned_rows']:
+        store, changes, stats = merge_snapshot_rows(store, rows)
+        entry.update(stats)
+    else:
+        changes = store.head(0).assign(change=pd.Series(dtype=str))
+        entry.update(inserted=0, updated=0, unchanged=0, near_duplicates=0)
+    changes_dir.mkdir(parents=True, exist_ok=True)
+    changes_path = changes_dir / f"{entry['id']}.parquet"
+    tmp_path = changes_path.with_name(changes_path.name + '.tmp')
+    changes.assign(snapshot_id=entry['id']).to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, changes_path)
+
+    entry['rows_after'] = len(store)
+    entry['seconds'] = round(time.perf_counter() - start, 4)
+    print(f"Snapshot {entry['id']}: {entry['new_rows']} of {entry['raw_rows']} raw rows new, "
+          f"{entry['inserted']} tracks inserted, {entry['updated']} updated, "
+          f"{entry['near_duplicates']} near-duplicates merged in {entry['seconds']:.2f}s.")
+    return store, np.union1d(seen, new_hashes)
+
+
+def _archive_new_snapshots(source_dir: Path, history: dict, archive_dir: Path) -> list[dict]:
+    """Copies the CSVs of `source_dir` not ingested yet into the archive and returns their history entries."""
+    known = {entry['sha256'] for entry in history['snapshots']}
+    entries = []
+    for path in sorted(source_dir.glob('*.csv')) if source_dir.exists() else []:
+        sha256 = _file_sha256(path)
+        if sha256 in known:
+            continue
+        known.add(sha256)
+        snapshot_id = f"{len(history['snapshots']) + len(entries) + 1:04d}-{sha256[:12]}"
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archived_path = archive_dir / f'{snapshot_id}.csv'
+        tmp_path = archived_path.with_name(archived_path.name + '.tmp')
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, archived_path)
+        entries.append({'id': snapshot_id, 'source': path.name, 'sha256': sha256,
+                        'archived_as': archived_path.name})
+    return entries
+
+
+def ingest_snapshots(source_dir: Path = config.SNAPSHOT_INBOX_DIR,
+                     data_path: Path = config.CLEANED_DATA_FILE,
+                     snapshots_dir: Path = config.SNAPSHOTS_DIR) -> dict | None:
+    """
+    Merges the snapshots in `source_dir` that were not ingested before into the cleaned data.
+
+    If the cleaned data was rebuilt since the last merge, every archived
+    snapshot is first replayed on top of the rebuilt data.
+
+    Args:
+        source_dir (Path): Directory of raw snapshot CSVs, ingested in name order.
+        data_path (Path): The cleaned data to merge into.
+        snapshots_dir (Path): Where the archive, change logs, history and row
+            hashes are kept. Defaults to `config.SNAPSHOTS_DIR`.
+
+    Returns:
+        dict | None: The updated history, or None if there is no cleaned data to merge into.
+    """
+    if not data_path.exists():
+        print(f"Error: Cleaned data file not found at: {data_path}")
+        print("Please run the data processing step before ingesting snapshots.")
+        return None
+
+    archive_dir, _, history_path, hashes_path = _snapshot_paths(snapshots_dir)
+    history = load_history(snapshots_dir)
+    version = data_version(data_path)
+
+    replay = []
+    if history['store_version'] != version:
+        # The store was rebuilt (or never merged into): start a new base and replay the archive
+        replay = history['snapshots']
+        if replay:
+            print(f"Cleaned data changed since the last merge; replaying {len(replay)} archived snapshots.")
+        history = {'base_version': version, 'store_version': version, 'snapshots': []}
+        seen = np.empty(0, dtype=np.uint64)
+    else:
+        seen = _load_row_hashes(hashes_path)
+
+    new_entries = _archive_new_snapshots(source_dir, {'snapshots': replay + history['snapshots']}, archive_dir)
+    pending = [{key: entry[key] for key in ('id', 'source', 'sha256', 'archived_as')} for entry in replay]
+    pending += new_entries
+    if not pending:
+        print(f"No new snapshots in {source_dir}.")
+        _write_json(history_path, history)
+        return history
+
+    store = load_cleaned_data(data_path)
+    for entry in pending:
+        entry['ingested_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        store, seen = _apply_snapshot(entry, store, seen, snapshots_dir)
+        history['snapshots'].append(entry)
+
+    save_cleaned_data(store, data_path)
+    _save_row_hashes(seen, hashes_path)
+    history['store_version'] = data_version(data_path)
+    _write_json(history_path, history)
+    print(f"Merged {len(pending)} snapshots; {len(store)} cleaned records saved to: {data_path}")
+    return history
+
+
+def changes_since(snapshot_id: str | None = None,
+                  snapshots_dir: Path = config.SNAPSHOTS_DIR) -> pd.DataFrame:
+    """
+    Loads the change logs of the snapshots ingested after `snapshot_id`.
+
+    Args:
+        snapshot_id (str | None): The last snapshot an aggregate already
+            includes, or None for every snapshot since the current base.
+        snapshots_dir (Path): Where the snapshots are kept.
+
+    Returns:
+        pd.DataFrame: The added and removed rows in ingestion order, with
+            `change` and `snapshot_id` columns.
+
+    Raises:
+        KeyError: If `snapshot_id` is not in the current history, e.g. because
+            the cleaned data was rebuilt since; recompute the aggregate then.
+    """
+    ids = [entry['id'] for entry in load_history(snapshots_dir)['snapshots']]
+    if snapshot_id is not None and snapshot_id not in ids:
+        raise KeyError(f"Snapshot '{snapshot_id}' is not in the current snapshot history.")
+    pending = ids[ids.index(snapshot_id) + 1:] if snapshot_id is not None else ids
+    changes_dir = _snapshot_paths(snapshots_dir)[1]
+    frames = [pd.read_parquet(changes_dir / f'{sid}.parquet', engine='pyarrow') for sid in pending]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=['change', 'snapshot_id'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def apply_changes(totals: pd.DataFrame, changes: pd.DataFrame, by: str, metrics: list[str]) -> pd.DataFrame:
+    """
+    Updates per-group sums with a change log instead of recomputing them from the store.
+
+    If `totals` has a `track_count` column it is kept up to date too, and
+    groups left without tracks are dropped.
+
+    Args:
+        totals (pd.DataFrame): Sums of `metrics` indexed by `by`, e.g.
+            `store.groupby(by)[metrics].sum()`.
+        changes (pd.DataFrame): Change log from `changes_since`.
+        by (str): Column the totals are grouped by.
+        metrics (list[str]): Summed columns.
+
+    Returns:
+        pd.DataFrame: The updated totals, indexed by `by` as strings.
+    """
+    updated = totals.rename(index=str)
+    if changes.empty:
+        return updated
+    sign = np.where(changes['change'] == 'added', 1, -1)
+    deltas = changes[metrics].mul(sign, axis=0).assign(track_count=sign)
+    deltas = deltas.groupby(changes[by].astype(str).to_numpy()).sum()
+    if 'track_count' not in updated.columns:
+        deltas = deltas.drop(columns=['track_count'])
+
+    updated = updated.add(deltas, fill_value=0)
+    if 'track_count' in updated.columns:
+        updated = updated[updated['track_count'] > 0]
+    updated.index.name = by
+    return updated
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge new raw chart snapshots into the cleaned data.")
+    parser.add_argument('--source', type=Path, default=config.SNAPSHOT_INBOX_DIR,
+                        help='Directory of raw snapshot CSVs.')
+    parser.add_argument('--fetch', action='store_true',
+                        help='Download the current Kaggle export into the source directory first.')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.fetch:
+        from src.data_ingestion import download_snapshot
+        download_snapshot(args.source)
+    ingest_snapshots(args.source)
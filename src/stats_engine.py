@@ -0,0 +1,285 @@
+"""
+Module for correlation analysis and hypothesis tests on the cleaned dataset.
+
+`StatisticsEngine` computes the full Pearson and Spearman matrices of every
+numeric column once per data version with vectorized NumPy, and answers subset
+and single-target queries by slicing them. Bootstrap confidence intervals and
+permutation tests draw their resamples in fixed-size vectorized chunks, spread
+across a process pool, with one independent random stream per chunk so results
+are reproducible for a given seed regardless of the number of workers. Within a
+chunk, resamples are drawn in blocks sized so that no intermediate matrix
+exceeds `config.STATS_MAX_CHUNK_ELEMENTS`, so memory stays bounded as the data grows.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src import config
+from src.data_store import data_version, load_cleaned_data
+
+
+def correlation_matrix(values: np.ndarray) -> np.ndarray:
+    """
+    Computes Pearson correlations between all columns using pairwise-complete rows.
+
+    Matches `DataFrame.corr()`: each pair of columns is correlated over the rows
+    where both are present. Columns are centered first to limit cancellation on
+    large stream counts.
+
+    Args:
+        values (np.ndarray): Array of shape (rows, columns); NaN marks a missing value.
+
+    Returns:
+        np.ndarray: Symmetric (columns x columns) correlation matrix; NaN where a
+            pair has fewer than two rows or no variance.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    mask = present.astype(np.float64)
+    counts = np.where(present.any(axis=0), present.sum(axis=0), 1)
+    centered = np.where(present, values - np.nansum(values, axis=0) / counts, 0.0)
+
+    n = mask.T @ mask                        # rows where both columns are present
+    sum_x = centered.T @ mask                # sum of column i over rows where j is present
+    sum_xx = (centered ** 2).T @ mask
+    sum_xy = centered.T @ centered
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sum_xy - sum_x * sum_x.T / n
+        variance_x = sum_xx - sum_x ** 2 / n
+        corr = covariance / np.sqrt(variance_x * variance_x.T)
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return corr
+
+
+def rank_columns(values: np.ndarray) -> np.ndarray:
+    """Ranks each column (average ranks for ties), keeping NaN in place."""
+    return pd.DataFrame(values).rank(method='average').to_numpy(dtype=np.float64)
+
+
+class StatisticsEngine:
+    """
+    Correlations and hypothesis tests for one version of the cleaned data.
+
+    Args:
+        df (pd.DataFrame): The dataset; every numeric column is included.
+        data_version (str | None): Version of the data the statistics describe.
+    """
+
+    def __init__(self, df: pd.DataFrame, data_version: str | None = None):
+        self.df = df
+        self.data_version = data_version
+        self.columns = [col for col in df.columns
+                        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+        self._values = df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._matrices = {}
+
+    def matrix(self, method: str = 'pearson') -> pd.DataFrame:
+        """
+        Returns the full correlation matrix of all numeric columns, computed once.
+
+        Spearman ranks each column over its own non-missing values, so for
+        columns with missing values it can differ slightly from pandas, which
+        re-ranks every pair on their common rows.
+
+        Args:
+            method (str): 'pearson' or 'spearman'.
+
+        Raises:
+            ValueError: If the method is not supported.
+        """
+        if method not in self._matrices:
+            if method == 'pearson':
+                values = self._values
+            elif method == 'spearman':
+                values = rank_columns(self._values)
+            else:
+                raise ValueError(f"Unsupported correlation method '{method}'. Use 'pearson' or 'spearman'.")
+            self._matrices[method] = pd.DataFrame(correlation_matrix(values), index=self.columns, columns=self.columns)
+        return self._matrices[method]
+
+    def _check_columns(self, cols: list[str]):
+        unknown = [col for col in cols if col not in self.columns]
+        if unknown:
+            raise KeyError(f"Not numeric columns of the dataset: {unknown}")
+
+    def correlation(self, cols: list[str], method: str = 'pearson') -> pd.DataFrame:
+        """Returns the correlation matrix of a subset of columns, sliced from the cached matrix."""
+        self._check_columns(cols)
+        return self.matrix(method).loc[cols, cols]
+
+    def correlation_with(self, target: str, cols: list[str] | None = None, method: str = 'pearson') -> pd.Series:
+        """Returns the correlation of each column with `target`, strongest positive first."""
+        cols = cols or self.columns
+        self._check_columns([target] + cols)
+        return self.matrix(method).loc[cols, target].sort_values(ascending=False)
+
+    def _two_groups(self, col: str, by: str) -> tuple[np.ndarray, np.ndarray, list]:
+        self._check_columns([col])
+        data = self.df[[col, by]].dropna()
+        groups = sorted(data[by].unique())
+        if len(groups) != 2:
+            raise ValueError(f"'{by}' must split the data into exactly two groups, found {len(groups)}.")
+        values = data[col].to_numpy(dtype=np.float64)
+        labels = (data[by] == groups[1]).to_numpy()
+        return values, labels, groups
+
+    def group_means(self, cols: list[str], by: str = 'explicit_track') -> pd.DataFrame:
+        """Returns the mean of each column per group of `by`."""
+        self._check_columns(cols)
+        return self.df.groupby(by, observed=True)[cols].mean()
+
+    def bootstrap_mean_difference(self, col: str, by: str = 'explicit_track',
+                                  n_resamples: int = config.STATS_RESAMPLES, confidence: float = 0.95,
+                                  seed: int = 42, n_workers: int | None = None) -> dict:
+        """
+        Bootstraps a confidence interval for the difference in group means of `col`.
+
+        Each group is resampled with replacement separately. The difference is
+        the mean of the second group of `by` (sorted) minus the first, e.g.
+        explicit minus clean for `explicit_track`.
+
+        Returns:
+            dict: Groups, observed difference, percentile interval and resample count.
+        """
+        values, labels, groups = self._two_groups(col, by)
+        first, second = values[~labels], values[labels]
+        samples = _run_chunks(_bootstrap_chunk, (first, second), n_resamples, seed, n_workers)
+        alpha = (1 - confidence) / 2
+        low, high = np.quantile(samples, [alpha, 1 - alpha])
+        return {
+            'column': col, 'groups': [_to_python(g) for g in groups],
+            'difference': float(second.mean() - first.mean()),
+            'confidence': confidence, 'low': float(low), 'high': float(high),
+            'n_resamples': len(samples),
+        }
+
+    def permutation_test(self, col: str, by: str = 'explicit_track', n_resamples: int = config.STATS_RESAMPLES,
+                         seed: int = 42, n_workers: int | None = None) -> dict:
+        """
+        Two-sided permutation test for a difference in group means of `col`.
+
+        Returns:
+            dict: Groups, observed difference, p-value and resample count.
+        """
+        values, labels, groups = self._two_groups(col, by)
+        observed = values[labels].mean() - values[~labels].mean()
+        samples = _run_chunks(_permutation_chunk, (values, labels), n_resamples, seed, n_workers)
+        # The observed labelling counts as one permutation, so p is never exactly 0
+        extreme = np.count_nonzero(np.abs(samples) >= abs(observed) - 1e-12 * abs(observed))
+        return {
+            'column': col, 'groups': [_to_python(g) for g in groups],
+            'difference': float(observed),
+            'p_value': (extreme + 1) / (len(samples) + 1),
+            'n_resamples': len(samples),
+        }
+
+
+def artist_rank_correlation(artist_index, first: str = 'spotify_streams', second: str = 'youtube_views') -> float:
+    """
+    Spearman correlation between artists' totals of two metrics.
+
+    Reads the per-artist totals from an `analysis.ArtistIndex` instead of
+    grouping the tracks again.
+
+    Args:
+        artist_index (ArtistIndex): Index built from the cleaned data.
+        first (str): First indexed metric.
+        second (str): Second indexed metric.
+
+    Returns:
+        float: The rank correlation.
+    """
+    columns = [artist_index.metrics.index(first), artist_index.metrics.index(second)]
+    return float(correlation_matrix(rank_columns(artist_index.sums[:, columns]))[0, 1])
+
+
+def _to_python(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _blocks(size: int, n_rows: int, max_elements: int = config.STATS_MAX_CHUNK_ELEMENTS) -> list[int]:
+    """Splits `size` resamples into blocks whose (resamples x rows) matrices hold at most `max_elements`."""
+    block = max(1, max_elements // max(n_rows, 1))
+    return [min(block, size - start) for start in range(0, size, block)]
+
+
+def _bootstrap_chunk(data: tuple[np.ndarray, np.ndarray], size: int, seed: np.random.SeedSequence) -> np.ndarray:
+    first, second = data
+    rng = np.random.default_rng(seed)
+    index_dtype = np.int32 if max(len(first), len(second)) < 2 ** 31 else np.int64
+    differences = []
+    for block in _blocks(size, max(len(first), len(second))):
+        first_means = first[rng.integers(0, len(first), size=(block, len(first)), dtype=index_dtype)].mean(axis=1)
+        second_means = second[rng.integers(0, len(second), size=(block, len(second)), dtype=index_dtype)].mean(axis=1)
+        differences.append(second_means - first_means)
+    return np.concatenate(differences)
+
+
+def _permutation_chunk(data: tuple[np.ndarray, np.ndarray], size: int, seed: np.random.SeedSequence) -> np.ndarray:
+    values, labels = data
+    rng = np.random.default_rng(seed)
+    n_second = labels.sum()
+    differences = []
+    for block in _blocks(size, len(values)):
+        permuted = rng.permuted(np.broadcast_to(labels, (block, len(labels))), axis=1).astype(np.float64)
+        second_sums = permuted @ values
+        differences.append(second_sums / n_second - (values.sum() - second_sums) / (len(values) - n_second))
+    return np.concatenate(differences)
+
+
+# Data shared with chunk workers, set once per process by _init_chunk_worker
+_worker_data = None
+
+
+def _init_chunk_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _call_chunk(fn, size: int, seed: np.random.SeedSequence) -> np.ndarray:
+    return fn(_worker_data, size, seed)
+
+
+def _run_chunks(fn, data, n_resamples: int, seed: int, n_workers: int | None,
+                chunk_size: int = config.STATS_CHUNK_SIZE) -> np.ndarray:
+    """
+    Draws `n_resamples` statistics in chunks, each with its own child seed.
+
+    Chunks run in a process pool that receives `data` once per worker; with a
+    single chunk or worker they run in this process.
+    """
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_workers = max(1, min(len(sizes), n_workers or os.cpu_count() or 1))
+    if n_workers == 1:
+        return np.concatenate([fn(data, size, child) for size, child in zip(sizes, seeds)])
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_chunk_worker, initargs=(data,)) as pool:
+        chunks = pool.map(_call_chunk, [fn] * len(sizes), sizes, seeds)
+        return np.concatenate(list(chunks))
+
+
+# Engine for the saved cleaned data, rebuilt when the file changes
+_saved_engine: StatisticsEngine | None = None
+
+
+def engine_for(data_path: Path = config.CLEANED_DATA_FILE) -> StatisticsEngine:
+    """
+    Returns the statistics engine for the cleaned data file, reusing it until the file changes.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    global _saved_engine
+    if not data_path.exists():
+        raise FileNotFoundError(f"Cleaned data file not found at {data_path}")
+    version = f"{data_path}:{data_version(data_path)}"
+    if _saved_engine is None or _saved_engine.data_version != version:
+        _saved_engine = StatisticsEngine(load_cleaned_data(data_path), version)
+    return _saved_engine
@@ -0,0 +1,277 @@
+"""
+Module for generating synthetic raw data with the schema of the Kaggle file.
+
+The Kaggle export has about 4,600 rows, too few to show how the pipeline
+scales. `write_raw_csv` writes files of any size with the same columns and the
+same quirks as `most_streamed_spotify_songs_2024.csv`:
+- counts written with thousands separators ("1,234,567") and gaps per column
+- Latin-1 encoding with accented names, and mojibake matching `config.GARBAGE_PATTERN`
+- tracks listed more than once, often with their title in different case
+- rows without a release date
+
+Platform metrics are driven by one latent popularity per track, so they are
+correlated with each other and with the track score like the real data. Rows
+are generated in chunks with a random stream per chunk, so a file depends only
+on its size and seed and never has to fit in memory.
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src import config
+
+RAW_COLUMNS = [
+    'Track', 'Album Name', 'Artist', 'Release Date', 'ISRC', 'All Time Rank', 'Track Score',
+    'Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist Reach', 'Spotify Popularity',
+    'YouTube Views', 'YouTube Likes', 'TikTok Posts', 'TikTok Likes', 'TikTok Views', 'YouTube Playlist Reach',
+    'Apple Music Playlist Count', 'AirPlay Spins', 'SiriusXM Spins', 'Deezer Playlist Count',
+    'Deezer Playlist Reach', 'Amazon Playlist Count', 'Pandora Streams', 'Pandora Track Stations',
+    'Soundcloud Streams', 'Shazam Counts', 'TIDAL Popularity', 'Explicit Track',
+]
+
+# Count columns: (log of the median, effect of popularity, noise, share missing).
+# Medians and missing shares are close to those of the Kaggle file.
+COUNT_COLUMNS = {
+    'Spotify Streams': (19.2, 1.0, 0.5, 0.02),
+    'Spotify Playlist Count': (10.4, 0.8, 0.6, 0.01),
+    'Spotify Playlist Reach': (16.4, 0.9, 0.8, 0.01),
+    'YouTube Views': (18.6, 1.1, 1.0, 0.07),
+    'YouTube Likes': (14.2, 1.1, 1.0, 0.07),
+    'TikTok Posts': (11.5, 1.2, 1.5, 0.25),
+    'TikTok Likes': (17.5, 1.3, 1.6, 0.21),
+    'TikTok Views': (19.5, 1.3, 1.6, 0.21),
+    'YouTube Playlist Reach': (17.2, 0.9, 1.2, 0.22),
+    'Apple Music Playlist Count': (3.6, 0.7, 0.7, 0.12),
+    'AirPlay Spins': (9.4, 1.0, 1.4, 0.10),
+    'SiriusXM Spins': (5.0, 1.0, 1.5, 0.46),
+    'Deezer Playlist Count': (3.0, 0.8, 0.9, 0.20),
+    'Deezer Playlist Reach': (12.0, 0.9, 1.5, 0.20),
+    'Amazon Playlist Count': (3.4, 0.7, 0.8, 0.23),
+    'Pandora Streams': (16.0, 1.0, 1.4, 0.24),
+    'Pandora Track Stations': (8.6, 1.0, 1.4, 0.27),
+    'Soundcloud Streams': (14.6, 0.9, 1.4, 0.72),
+    'Shazam Counts': (14.0, 1.0, 1.2, 0.12),
+}
+
+# Words for track and album titles. Version markers such as "Remix" or "Live"
+# are left out so that near-duplicate detection does not strip them.
+_TITLE_WORDS = np.array([
+    'Love', 'Night', 'Baby', 'Fire', 'Heart', 'Dreams', 'Blue', 'Rain', 'Summer', 'Dance', 'Girl', 'Boy',
+    'Money', 'Crazy', 'Forever', 'Golden', 'Wild', 'Lonely', 'Sweet', 'Paradise', 'Midnight', 'Sunset',
+    'Highway', 'Ocean', 'Diamond', 'Shadow', 'Thunder', 'Starlight', 'Echo', 'Gravity', 'Velvet', 'Neon',
+    'Silver', 'Cherry', 'Honey', 'Storm', 'River', 'Mirror', 'Ghost', 'Angel', 'Devil', 'Kiss', 'Tears',
+    'Smile', 'Faded', 'Broken', 'Alive', 'Closer', 'Higher', 'Better', 'Stay', 'Run', 'Fly', 'Fall',
+    'Shine', 'Burn', 'Home', 'City', 'Lights', 'Moon', 'Sky', 'Stars', 'Party', 'Rhythm', 'Señorita',
+    'Corazón', 'Café', 'Mañana', 'Bésame', 'Canción', 'Déjà Vu', 'Fiancé', 'Über', 'Noël', 'Amor',
+    'Vida', 'Fuego', 'Luna', 'Sol', 'Cielo', 'Loco', 'Bonita', 'Tequila', 'Fiesta', 'Playa', 'Calma',
+    'Despacito', 'Hielo', 'Oro', 'Reina', 'Rey', 'Flowers', 'Cruel', 'Anti', 'Hero', 'Levitating',
+    'Peaches', 'Stereo', 'Vampire', 'Butter', 'Dynamite', 'Savage', 'Espresso', 'Greedy', 'Karma',
+    'Unholy', 'Calm', 'Hope', 'Pain', 'Soul', 'Spirit', 'Magic', 'Fever', 'Sugar', 'Lemonade',
+    'Blinding', 'Bad', 'Good', 'Young', 'Old', 'New', 'Last', 'First', 'Little', 'Big', 'Red', 'Black',
+    'White', 'Green', 'Pink', 'Purple', 'Electric', 'Cosmic', 'Secret', 'Perfect',
+])
+_FIRST_NAMES = np.array([
+    'Taylor', 'Ariana', 'Justin', 'Billie', 'Olivia', 'Harry', 'Dua', 'Ed', 'Bad', 'Karol', 'Peso',
+    'Sabrina', 'Doja', 'Travis', 'Kendrick', 'Drake', 'Rauw', 'Feid', 'Shakira', 'Rosalía', 'Beyoncé',
+    'Zoé', 'Chloé', 'Renée', 'André', 'José', 'Noah', 'Mia', 'Liam', 'Emma', 'Lucas', 'Sofía', 'Mateo',
+    'Valentina', 'Lil', 'Young', 'Big', 'DJ', 'MC', 'King', 'Queen', 'The', 'Los', 'Las', 'Nova', 'Luna',
+    'Max', 'Sam', 'Alex', 'Jordan', 'Casey', 'Riley', 'Quinn', 'Avery', 'Skyler', 'Rowan', 'Ezra',
+    'Milo', 'Iris', 'Jade', 'Ruby', 'Leo', 'Kai', 'Nina',
+])
+_LAST_NAMES = np.array([
+    'Swift', 'Grande', 'Bieber', 'Eilish', 'Rodrigo', 'Styles', 'Lipa', 'Sheeran', 'Bunny', 'G',
+    'Pluma', 'Carpenter', 'Cat', 'Scott', 'Lamar', 'Alejandro', 'Knowles', 'Müller', 'Núñez', 'García',
+    'López', 'Martín', 'Pérez', 'Hernández', 'Gómez', 'Díaz', 'Brown', 'Smith', 'Johnson', 'Williams',
+    'Jones', 'Miller', 'Davis', 'Wilson', 'Moore', 'Taylor', 'Anderson', 'Thomas', 'Jackson', 'White',
+    'Harris', 'Martin', 'Thompson', 'Young', 'Allen', 'King', 'Wright', 'Hill', 'Green', 'Adams',
+    'Baker', 'Nelson', 'Carter', 'Mitchell', 'Roberts', 'Turner', 'Phillips', 'Campbell', 'Parker',
+    'Evans', 'Edwards', 'Collins', 'Stewart', 'Morris',
+])
+_COUNTRIES = np.array(['US', 'GB', 'QZ', 'QM', 'DE', 'FR', 'ES', 'MX', 'BR', 'KR', 'JP', 'SE', 'CA'])
+_REGISTRANTS = np.array(['UM7', 'SM1', 'AT2', 'RC1', 'WB1', 'UG1', 'ES5', 'DY2', 'Q4A', 'HX3'])
+# Latin-1 text a CJK title decodes to when its UTF-8 bytes are misread, as in the Kaggle file
+_MOJIBAKE = np.array(['ýýýýý', 'ýý ýýýý', 'ýýý (ýýý)', 'ýýýýýý ýý', 'ý ýýýýý'])
+
+# Title triples are numbered by a permutation of the track id, so every track
+# gets a different title; ids past the combinations get a part number.
+_TITLE_SPACE = len(_TITLE_WORDS) ** 3
+_TITLE_MULTIPLIER = 1_000_003
+
+
+def _track_titles(track_ids: np.ndarray) -> np.ndarray:
+    """Returns a distinct three-word title per track id."""
+    code = (track_ids * _TITLE_MULTIPLIER) % _TITLE_SPACE
+    n_words = len(_TITLE_WORDS)
+    titles = (pd.Series(_TITLE_WORDS[code % n_words]) + ' ' + _TITLE_WORDS[(code // n_words) % n_words]
+              + ' ' + _TITLE_WORDS[code // (n_words * n_words)])
+    part = track_ids // _TITLE_SPACE
+    numbered = part > 0
+    titles[numbered] = titles[numbered] + ' Pt. ' + (part[numbered] + 1).astype(str)
+    return titles.to_numpy(dtype=object)
+
+
+def _artist_names(artist_ids: np.ndarray) -> np.ndarray:
+    """Returns an artist name per artist id; ids past the name combinations get a number."""
+    n_first, n_last = len(_FIRST_NAMES), len(_LAST_NAMES)
+    code = (artist_ids * 7_919) % (n_first * n_last)
+    names = pd.Series(_FIRST_NAMES[code % n_first]) + ' ' + _LAST_NAMES[code // n_first]
+    repeat = artist_ids // (n_first * n_last)
+    numbered = repeat > 0
+    names[numbered] = names[numbered] + ' ' + (repeat[numbered] + 1).astype(str)
+    return names.to_numpy(dtype=object)
+
+
+def _album_names(track_ids: np.ndarray) -> np.ndarray:
+    """Returns a two-word album name shared by runs of about three consecutive track ids."""
+    n_words = len(_TITLE_WORDS)
+    code = ((track_ids // 3) * 48_271) % (n_words * n_words)
+    return (pd.Series(_TITLE_WORDS[code % n_words]) + ' ' + _TITLE_WORDS[code // n_words]).to_numpy(dtype=object)
+
+
+def _format_counts(values: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    """Formats whole numbers with thousands separators, leaving missing ones empty."""
+    formatted = np.full(len(values), '', dtype=object)
+    formatted[~missing] = [f'{value:,}' for value in values[~missing].tolist()]
+    return formatted
+
+
+def generate_raw_data(n_rows: int, start: int = 0, total_rows: int | None = None, seed: int = 42,
+                      duplicate_rate: float = config.SYNTHETIC_DUPLICATE_RATE,
+                      garbage_rate: float = config.SYNTHETIC_GARBAGE_RATE,
+                      missing_date_rate: float = config.SYNTHETIC_MISSING_DATE_RATE) -> pd.DataFrame:
+    """
+    Generates rows `start` to `start + n_rows` of a synthetic raw dataset.
+
+    Every value is a string as it appears in the raw CSV; missing values are
+    empty strings. The same arguments always produce the same rows.
+
+    Args:
+        n_rows (int): Number of rows to generate.
+        start (int): Position of the first row in the full dataset.
+        total_rows (int | None): Size of the full dataset, which sets the number
+            of artists. Defaults to `start + n_rows`.
+        seed (int): Seed of the dataset.
+        duplicate_rate (float): Share of rows repeating an earlier track.
+        garbage_rate (float): Share of rows with a mojibake title or artist.
+        missing_date_rate (float): Share of rows without a release date.
+
+    Returns:
+        pd.DataFrame: The rows, with `RAW_COLUMNS` as columns.
+    """
+    total_rows = total_rows or start + n_rows
+    rng = np.random.default_rng([seed, start])
+    positions = np.arange(start, start + n_rows, dtype=np.int64)
+
+    # Duplicates repeat the track (title and artist) of an earlier row
+    track_ids = positions.copy()
+    duplicate = (rng.random(n_rows) < duplicate_rate) & (positions > 0)
+    track_ids[duplicate] = (rng.random(duplicate.sum()) * positions[duplicate]).astype(np.int64)
+
+    titles = _track_titles(track_ids)
+    case = rng.integers(0, 3, n_rows)
+    titles[duplicate & (case == 1)] = [title.upper() for title in titles[duplicate & (case == 1)]]
+    titles[duplicate & (case == 2)] = [title.lower() for title in titles[duplicate & (case == 2)]]
+
+    # A few artists have most of the tracks, as on the real charts
+    n_artists = max(50, total_rows // 5)
+    uniform = ((track_ids * 40_503 + 7) % 1_000_003) / 1_000_003
+    artist_ids = (n_artists * uniform ** 2.5).astype(np.int64)
+    artists = _artist_names(artist_ids)
+
+    garbage = rng.random(n_rows) < garbage_rate
+    garbage_title = garbage & (rng.random(n_rows) < 0.5)
+    garbage_artist = garbage & ~garbage_title
+    titles[garbage_title] = _MOJIBAKE[rng.integers(0, len(_MOJIBAKE), garbage_title.sum())]
+    artists[garbage_artist] = _MOJIBAKE[rng.integers(0, len(_MOJIBAKE), garbage_artist.sum())]
+
+    # Release dates lean towards recent years, written as M/D/YYYY
+    days_before = (rng.exponential(1_500, n_rows) % 13_000).astype('timedelta64[D]')
+    dates = pd.DatetimeIndex(np.datetime64('2024-06-10') - days_before)
+    release_dates = (pd.Series(dates.month.astype(str)) + '/' + dates.day.astype(str) + '/'
+                     + dates.year.astype(str)).to_numpy(dtype=object)
+    release_dates[rng.random(n_rows) < missing_date_rate] = ''
+
+    isrc = (pd.Series(_COUNTRIES[track_ids % len(_COUNTRIES)]) + _REGISTRANTS[(track_ids // 7) % len(_REGISTRANTS)]
+            + pd.Series(dates.year % 100).astype(str).str.zfill(2)
+            + pd.Series(track_ids % 100_000).astype(str).str.zfill(5))
+
+    popularity = rng.standard_normal(n_rows)
+    data = {
+        'Track': titles,
+        'Album Name': _album_names(track_ids),
+        'Artist': artists,
+        'Release Date': release_dates,
+        'ISRC': isrc.to_numpy(dtype=object),
+        'All Time Rank': _format_counts(positions + 1, np.zeros(n_rows, dtype=bool)),
+    }
+    track_score = 19.4 + np.exp(3.3 + 0.7 * popularity + 0.3 * rng.standard_normal(n_rows))
+    data['Track Score'] = np.round(track_score, 1).astype(str)
+    for col, (log_median, effect, noise, missing_rate) in COUNT_COLUMNS.items():
+        counts = np.exp(log_median + effect * popularity + noise * rng.standard_normal(n_rows))
+        data[col] = _format_counts(np.round(counts).astype(np.int64), rng.random(n_rows) < missing_rate)
+    spotify_popularity = np.clip(np.round(60 + 12 * popularity + 8 * rng.standard_normal(n_rows)), 1, 100)
+    data['Spotify Popularity'] = np.where(rng.random(n_rows) < 0.18, '', spotify_popularity.astype(int).astype(str))
+    data['TIDAL Popularity'] = ''
+    data['Explicit Track'] = (rng.random(n_rows) < 0.36).astype(int).astype(str)
+    return pd.DataFrame(data, columns=RAW_COLUMNS)
+
+
+def write_raw_csv(path: Path, n_rows: int, seed: int = 42, chunk_rows: int = config.SYNTHETIC_CHUNK_ROWS) -> Path:
+    """
+    Writes a synthetic raw CSV of `n_rows` rows, encoded as Latin-1 like the Kaggle file.
+
+    Rows are generated and appended a chunk at a time, into a temporary file
+    that replaces `path` when complete.
+
+    Args:
+        path (Path): Output CSV path.
+        n_rows (int): Number of data rows.
+        seed (int): Seed of the dataset.
+        chunk_rows (int): Rows generated per chunk.
+
+    Returns:
+        Path: The written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='latin-1', newline='') as csv_file:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = generate_raw_data(min(chunk_rows, n_rows - start), start=start, total_rows=n_rows, seed=seed)
+            chunk.to_csv(csv_file, header=start == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def synthetic_raw_file(scale: float, seed: int = 42, data_dir: Path = config.SYNTHETIC_DATA_DIR) -> Path:
+    """
+    Returns a synthetic raw CSV with `scale` times `config.SYNTHETIC_BASE_ROWS` rows, generating it if needed.
+
+    Files are kept in `data_dir` under a name made of the row count and seed,
+    so repeated benchmark runs reuse them.
+    """
+    n_rows = int(round(scale * config.SYNTHETIC_BASE_ROWS))
+    path = data_dir / f'raw_{n_rows}_rows_seed{seed}.csv'
+    if not path.exists():
+        print(f"Generating synthetic raw data: {n_rows:,} rows -> {path}")
+        write_raw_csv(path, n_rows, seed=seed)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write a synthetic raw CSV with the schema of the Kaggle file.")
+    parser.add_argument('--scale', type=float, default=1,
+                        help=f'Size as a multiple of {config.SYNTHETIC_BASE_ROWS:,} rows (1 to 1000).')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=Path, default=None,
+                        help=f'Output CSV. Defaults to a file in {config.SYNTHETIC_DATA_DIR}.')
+    args = parser.parse_args()
+
+    if args.output is None:
+        print(f"Synthetic raw data available at: {synthetic_raw_file(args.scale, seed=args.seed)}")
+    else:
+        n_rows = int(round(args.scale * config.SYNTHETIC_BASE_ROWS))
+        write_raw_csv(args.output, n_rows, seed=args.seed)
+        print(f"Wrote {n_rows:,} synthetic rows to: {args.output}")
@@ -14,8 +14,10 @@ import plotly.express as px
 from wordcloud import WordCloud
 from pathlib import Path
 from src import config 
+from src.stats_engine import StatisticsEngine
 
-def plot_correlation_heatmap(df: pd.DataFrame, cols: list, title: str, save_path: Path = None):
+def plot_correlation_heatmap(df: pd.DataFrame, cols: list, title: str, save_path: Path = None,
+                             engine: StatisticsEngine = None):
     """
     Generates, displays, and optionally saves a correlation heatmap.
 
@@ -24,9 +26,11 @@ def plot_correlation_heatmap(df: pd.DataFrame, cols: list, title: str, save_path
         cols (list): A list of column names to include in the correlation matrix.
         title (str): The title for the plot.
         save_path (Path, optional): Path to save the figure. Defaults to None.
+        engine (StatisticsEngine, optional): Engine built from `df`; its cached
+            matrix is sliced instead of recomputing the correlations.
     """
     plt.figure(figsize=(12, 10))
-    corr_matrix = df[cols].corr()
+    corr_matrix = engine.correlation(cols) if engine is not None else df[cols].corr()
     sns.heatmap(corr_matrix, annot=True, cmap='viridis', fmt='.2f')
     plt.title(title, fontsize=16)
     
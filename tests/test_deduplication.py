@@ -0,0 +1,37 @@
+import pandas as pd
+
+from src.deduplication import near_duplicate_groups, remove_near_duplicates
+
+
+def _tracks(titles: list[str], artists: list[str], streams: list[int]) -> pd.DataFrame:
+    return pd.DataFrame({'track': titles, 'artist': artists,
+                         'spotify_streams': pd.array(streams, dtype='int64')})
+
+
+def test_punctuation_only_title_with_fewest_streams_does_not_crash():
+    # The empty-shingle title is the last MinHash segment, which used to make reduceat raise IndexError
+    titles = [f'Song {i}' for i in range(200)] + ['!!!']
+    df = _tracks(titles, ['Artist'] * 201, list(range(1_000, 1_200)) + [1])
+
+    deduplicated, stats = remove_near_duplicates(df)
+
+    assert stats['removed'] == 0
+    assert '!!!' in deduplicated['track'].tolist()
+
+
+def test_punctuation_only_title_keeps_its_own_group():
+    # In the middle of the chunk, an empty segment used to take the next title's signature
+    df = _tracks(['Hello World', '🔥🔥', 'Hello World (Remix)', 'Goodbye'], ['A', 'A', 'A', 'A'], [4, 3, 2, 1])
+
+    groups, _ = near_duplicate_groups(df['track'], df['artist'])
+
+    assert groups.tolist() == [0, 1, 0, 3]
+
+
+def test_punctuation_only_titles_still_match_exactly():
+    df = _tracks(['!!!', '!!!', '???'], ['A', 'A', 'B'], [3, 2, 1])
+
+    groups, stats = near_duplicate_groups(df['track'], df['artist'])
+
+    assert groups.tolist() == [0, 0, 2]
+    assert stats['exact_key_matches'] == 1